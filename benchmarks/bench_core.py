@@ -0,0 +1,229 @@
+"""Benchmark of the core operations (parse, validate, sort, filter, input generation, MOLTRA string, memory estimation).
+
+Usage:
+    python benchmarks/bench_core.py [--spinors 2000 20000 100000] [--repeat 5]
+    python benchmarks/bench_core.py --save baseline.json
+    python benchmarks/bench_core.py --compare baseline.json [--threshold 0.2]
+
+The DIRAC outputs in data/ are summarized by sum_dirac_dfcoef first (skipped if it is not installed),
+then synthetic outputs (D2h, E1g and E1u) with --spinors spinors in total are created by utils/synthetic_output.py
+with a fixed seed. Each operation is run --repeat times on each file and the fastest time is reported.
+--save writes the results as the baseline and --compare exits with 1
+if any operation is slower than the baseline by more than --threshold (0.2 = 20%) and --min-diff-ms
+(the differences of the very fast operations are just noise).
+The baseline depends on the machine, so create it on the same machine before the change to measure.
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_DIR / "data"
+sys.path.insert(0, str(REPO_DIR / "src"))
+
+from dcaspt2_input_generator.utils.input_generator import create_caspt2_input, create_ivo_input  # noqa: E402
+from dcaspt2_input_generator.utils.memory_estimator import estimate_memory_breakdowns  # noqa: E402
+from dcaspt2_input_generator.utils.output_loader import load_output  # noqa: E402
+from dcaspt2_input_generator.utils.selection import select_by_electron_window  # noqa: E402
+from dcaspt2_input_generator.utils.space_summary import SpaceSummary  # noqa: E402
+from dcaspt2_input_generator.utils.synthetic_output import SyntheticOutputSpec, write_synthetic_output  # noqa: E402
+from dcaspt2_input_generator.utils.table_data import SortKey, TableData  # noqa: E402
+from dcaspt2_input_generator.utils.table_index import RowFilter, TableIndex  # noqa: E402
+
+Results = Dict[str, Dict[str, float]]  # {file name: {operation: seconds}}
+OPERATIONS = [
+    "parse",
+    "validate",
+    "sort",
+    "sort orders",
+    "index",
+    "filter",
+    "select",
+    "caspt2 input",
+    "ivo input",
+    "moltra",
+    "memory sweep",
+]
+# Filters of the "filter" operation, the atoms and the irreps of the synthetic outputs
+FILTERS = [
+    RowFilter(ao_label="Uf", min_percentage=30.0),
+    RowFilter(ao_label="B1uUpz", min_percentage=10.0, energy_min=-2.0, energy_max=1.0),
+    RowFilter(irreps=("E1u",), energy_min=-2.0, energy_max=1.0),
+]
+
+
+def summarize(dirac_output: Path, out_dir: Path) -> Optional[Path]:
+    output_path = out_dir / f"{dirac_output.stem}.sum_dirac_dfcoef.out"
+    options = ["-i", str(dirac_output), "-d", "3", "-c", "-o", str(output_path)]
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "sum_dirac_dfcoef", *options],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except subprocess.CalledProcessError:
+        return None
+    return output_path
+
+
+def measure(func: Callable[[Any], Any], setup: Callable[[], Any], repeat: int) -> float:
+    """Return the fastest time (s) of func(setup()), setup is not included in the time"""
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_file(file_path: Path, repeat: int) -> Dict[str, float]:
+    def load() -> TableData:
+        table_data = TableData()
+        load_output(file_path, table_data)
+        return table_data
+
+    loaded = load()
+    loaded.sort_by_energy()
+    electron_number = loaded.header_info.electron_number
+    spaces = select_by_electron_window(loaded)
+    loaded.set_orbital_spaces(spaces)
+    n = 2 * len(loaded.mo_data)  # spinors
+    point_group = loaded.header_info.point_group
+
+    def validate_setup() -> TableData:
+        # validate decreases electron_number, restore it before each run
+        loaded.header_info.electron_number = electron_number
+        return loaded
+
+    def unsorted_setup() -> TableData:
+        table_data = TableData()
+        table_data.header_info = loaded.header_info
+        table_data.mo_data = loaded.mo_data
+        order = list(range(len(loaded.mo_data)))
+        random.Random(0).shuffle(order)
+        table_data.mo_data.take(order)
+        return table_data
+
+    def moltra(table_data: TableData) -> str:
+        summary = SpaceSummary()
+        summary.rebuild(table_data)
+        return summary.moltra_str()
+
+    def memory_sweep(_: None) -> List[int]:
+        # Every split of the spinors into inactive, active (8 spinors) and secondary
+        inact = range(0, n - 8, 2)
+        return estimate_memory_breakdowns(inact, [8] * len(inact), [n - i - 8 for i in inact], point_group).total
+
+    results = {
+        "parse": measure(lambda _: load(), lambda: None, repeat),
+        "validate": measure(TableData.validate, validate_setup, repeat),
+        "sort": measure(TableData.sort_by_energy, unsorted_setup, repeat),
+    }
+    loaded.sort_by_energy()  # unsorted_setup shuffles the shared rows
+
+    def sort_orders(table_data: TableData) -> None:
+        table_data.sort_orders = {}  # Not cached
+        for key in SortKey:
+            table_data.get_sort_order(key)
+
+    results["sort orders"] = measure(sort_orders, lambda: loaded, repeat)
+    results["index"] = measure(TableIndex, lambda: loaded, repeat)
+    table_index = TableIndex(loaded)
+    results["filter"] = measure(lambda _: [table_index.filter_rows(f) for f in FILTERS], lambda: None, repeat)
+    loaded.header_info.electron_number = electron_number
+    results["select"] = measure(select_by_electron_window, lambda: loaded, repeat)
+    results["caspt2 input"] = measure(
+        lambda table_data: create_caspt2_input(table_data, spaces, 1, 23, 0, 0), lambda: loaded, repeat
+    )
+    results["ivo input"] = measure(
+        lambda table_data: create_ivo_input(table_data, spaces, 1, 23), lambda: loaded, repeat
+    )
+    results["moltra"] = measure(moltra, lambda: loaded, repeat)
+    results["memory sweep"] = measure(memory_sweep, lambda: None, repeat)
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float, min_diff: float) -> bool:
+    """Print the ratios to the baseline and return True if any operation is regressed"""
+    regressed = False
+    print(f"\n{'file':<40} {'operation':<14} {'baseline (ms)':>14} {'now (ms)':>10} {'ratio':>7}")
+    for name, ops in results.items():
+        for op, t in ops.items():
+            base = baseline.get(name, {}).get(op)
+            if base is None:
+                continue
+            ratio = t / base if base > 0 else float("inf")
+            mark = ""
+            if ratio > 1 + threshold and t - base > min_diff:
+                mark = " (regressed)"
+                regressed = True
+            print(f"{name:<40} {op:<14} {base * 1000:>14.3f} {t * 1000:>10.3f} {ratio:>7.2f}{mark}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--spinors", type=int, nargs="*", default=[2000, 20000, 100000], help="Spinors of the synthetic outputs"
+    )
+    parser.add_argument("--ao-per-row", type=int, default=4, help="AO contributions per row. Default: 4")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per operation. Default: 5")
+    parser.add_argument("--save", type=str, default=None, help="Write the results to this baseline file")
+    parser.add_argument("--compare", type=str, default=None, help="Compare the results with this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio. Default: 0.2 (20%%)")
+    parser.add_argument(
+        "--min-diff-ms", type=float, default=0.1, help="Ignore the slowdown smaller than this (ms). Default: 0.1"
+    )
+    args = parser.parse_args()
+
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = []
+        for dirac_output in sorted(DATA_DIR.glob("*.out")):
+            summary = summarize(dirac_output, Path(tmp_dir))
+            if summary is None:
+                print(f"skipped {dirac_output.name}: sum_dirac_dfcoef is not available", file=sys.stderr)
+            else:
+                files.append(summary)
+        for spinors in args.spinors:
+            # 1 row = 1 kramers pair = 2 spinors, a half of the spinors are E1g and the others are E1u
+            spinors_per_irrep = max(2, spinors // 4 * 2)
+            spec = SyntheticOutputSpec(
+                point_group="D2h",
+                spinors_per_irrep=spinors_per_irrep,
+                ao_per_row=args.ao_per_row,
+                electron_number=spinors_per_irrep // 2 // 2 * 2,  # a quarter of the spinors are occupied
+            )
+            files.append(write_synthetic_output(Path(tmp_dir) / f"synthetic_{spinors}.out", spec))
+
+        print(f"{'file':<40} {'rows':>7} " + " ".join(f"{op:>12}" for op in OPERATIONS) + "  (ms)")
+        for file_path in files:
+            name = file_path.name
+            results[name] = bench_file(file_path, args.repeat)
+            with open(file_path) as f:
+                rows = sum(1 for _ in f) - 4  # header lines and the empty line
+            print(f"{name:<40} {rows:>7} " + " ".join(f"{results[name][op] * 1000:>12.3f}" for op in OPERATIONS))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"\nbaseline saved: {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline: Results = json.load(f)
+        if compare(results, baseline, args.threshold, args.min_diff_ms / 1000):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
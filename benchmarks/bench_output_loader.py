@@ -0,0 +1,142 @@
+"""Benchmark of the sum_dirac_dfcoef output loader (time and peak RSS).
+
+Usage:
+    python benchmarks/bench_output_loader.py [--scale 10] [--repeat 5]
+
+The DIRAC outputs in data/ are summarized by sum_dirac_dfcoef first,
+then a synthetic output that is --scale times larger is created from each summary.
+Each measurement runs in a fresh subprocess so that the peak RSS is not affected by the other measurements.
+"legacy" is the previous loader (readlines + split of the whole file) for comparison.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_DIR / "data"
+
+
+def load_legacy(file_path: Path) -> None:
+    # The loader before the streaming parser: the whole file and all token lists are kept in memory
+    from dcaspt2_input_generator.utils.output_loader import read_header_line
+    from dcaspt2_input_generator.utils.table_data import TableData
+
+    table_data = TableData()
+    with open(file_path) as f:
+        rows = [line.split() for line in f.readlines()]
+    for idx, row in enumerate(rows):
+        if len(row) <= 1:
+            break
+        read_header_line(idx, row, table_data.header_info)
+    header = True
+    for row in rows:
+        if header:
+            header = len(row) > 1
+        elif row:
+            table_data.add_mo_data(row)
+            table_data.column_max_len = max(table_data.column_max_len, len(row))
+    table_data.validate()
+
+
+def load_streaming(file_path: Path) -> None:
+    from dcaspt2_input_generator.utils.output_loader import load_output
+    from dcaspt2_input_generator.utils.table_data import TableData
+
+    load_output(file_path, TableData())
+
+
+def run_child(mode: str, file_path: Path, repeat: int) -> None:
+    load = load_legacy if mode == "legacy" else load_streaming
+    base_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(file_path)
+        times.append(time.perf_counter() - start)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"time": min(times), "peak_rss_kb": peak_rss_kb, "delta_rss_kb": peak_rss_kb - base_rss_kb}))
+
+
+def summarize(dirac_output: Path, out_dir: Path) -> Path:
+    output_path = out_dir / f"{dirac_output.stem}.sum_dirac_dfcoef.out"
+    subprocess.run(
+        [sys.executable, "-m", "sum_dirac_dfcoef", "-i", str(dirac_output), "-d", "3", "-c", "-o", str(output_path)],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return output_path
+
+
+def scale_output(file_path: Path, scale: int) -> Path:
+    """Create a synthetic output by repeating the MO rows scale times with shifted MO numbers."""
+    from dcaspt2_input_generator.utils.output_loader import parse_output
+    from dcaspt2_input_generator.utils.table_data import HeaderInfo
+
+    header_info = HeaderInfo()
+    with open(file_path) as f:
+        header_lines = [next(f) for _ in range(3)]
+        rows = list(parse_output(header_lines + list(f), header_info))
+    max_mo = {key: max(int(row[1]) for row in rows if row[0] == key) for key in header_info.spinor_num_info}
+
+    header_info_line = header_lines[0]
+    moltra_line = " ".join(f"{key} 1..{max_mo[key] * scale}" for key in max_mo)
+    spinor_num_line = " ".join(
+        f"{key} closed {num.closed_shell} open {num.open_shell} virtual {num.sum_of_orbitals * scale - num.closed_shell - num.open_shell}"  # noqa: E501
+        for key, num in header_info.spinor_num_info.items()
+    )
+    scaled_path = file_path.with_name(f"{file_path.stem}.x{scale}.out")
+    with open(scaled_path, "w") as f:
+        f.write(f"{header_info_line.rstrip()}\n{moltra_line}\n{spinor_num_line}\n\n")
+        for k in range(scale):
+            for row in rows:
+                # Shift the energy a little so that the copies are sorted after the original rows
+                shifted = [row[0], str(int(row[1]) + k * max_mo[row[0]]), f"{float(row[2]) + k * 1e-3:.3f}", *row[3:]]
+                f.write(" ".join(shifted) + "\n")
+    return scaled_path
+
+
+def measure(mode: str, file_path: Path, repeat: int) -> dict:
+    p = subprocess.run(
+        [sys.executable, __file__, "--child", mode, str(file_path), "--repeat", str(repeat)],
+        check=True,
+        stdout=subprocess.PIPE,
+    )
+    return json.loads(p.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10, help="Scale of the synthetic outputs. Default: 10")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of loads per measurement. Default: 5")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.child[0], Path(args.child[1]), args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = []
+        for dirac_output in sorted(DATA_DIR.glob("*.out")):
+            summary = summarize(dirac_output, Path(tmp_dir))
+            files.extend([summary, scale_output(summary, args.scale)])
+
+        print(f"{'file':<45} {'lines':>8} {'mode':<10} {'time (ms)':>10} {'peak RSS (MB)':>14} {'+RSS (MB)':>10}")
+        for file_path in files:
+            with open(file_path) as f:
+                line_num = sum(1 for _ in f)
+            for mode in ("legacy", "streaming"):
+                res = measure(mode, file_path, args.repeat)
+                print(
+                    f"{file_path.name:<45} {line_num:>8} {mode:<10} {res['time'] * 1000:>10.2f}"
+                    f" {res['peak_rss_kb'] / 1024:>14.2f} {res['delta_rss_kb'] / 1024:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark of the startup (import time by `python -X importtime` and wall time of the CLI paths).
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 150]
+
+Each measurement runs in a fresh subprocess, so the modules are imported from scratch.
+"cumulative" is the cumulative import time of the top-level modules reported by -X importtime,
+and "wall" is the time until the subprocess exits.
+The exit code is 1 if the cumulative import time of any path exceeds --budget-ms,
+so the startup budget can be checked in CI.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# (name, arguments of python) of the measured paths
+PATHS = [
+    ("import", ["-c", "import dcaspt2_input_generator"]),
+    ("--version", ["-m", "dcaspt2_input_generator", "--version"]),
+    ("batch --help", ["-m", "dcaspt2_input_generator", "batch", "--help"]),
+    ("import batch", ["-c", "import dcaspt2_input_generator.utils.batch"]),
+]
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """Return the total cumulative import time (ms) of the top-level imports
+    and the (cumulative time (ms), module) of all imports"""
+    # (e.g.) import time:       262 |      27582 | dcaspt2_input_generator
+    total_us = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.append((int(cumulative) / 1000, name.strip()))
+        if not name.startswith("  "):  # top-level import (not imported by another module)
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def measure(python_args: List[str], home_dir: str) -> Tuple[float, float, List[Tuple[float, str]]]:
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR / "src"), HOME=home_dir)
+    start = time.perf_counter()
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", *python_args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=env,
+        universal_newlines=True,
+    )
+    wall = (time.perf_counter() - start) * 1000
+    cumulative, modules = parse_importtime(p.stderr)
+    return cumulative, wall, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measurements per path. Default: 5")
+    parser.add_argument(
+        "--budget-ms", type=float, default=150, help="Budget of the cumulative import time (ms). Default: 150"
+    )
+    parser.add_argument("--top", type=int, default=5, help="Number of the slowest modules to show. Default: 5")
+    args = parser.parse_args()
+
+    over_budget = False
+    # Use an empty home directory, not to read or create the settings of the user
+    with tempfile.TemporaryDirectory() as home_dir:
+        print(f"{'path':<15} {'cumulative (ms)':>16} {'wall (ms)':>10}  slowest modules (ms)")
+        for name, python_args in PATHS:
+            results = [measure(python_args, home_dir) for _ in range(args.repeat)]
+            cumulative, _, modules = min(results, key=lambda res: res[0])
+            wall = min(res[1] for res in results)
+            own_modules = sorted((m for m in modules if m[1].startswith("dcaspt2_input_generator")), reverse=True)
+            slowest = ", ".join(f"{module} {t:.1f}" for t, module in own_modules[: args.top])
+            mark = " (over budget)" if cumulative > args.budget_ms else ""
+            over_budget = over_budget or cumulative > args.budget_ms
+            print(f"{name:<15} {cumulative:>16.2f} {wall:>10.2f}  {slowest}{mark}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+from typing import Optional
+
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtGui import QDoubleValidator
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QPushButton, QWidget
+
+from dcaspt2_input_generator.utils.table_index import RowFilter
+from dcaspt2_input_generator.utils.utils import debug_print
+
+
+class FloatInput(QLineEdit):
+    def __init__(self, placeholder: str, bottom: float = -float("inf"), top: float = float("inf")):
+        super().__init__()
+        self.setPlaceholderText(placeholder)
+        self.setValidator(QDoubleValidator(bottom, top, 6))
+        self.setMaximumWidth(120)
+
+    def get_value(self) -> Optional[float]:
+        """Return None if the input is empty or not a number"""
+        try:
+            return float(self.text())
+        except ValueError:
+            return None
+
+
+# FilterBar is the widget above the table to show only the matched rows
+# AO label [Uf      ] min % [30   ] irreps [E1u     ] energy (a.u.) [-2.0  ] - [1.0   ] (Clear)
+# The filter is emitted by filter_changed a little after the last edit, not to filter the table on every key press.
+class FilterBar(QWidget):
+    filter_changed = Signal(object)  # RowFilter
+    # Time (ms) from the last edit to emit filter_changed
+    delay_ms = 200
+
+    def __init__(self):
+        debug_print("FilterBar init")
+        super().__init__()
+        self.ao_label_input = QLineEdit()
+        self.ao_label_input.setPlaceholderText("e.g. Uf, B3uArpx")
+        self.min_percentage_input = FloatInput("0", bottom=0.0, top=100.0)
+        self.irreps_input = QLineEdit()
+        self.irreps_input.setPlaceholderText("e.g. E1u E1g")
+        self.energy_min_input = FloatInput("min")
+        self.energy_max_input = FloatInput("max")
+        self.clear_button = QPushButton("Clear")
+        self.clear_button.clicked.connect(self.clear)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.delay_ms)
+        self.timer.timeout.connect(self.emit_filter)
+        self.line_edits = [
+            self.ao_label_input,
+            self.min_percentage_input,
+            self.irreps_input,
+            self.energy_min_input,
+            self.energy_max_input,
+        ]
+        for line_edit in self.line_edits:
+            line_edit.textChanged.connect(self.timer.start)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("AO label"))
+        layout.addWidget(self.ao_label_input)
+        layout.addWidget(QLabel("min %"))
+        layout.addWidget(self.min_percentage_input)
+        layout.addWidget(QLabel("irreps"))
+        layout.addWidget(self.irreps_input)
+        layout.addWidget(QLabel("energy (a.u.)"))
+        layout.addWidget(self.energy_min_input)
+        layout.addWidget(QLabel("-"))
+        layout.addWidget(self.energy_max_input)
+        layout.addWidget(self.clear_button)
+        self.setLayout(layout)
+
+    def get_filter(self) -> RowFilter:
+        min_percentage = self.min_percentage_input.get_value()
+        return RowFilter(
+            ao_label=self.ao_label_input.text().strip(),
+            min_percentage=0.0 if min_percentage is None else min_percentage,
+            irreps=tuple(self.irreps_input.text().replace(",", " ").split()),
+            energy_min=self.energy_min_input.get_value(),
+            energy_max=self.energy_max_input.get_value(),
+        )
+
+    def emit_filter(self):
+        self.filter_changed.emit(self.get_filter())
+
+    def clear(self):
+        for line_edit in self.line_edits:
+            line_edit.clear()
+        self.timer.stop()
+        self.emit_filter()
@@ -1,27 +1,35 @@
-import subprocess
-import sys
 from pathlib import Path
+from typing import List, Optional
 
-from PySide6.QtCore import QProcess, QSettings, Qt
+from PySide6.QtCore import QSettings, Qt
 from PySide6.QtGui import QDragEnterEvent, QDropEvent, QKeyEvent
-from PySide6.QtWidgets import QFileDialog, QMainWindow, QMessageBox, QPushButton, QVBoxLayout, QWidget
+from PySide6.QtWidgets import QFileDialog, QInputDialog, QMainWindow, QMessageBox, QPushButton, QVBoxLayout, QWidget
 
-from dcaspt2_input_generator.components.data import colors, table_data
+from dcaspt2_input_generator.components.data import OrbitalSpace, colors, table_data
+from dcaspt2_input_generator.components.filter_bar import FilterBar
 from dcaspt2_input_generator.components.menu_bar import MenuBar
 from dcaspt2_input_generator.components.table_summary import TableSummary
 from dcaspt2_input_generator.components.table_widget import TableWidget
 from dcaspt2_input_generator.controller.color_settings_controller import ColorSettingsController
 from dcaspt2_input_generator.controller.multi_process_controller import MultiProcessController
 from dcaspt2_input_generator.controller.save_default_settings_controller import SaveDefaultSettingsController
+from dcaspt2_input_generator.controller.sum_dirac_dfcoef_runner import SumDiracDfcoefRunner
 from dcaspt2_input_generator.controller.widget_controller import WidgetController
+from dcaspt2_input_generator.utils.active_space_suggestion import ActiveSpaceSuggestion
 from dcaspt2_input_generator.utils.dir_info import dir_info
+from dcaspt2_input_generator.utils.input_generator import create_caspt2_input
+from dcaspt2_input_generator.utils.memory_budget import plan_memory_budget
+from dcaspt2_input_generator.utils.memory_estimator import format_memory_size
+from dcaspt2_input_generator.utils.selection import SpaceWindow
 from dcaspt2_input_generator.utils.settings import settings
-from dcaspt2_input_generator.utils.utils import create_ras_str, debug_print
+from dcaspt2_input_generator.utils.sum_dirac_dfcoef_cache import SumDiracDfcoefCache
+from dcaspt2_input_generator.utils.workspace import Workspace
 
 
 # Layout for the main window
 # File, Settings, About (menu bar)
 # message, AnimatedToggle (button)
+# FilterBar (filter of the rows)
 # TableWidget (table)
 # InputLayout (layout): inactive, active, secondary
 class MainWindow(QMainWindow):
@@ -39,18 +47,33 @@ class MainWindow(QMainWindow):
         # Add drag and drop functionality
         self.setAcceptDrops(True)
 
+        # Workspace of the document shown in the table
+        self.workspace: Optional[Workspace] = None
+        # Workspace of the document being summarized by sum_dirac_dfcoef (replaces self.workspace when it succeeds)
+        self.loading_workspace: Optional[Workspace] = None
+
         # Set task runner
-        self.process = QProcess()
-        self.callback = None
+        self.sum_dirac_dfcoef_runner = SumDiracDfcoefRunner(
+            SumDiracDfcoefCache(dir_info.sum_dirac_dfcoef_cache_dir), parent=self
+        )
+        self.sum_dirac_dfcoef_runner.finished.connect(self.on_sum_dirac_dfcoef_finished)
+        self.sum_dirac_dfcoef_runner.failed.connect(self.on_sum_dirac_dfcoef_failed)
+        self.sum_dirac_dfcoef_runner.canceled.connect(self.discard_loading_workspace)
         # Show the header bar
         self.menu_bar = MenuBar()
         self.menu_bar.open_action_dirac.triggered.connect(self.select_file_Dirac)
         self.menu_bar.open_action_dfcoef.triggered.connect(self.select_file_DFCOEF)
         self.menu_bar.save_action_input.triggered.connect(self.save_input)
         self.menu_bar.save_action_dfcoef.triggered.connect(self.save_sum_dirac_dfcoef)
+        self.menu_bar.fit_memory_budget_action.triggered.connect(self.fit_memory_budget)
 
         # Body
+        self.filter_bar = FilterBar()
         self.table_widget = TableWidget()
+        self.filter_bar.filter_changed.connect(self.table_widget.set_row_filter)
+        self.menu_bar.space_assign_action.space_assign_dialog.assign_requested.connect(self.assign_space_windows)
+        self.menu_bar.suggestion_action.suggestion_dialog.apply_requested.connect(self.apply_suggestion)
+        self.table_widget.color_changed.connect(self.menu_bar.memory_sweep_action.memory_sweep_dialog.refresh)
         self.table_summary = TableSummary()
         # Add Save button
         self.save_button = QPushButton("Save")
@@ -58,6 +81,7 @@ class MainWindow(QMainWindow):
 
         # Create an instance of WidgetController
         self.widget_controller = WidgetController(self.table_summary, self.table_widget)
+        self.widget_controller.ivo_input_failed.connect(self.display_critical_error_message_box)
         self.color_settings_controller = ColorSettingsController(
             self.table_widget, self.menu_bar.color_settings_action.color_settings_dialog
         )
@@ -73,6 +97,7 @@ class MainWindow(QMainWindow):
         # layout
         layout = QVBoxLayout()
         layout.addWidget(self.menu_bar)
+        layout.addWidget(self.filter_bar)
         layout.addWidget(self.table_widget)
         layout.addWidget(self.table_summary)
         layout.addWidget(self.save_button)
@@ -86,85 +111,24 @@ class MainWindow(QMainWindow):
         # save settings when closing
         self.settings.setValue("geometry", self.saveGeometry())
         self.settings.setValue("windowState", self.saveState())
+        self.sum_dirac_dfcoef_runner.stop()
+        self.widget_controller.close()
+        self.discard_loading_workspace()
+        if self.workspace is not None:
+            self.workspace.cleanup()
+            self.workspace = None
         return super().closeEvent(a0)
 
     def save_input(self):
-        def add_nelec(cur_nelec: int, rem_electrons: int) -> int:
-            if rem_electrons > 0:
-                cur_nelec += min(rem_electrons, 2)
-            return cur_nelec
-
-        inact = 0
-        act = 0
-        sec = 0
-        elec = 0
-        idx_caspt2 = 0
-        ras1_list = []
-        ras2_list = []
-        ras3_list = []
-        rem_electrons = table_data.header_info.electron_number
-        is_cas = True
-        last_ras2_idx = -1
-        for idx in range(self.table_widget.rowCount()):
-            spinor_indices = [2 * idx_caspt2 + 1, 2 * idx_caspt2 + 2]  # 1 row = 2 spinors
-            color = self.table_widget.item(idx, 0).background().color()
-            if color != colors.not_used.color:
-                idx_caspt2 += 1
-            if color == colors.inactive.color:
-                debug_print(f"{idx}, inactive")
-                inact += 2
-            elif color == colors.ras1.color:
-                debug_print(f"{idx}, ras1")
-                act += 2
-                ras1_list.extend(spinor_indices)
-                elec = add_nelec(elec, rem_electrons)
-                is_cas = False
-            elif color == colors.active.color:
-                debug_print(f"{idx}, active")
-                act += 2
-                ras2_list.extend(spinor_indices)
-                elec = add_nelec(elec, rem_electrons)
-                if last_ras2_idx not in (-1, idx - 1):
-                    is_cas = False
-                last_ras2_idx = idx
-            elif color == colors.ras3.color:
-                debug_print(f"{idx}, ras3")
-                act += 2
-                elec = add_nelec(elec, rem_electrons)
-                ras3_list.extend(spinor_indices)
-                is_cas = False
-            elif color == colors.secondary.color:
-                debug_print(f"{idx}, secondary")
-                sec += 2
-            rem_electrons -= 2
-        totsym = self.table_summary.user_input.totsym_number.get_value()
-
-        output = f".ninact\n{inact}\n"
-        output += f".nact\n{act}\n"
-        output += f".nelec\n{elec}\n"
-        output += f".nsec\n{sec}\n"
-        output += f".caspt2_ciroots\n{totsym} 1\n" # CASCI/CASPT2 root is fixed to 1
-        output += f".diracver\n{self.table_summary.user_input.dirac_ver_number.get_value()}\n"
-        output += ".subprograms\nCASCI\nCASPT2\n"
-        if table_data.header_info.moltra_scheme is not None:
-            output += f".scheme\n{table_data.header_info.moltra_scheme}\n"  # Explicitly set MOLTRA scheme.
-
-        if not is_cas:
-            ras1_str = create_ras_str(sorted(ras1_list))
-            ras2_str = create_ras_str(sorted(ras2_list))
-            ras3_str = create_ras_str(sorted(ras3_list))
-            output += (
-                ""
-                if len(ras1_list) == 0
-                else "ras1\n" + ras1_str + "\n" + self.table_summary.user_input.ras1_max_hole_number.text() + "\n"
-            )
-            output += "" if len(ras2_list) == 0 else "ras2\n" + ras2_str + "\n"
-            output += (
-                ""
-                if len(ras3_list) == 0
-                else "ras3\n" + ras3_str + "\n" + self.table_summary.user_input.ras3_max_electron_number.text() + "\n"
-            )
-        output += "end\n"
+        user_input = self.table_summary.user_input
+        output = create_caspt2_input(
+            table_data,
+            table_data.orbital_spaces,
+            totsym=user_input.totsym_number.get_value(),
+            dirac_ver=user_input.dirac_ver_number.get_value(),
+            ras1_max_hole=user_input.ras1_max_hole_number.text(),
+            ras3_max_electron=user_input.ras3_max_electron_number.text(),
+        )
 
         # open dialog to save the file
         file_path, _ = QFileDialog.getSaveFileName(self, "Save dirac_caspt2 input File", "", "")
@@ -172,78 +136,87 @@ class MainWindow(QMainWindow):
             with open(file_path, mode="w") as f:
                 f.write(output)
 
-    def display_critical_error_message_box(self, message: str):
-        QMessageBox.critical(self, "Error", message, QMessageBox.StandardButton.Ok, QMessageBox.StandardButton.Cancel)
+    def assign_space_windows(self, windows: List[SpaceWindow]):
+        try:
+            self.table_widget.assign_space_windows(windows)
+        except ValueError as e:
+            self.display_critical_error_message_box(f"The orbital spaces cannot be assigned.\n\ndetails: {e}")
 
-    def init_process(self):
-        self.process.finished.connect(self.command_finished_handler)
+    def apply_suggestion(self, suggestion: ActiveSpaceSuggestion):
+        self.table_widget.assign_row_ranges(suggestion.to_row_ranges())
 
-        if self.process.state() == QProcess.ProcessState.Running:
-            self.process.kill()
+    def fit_memory_budget(self):
+        if not table_data.header_info.point_group:
+            msg = "Point Group: could not be obtained, cannot estimate the memory size."
+            self.display_critical_error_message_box(msg)
+            return
+        budget_gb, ok = QInputDialog.getDouble(
+            self, "Fit to memory budget", "Memory budget of dirac_caspt2 (GB)", 16.0, 0.001, 1e6, 3
+        )
+        if not ok:
+            return
+        try:
+            plan = plan_memory_budget(table_data, int(budget_gb * 1024**3))
+        except ValueError as e:
+            self.display_critical_error_message_box(f"The memory size cannot be fitted.\n\ndetails: {e}")
+            return
+        # One batched update, the not used rows are also removed from the recommended MOLTRA setting
+        self.table_widget.assign_rows(plan.trimmed_rows, OrbitalSpace.NOT_USED)
+        QMessageBox.information(
+            self,
+            "Fit to memory budget",
+            f"budget: {format_memory_size(plan.budget)}\n\
+secondary: {plan.secondary_before} -> {plan.secondary_after} spinors\n\
+estimated max memory size: {format_memory_size(plan.memory_before)} -> {format_memory_size(plan.memory_after)}\n\
+{2 * len(plan.trimmed_rows)} secondary spinors with the highest energies are not used.",
+        )
 
-    def command_finished_handler(self):
-        if self.callback is not None:
-            self.callback()
-            self.callback = None
-        self.process.kill()
+    def display_critical_error_message_box(self, message: str):
+        QMessageBox.critical(self, "Error", message, QMessageBox.StandardButton.Ok, QMessageBox.StandardButton.Cancel)
 
     def run_sum_dirac_dfcoef(self, file_path):
-        def create_command(command: str) -> str:
-            if sys.executable:
-                return f"{sys.executable} -m {command}"
-            return command
-
-        def check_version():
-            command = create_command("sum_dirac_dfcoef -v")
-            p = subprocess.run(
-                command.split(),
-                check=True,
-                stdout=subprocess.PIPE,
-            )
-            output = p.stdout.decode("utf-8")
-            # v4.0.0 or later is required
-            major_version = int(output.split(".")[0])
-            if major_version < 4:
-                msg = f"The version of sum_dirac_dfcoef is too old.\n\
-sum_dirac_dfcoef version: {output}\n\
-Please update sum_dirac_dfcoef to v4.0.0 or later with `pip install -U sum_dirac_dfcoef`"
-                raise Exception(msg)
-
-        def run_command():
-            num_process = max(1, settings.multi_process_input.multi_process_num)
-            command = create_command(
-                f'sum_dirac_dfcoef -i "{file_path}" -d 3 -c -o "{dir_info.sum_dirac_dfcoef_path}" -j {num_process}'
-            )
-            self.process.startCommand(command)
-            if self.process.exitCode() != 0:
-                data_stderr = self.process.readAllStandardError().data()
-                if isinstance(data_stderr, (bytes, bytearray)):
-                    decoded_stderr = data_stderr.decode()
-                else:
-                    decoded_stderr = data_stderr.tobytes().decode()
-                err_msg = f"An error has ocurred while running the sum_dirac_dfcoef program.\n\
-Please check the output file. path: {file_path}\nExecuted command: {command}\n\
-all stderr: {decoded_stderr}"
-                raise subprocess.CalledProcessError(self.process.exitCode(), command, "", err_msg)
-
-        self.init_process()
-        check_version()
-        run_command()
+        # The table is reloaded by on_sum_dirac_dfcoef_finished after the job has finished
+        num_process = settings.multi_process_input.multi_process_num
+        # The running job (if any) is stopped by start(), so its workspace is not needed anymore
+        self.discard_loading_workspace()
+        self.loading_workspace = Workspace(dir_info.workspace_dir)
+        self.sum_dirac_dfcoef_runner.start(Path(file_path), self.loading_workspace.sum_dirac_dfcoef_path, num_process)
+
+    def on_sum_dirac_dfcoef_finished(self, output_path: Path):
+        try:
+            self.table_widget.reload(output_path)
+        except Exception as e:
+            self.discard_loading_workspace()
+            err_msg = f"An unexpected error has ocurred.\n\
+file_path: {self.sum_dirac_dfcoef_runner.file_path}\n\n\ndetails: {e}"
+            self.display_critical_error_message_box(err_msg)
+            return
+        workspace, self.loading_workspace = self.loading_workspace, None
+        self.switch_workspace(workspace)
+
+    def on_sum_dirac_dfcoef_failed(self, message: str):
+        self.discard_loading_workspace()
+        self.display_critical_error_message_box(message)
+
+    def discard_loading_workspace(self):
+        if self.loading_workspace is not None:
+            self.loading_workspace.cleanup()
+            self.loading_workspace = None
+
+    def switch_workspace(self, workspace: Optional[Workspace]):
+        """Make workspace the workspace of the document shown in the table and remove the previous one"""
+        if workspace is None:
+            workspace = Workspace(dir_info.workspace_dir)
+        # Move the IVO input writer first, not to write the old document's input to the new workspace or vice versa
+        self.widget_controller.set_ivo_input_path(workspace.ivo_input_path)
+        if self.workspace is not None:
+            self.workspace.cleanup()
+        self.workspace = workspace
 
     def select_file_Dirac(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "SELECT A DIRAC OUTPUT FILE", "", "Output file (*.out)")
         if file_path:
-            try:
-                self.callback = lambda: self.table_widget.reload(dir_info.sum_dirac_dfcoef_path)
-                self.run_sum_dirac_dfcoef(file_path)
-            except subprocess.CalledProcessError as e:
-                err_msg = f"It seems that the sum_dirac_dfcoef program has failed.\n\
-Please check the output file. Is this DIRAC output file?\npath: {file_path}\n\n\ndetails: {e.stderr}"
-                self.display_critical_error_message_box(err_msg)
-            except Exception as e:
-                err_msg = f"An unexpected error has ocurred.\n\
-file_path: {file_path}\n\n\ndetails: {e}"
-                self.display_critical_error_message_box(err_msg)
+            self.run_sum_dirac_dfcoef(file_path)
 
     def select_file_DFCOEF(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -258,7 +231,7 @@ file_path: {file_path}\n\n\ndetails: {e}"
                 self.display_critical_error_message_box(err_msg)
 
     def save_sum_dirac_dfcoef(self):
-        if not dir_info.sum_dirac_dfcoef_path.exists():
+        if self.workspace is None or not self.workspace.sum_dirac_dfcoef_path.exists():
             QMessageBox.critical(
                 self,
                 "Error",
@@ -275,10 +248,12 @@ Please run the sum_dirac_dfcoef program first.",
             import shutil
 
             # Copy the sum_dirac_dfcoef.out file to the file_path
-            shutil.copy(dir_info.sum_dirac_dfcoef_path, file_path)
+            shutil.copy(self.workspace.sum_dirac_dfcoef_path, file_path)
 
     def reload_table(self, filepath: Path):
         self.table_widget.reload(filepath)
+        # The sum_dirac_dfcoef output is given by the user, so the new workspace only holds active.ivo.inp
+        self.switch_workspace(None)
 
     def dragEnterEvent(self, event: QDragEnterEvent) -> None:
         if event.mimeData().hasText():
@@ -298,20 +273,10 @@ Please check your dropped file.",
                 QMessageBox.StandardButton.Cancel,
             )
         try:
-            self.table_widget.reload(filepath)
+            self.reload_table(filepath)
         except Exception:
-            try:
-                self.callback = lambda: self.table_widget.reload(dir_info.sum_dirac_dfcoef_path)
-                self.run_sum_dirac_dfcoef(filepath)
-            except Exception:
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    "We cannot load the file properly.\n\
-Please check your dropped file.",
-                    QMessageBox.StandardButton.Ok,
-                    QMessageBox.StandardButton.Cancel,
-                )
+            # Not a sum_dirac_dfcoef output, regard it as a DIRAC output
+            self.run_sum_dirac_dfcoef(filepath)
 
     def keyPressEvent(self, event: QKeyEvent):
         super().keyPressEvent(event)
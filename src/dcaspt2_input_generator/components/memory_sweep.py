@@ -0,0 +1,116 @@
+from typing import List, Optional
+
+from PySide6.QtGui import QAction, QColor, QDoubleValidator
+from PySide6.QtWidgets import QDialog, QGridLayout, QLabel, QLineEdit, QSpinBox, QTableWidget, QTableWidgetItem
+
+from dcaspt2_input_generator.components.data import OrbitalSpace, table_data
+from dcaspt2_input_generator.utils.memory_estimator import format_memory_size, sweep_memory
+
+
+# MemorySweepDialog shows how the estimated maximum memory size of dirac_caspt2 grows
+# when the active or the secondary spinors are added or removed (what-if sweep), to size the job before submitting it.
+# The center cell is the current selection of the table, the rows change the active spinors (ras1 + active + ras3)
+# and the columns change the secondary spinors. The cells over the memory limit are highlighted.
+# The grid is updated whenever the orbital spaces of the table are changed (connect refresh to color_changed).
+class MemorySweepDialog(QDialog):
+    over_limit_color = QColor("#ffb3b3")
+
+    def __init__(self):
+        super().__init__()
+        self.init_UI()
+
+    def init_UI(self):
+        self.setWindowTitle("Memory sweep")
+        self.resize(800, 300)
+        self.active_step_input = self.create_spin_box(2)
+        self.secondary_step_input = self.create_spin_box(10)
+        self.steps_input = QSpinBox()
+        self.steps_input.setRange(1, 10)
+        self.steps_input.setValue(3)
+        self.steps_input.valueChanged.connect(self.refresh)
+        self.limit_input = QLineEdit()
+        self.limit_input.setPlaceholderText("no limit")
+        self.limit_input.setValidator(QDoubleValidator(0.0, 1e9, 3))
+        self.limit_input.editingFinished.connect(self.refresh)
+        self.message = QLabel()
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+
+        layout = QGridLayout()
+        layout.addWidget(QLabel("active step (spinors)"), 0, 0)
+        layout.addWidget(self.active_step_input, 0, 1)
+        layout.addWidget(QLabel("secondary step (spinors)"), 0, 2)
+        layout.addWidget(self.secondary_step_input, 0, 3)
+        layout.addWidget(QLabel("steps"), 0, 4)
+        layout.addWidget(self.steps_input, 0, 5)
+        layout.addWidget(QLabel("memory limit (GB)"), 0, 6)
+        layout.addWidget(self.limit_input, 0, 7)
+        layout.addWidget(self.message, 1, 0, 1, 8)
+        layout.addWidget(self.table, 2, 0, 1, 8)
+        self.setLayout(layout)
+
+    def create_spin_box(self, default_num: int) -> QSpinBox:
+        spin_box = QSpinBox()
+        spin_box.setRange(2, 1000)
+        spin_box.setSingleStep(2)  # 1 row = 1 kramers pair = 2 spinors
+        spin_box.setValue(default_num)
+        spin_box.valueChanged.connect(self.refresh)
+        return spin_box
+
+    def get_limit(self) -> Optional[int]:
+        try:
+            return int(float(self.limit_input.text()) * 1024**3)
+        except ValueError:
+            return None
+
+    def get_deltas(self, step: int) -> List[int]:
+        steps = self.steps_input.value()
+        return [step * idx for idx in range(-steps, steps + 1)]
+
+    def refresh(self, *_):
+        if not self.isVisible():
+            return  # Refreshed by showEvent
+        point_group = table_data.header_info.point_group
+        if not point_group:
+            self.message.setText("Point Group: could not be obtained, cannot estimate the memory size.")
+            self.table.clear()
+            return
+        count = table_data.count_orbital_spaces()
+        inact = 2 * count[OrbitalSpace.INACTIVE]
+        act = 2 * (count[OrbitalSpace.RAS1] + count[OrbitalSpace.ACTIVE] + count[OrbitalSpace.RAS3])
+        sec = 2 * count[OrbitalSpace.SECONDARY]
+        active_deltas = self.get_deltas(self.active_step_input.value() // 2 * 2)
+        secondary_deltas = self.get_deltas(self.secondary_step_input.value() // 2 * 2)
+        grid = sweep_memory(inact, act, sec, point_group, active_deltas, secondary_deltas)
+        self.message.setText(f"Point Group: {point_group}, inactive: {inact}, active: {act}, secondary: {sec}")
+
+        limit = self.get_limit()
+        self.table.setRowCount(len(active_deltas))
+        self.table.setColumnCount(len(secondary_deltas))
+        self.table.setVerticalHeaderLabels([f"act {act + delta} ({delta:+d})" for delta in active_deltas])
+        self.table.setHorizontalHeaderLabels([f"sec {sec + delta} ({delta:+d})" for delta in secondary_deltas])
+        for row, values in enumerate(grid):
+            for column, value in enumerate(values):
+                item = QTableWidgetItem("" if value is None else format_memory_size(value))
+                if value is not None and limit is not None and value > limit:
+                    item.setBackground(self.over_limit_color)
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+
+    def showEvent(self, arg__1) -> None:
+        super().showEvent(arg__1)
+        self.refresh()
+
+
+class MemorySweepDialogAction(QAction):
+    def __init__(self):
+        super().__init__()
+        self.init_UI()
+
+    def init_UI(self):
+        self.memory_sweep_dialog = MemorySweepDialog()
+        self.setText("Memory sweep")
+        self.triggered.connect(self.openMemorySweepDialog)
+
+    def openMemorySweepDialog(self):
+        self.memory_sweep_dialog.show()
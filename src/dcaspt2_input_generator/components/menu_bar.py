@@ -1,5 +1,8 @@
 from dcaspt2_input_generator.components.color_settings import ColorSettingsDialogAction
+from dcaspt2_input_generator.components.memory_sweep import MemorySweepDialogAction
 from dcaspt2_input_generator.components.multi_process_settings import MultiProcessDialogAction
+from dcaspt2_input_generator.components.space_assign_dialog import SpaceAssignDialogAction
+from dcaspt2_input_generator.components.suggestion_dialog import SuggestionDialogAction
 from PySide6.QtCore import Signal
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QMenuBar
@@ -50,6 +53,16 @@ class MenuBar(QMenuBar):
         self.save_action_dfcoef = QAction("Save sum_dirac_dfcoef file (Ctrl+Shift+S)", self)
         self.file_menu.addAction(self.save_action_dfcoef)
 
+        self.file_menu = self.addMenu("Edit")
+        self.space_assign_action = SpaceAssignDialogAction()
+        self.file_menu.addAction(self.space_assign_action)
+        self.suggestion_action = SuggestionDialogAction()
+        self.file_menu.addAction(self.suggestion_action)
+        self.memory_sweep_action = MemorySweepDialogAction()
+        self.file_menu.addAction(self.memory_sweep_action)
+        self.fit_memory_budget_action = QAction("Fit to memory budget", self)
+        self.file_menu.addAction(self.fit_memory_budget_action)
+
         self.file_menu = self.addMenu("Settings")
         self.color_settings_action = ColorSettingsDialogAction()
         self.multi_process_action = MultiProcessDialogAction()
@@ -0,0 +1,119 @@
+from typing import List, Optional
+
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QAction, QDoubleValidator, QIntValidator
+from PySide6.QtWidgets import QComboBox, QDialog, QGridLayout, QLabel, QLineEdit, QMessageBox, QPushButton
+
+from dcaspt2_input_generator.components.data import OrbitalSpace
+from dcaspt2_input_generator.utils.selection import SpaceWindow
+
+
+class SpaceWindowInput:
+    # Modes of the combo box
+    not_changed = "not changed"
+    energy_window = "energy window (a.u.)"
+    around_homo_lumo = "spinors around HOMO-LUMO"
+
+    def __init__(self, space: OrbitalSpace):
+        self.space = space
+        self.label = QLabel(space.name.lower().replace("_", " "))
+        self.mode = QComboBox()
+        self.mode.addItems([self.not_changed, self.energy_window, self.around_homo_lumo])
+        self.mode.currentTextChanged.connect(self.update_inputs)
+        # min energy or occupied spinors, max energy or virtual spinors
+        self.lower_input = QLineEdit()
+        self.upper_input = QLineEdit()
+        self.update_inputs(self.not_changed)
+
+    def update_inputs(self, mode: str):
+        is_count = mode == self.around_homo_lumo
+        for line_edit, energy_text, count_text in (
+            (self.lower_input, "min (empty: no limit)", "occupied spinors"),
+            (self.upper_input, "max (empty: no limit)", "virtual spinors"),
+        ):
+            line_edit.clear()
+            line_edit.setEnabled(mode != self.not_changed)
+            line_edit.setPlaceholderText(count_text if is_count else energy_text)
+            line_edit.setValidator(QIntValidator(0, 1000000) if is_count else QDoubleValidator())
+
+    @staticmethod
+    def to_float(text: str) -> Optional[float]:
+        return float(text) if text else None
+
+    def get_window(self) -> Optional[SpaceWindow]:
+        """Return None if the space is not changed
+
+        Raises:
+            ValueError: The input is not a number
+        """
+        mode = self.mode.currentText()
+        lower, upper = self.lower_input.text().strip(), self.upper_input.text().strip()
+        if mode == self.energy_window:
+            return SpaceWindow(self.space, min_energy=self.to_float(lower), max_energy=self.to_float(upper))
+        elif mode == self.around_homo_lumo:
+            return SpaceWindow(self.space, occupied=int(lower or 0), virtual=int(upper or 0))
+        return None
+
+
+# SpaceAssignDialog assigns the orbital spaces of many rows at once
+# by the energy windows (e.g. inactive: max -2.0) or by the number of spinors around HOMO-LUMO
+# (e.g. active: 6 occupied and 6 virtual spinors) instead of selecting the rows by the mouse.
+# The windows are applied in the order of the rows of the dialog, the later rows take precedence.
+# The rows not included in any window keep their orbital spaces.
+class SpaceAssignDialog(QDialog):
+    assign_requested = Signal(object)  # List[SpaceWindow]
+    # The order of the precedence (the last one is the highest)
+    spaces = (OrbitalSpace.INACTIVE, OrbitalSpace.SECONDARY, OrbitalSpace.RAS1, OrbitalSpace.RAS3, OrbitalSpace.ACTIVE)
+
+    def __init__(self):
+        super().__init__()
+        self.init_UI()
+
+    def init_UI(self):
+        self.setWindowTitle("Assign orbital spaces by energy window")
+        self.space_inputs = [SpaceWindowInput(space) for space in self.spaces]
+        self.apply_button = QPushButton("Apply")
+        self.apply_button.clicked.connect(self.apply)
+
+        layout = QGridLayout()
+        layout.addWidget(QLabel("The lower rows take precedence. The other spinors are not changed."), 0, 0, 1, 4)
+        for idx, space_input in enumerate(self.space_inputs, start=1):
+            layout.addWidget(space_input.label, idx, 0)
+            layout.addWidget(space_input.mode, idx, 1)
+            layout.addWidget(space_input.lower_input, idx, 2)
+            layout.addWidget(space_input.upper_input, idx, 3)
+        layout.addWidget(self.apply_button, len(self.space_inputs) + 1, 3)
+        self.setLayout(layout)
+
+    def get_windows(self) -> List[SpaceWindow]:
+        """
+        Raises:
+            ValueError: The input is not correct
+        """
+        inputs = [space_input.get_window() for space_input in self.space_inputs]
+        windows = [window for window in inputs if window is not None]
+        for window in windows:
+            window.validate()
+        return windows
+
+    def apply(self):
+        try:
+            windows = self.get_windows()
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Invalid input.\n\ndetails: {e}")
+            return
+        self.assign_requested.emit(windows)
+
+
+class SpaceAssignDialogAction(QAction):
+    def __init__(self):
+        super().__init__()
+        self.init_UI()
+
+    def init_UI(self):
+        self.space_assign_dialog = SpaceAssignDialog()
+        self.setText("Assign orbital spaces by energy window")
+        self.triggered.connect(self.openSpaceAssignDialog)
+
+    def openSpaceAssignDialog(self):
+        self.space_assign_dialog.show()
@@ -0,0 +1,157 @@
+from typing import List, Optional
+
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QAction, QDoubleValidator
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QDialog,
+    QGridLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
+)
+
+from dcaspt2_input_generator.components.data import table_data
+from dcaspt2_input_generator.utils.active_space_suggestion import (
+    ActiveSpaceSuggestion,
+    SuggestionOptions,
+    suggest_active_spaces,
+)
+from dcaspt2_input_generator.utils.memory_estimator import format_memory_size
+
+
+class SpinorNumberSpinBox(QSpinBox):
+    def __init__(self, default_num: int):
+        super().__init__()
+        self.setRange(0, 200)
+        self.setSingleStep(2)  # 1 row = 1 kramers pair = 2 spinors
+        self.setValue(default_num)
+
+
+# SuggestionDialog shows the active spaces suggested by utils/active_space_suggestion.py
+# The suggestions are recalculated whenever the options are changed (it takes a few milliseconds),
+# and the selected suggestion is applied to the table by the Apply button.
+# max occupied [16] max virtual [16] max ras1 [0] max ras3 [0]
+# AO labels [Uf Ud        ] max memory (GB) [      ]
+# | active space | electrons | memory | gap score | AO score | score |
+# (Apply)
+class SuggestionDialog(QDialog):
+    apply_requested = Signal(object)  # ActiveSpaceSuggestion
+    columns = ("active space", "electrons", "memory", "gap score", "AO score", "score")
+
+    def __init__(self):
+        super().__init__()
+        self.suggestions: List[ActiveSpaceSuggestion] = []
+        self.init_UI()
+
+    def init_UI(self):
+        self.setWindowTitle("Suggest active spaces")
+        self.resize(700, 400)
+        options = SuggestionOptions()
+        self.max_occupied_input = SpinorNumberSpinBox(options.max_occupied)
+        self.max_virtual_input = SpinorNumberSpinBox(options.max_virtual)
+        self.max_ras1_input = SpinorNumberSpinBox(options.max_ras1)
+        self.max_ras3_input = SpinorNumberSpinBox(options.max_ras3)
+        self.ao_labels_input = QLineEdit()
+        self.ao_labels_input.setPlaceholderText("e.g. Uf Ud")
+        self.max_memory_input = QLineEdit()
+        self.max_memory_input.setPlaceholderText("no limit")
+        self.max_memory_input.setValidator(QDoubleValidator(0.0, 1e9, 3))
+        for spin_box in (self.max_occupied_input, self.max_virtual_input, self.max_ras1_input, self.max_ras3_input):
+            spin_box.valueChanged.connect(self.update_suggestions)
+        self.ao_labels_input.editingFinished.connect(self.update_suggestions)
+        self.max_memory_input.editingFinished.connect(self.update_suggestions)
+        self.message = QLabel()
+
+        self.table = QTableWidget(0, len(self.columns))
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.doubleClicked.connect(self.apply)
+        self.apply_button = QPushButton("Apply")
+        self.apply_button.clicked.connect(self.apply)
+
+        layout = QGridLayout()
+        for column, (label, widget) in enumerate(
+            (
+                ("max occupied", self.max_occupied_input),
+                ("max virtual", self.max_virtual_input),
+                ("max ras1", self.max_ras1_input),
+                ("max ras3", self.max_ras3_input),
+            )
+        ):
+            layout.addWidget(QLabel(label), 0, 2 * column)
+            layout.addWidget(widget, 0, 2 * column + 1)
+        layout.addWidget(QLabel("AO labels"), 1, 0)
+        layout.addWidget(self.ao_labels_input, 1, 1, 1, 3)
+        layout.addWidget(QLabel("max memory (GB)"), 1, 4)
+        layout.addWidget(self.max_memory_input, 1, 5, 1, 3)
+        layout.addWidget(self.table, 2, 0, 1, 8)
+        layout.addWidget(self.message, 3, 0, 1, 6)
+        layout.addWidget(self.apply_button, 3, 7)
+        self.setLayout(layout)
+
+    def get_options(self) -> SuggestionOptions:
+        max_memory_gb: Optional[float] = None
+        try:
+            max_memory_gb = float(self.max_memory_input.text())
+        except ValueError:
+            pass
+        return SuggestionOptions(
+            max_occupied=self.max_occupied_input.value() // 2 * 2,
+            max_virtual=self.max_virtual_input.value() // 2 * 2,
+            max_ras1=self.max_ras1_input.value() // 2 * 2,
+            max_ras3=self.max_ras3_input.value() // 2 * 2,
+            ao_labels=tuple(self.ao_labels_input.text().replace(",", " ").split()),
+            max_memory=None if max_memory_gb is None else int(max_memory_gb * 1024**3),
+        )
+
+    def update_suggestions(self):
+        try:
+            self.suggestions = suggest_active_spaces(table_data, self.get_options())
+        except ValueError as e:
+            self.suggestions = []
+            self.message.setText(str(e))
+        else:
+            self.message.setText(f"{len(self.suggestions)} suggestions")
+        self.table.setRowCount(len(self.suggestions))
+        for row, suggestion in enumerate(self.suggestions):
+            texts = [
+                suggestion.name(),
+                str(suggestion.electrons),
+                format_memory_size(suggestion.memory),
+                f"{suggestion.gap_score:.3f}",
+                f"{suggestion.ao_score:.3f}",
+                f"{suggestion.score:.3f}",
+            ]
+            for column, text in enumerate(texts):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        self.table.resizeColumnsToContents()
+
+    def apply(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.suggestions):
+            self.apply_requested.emit(self.suggestions[row])
+
+    def showEvent(self, arg__1) -> None:
+        # The table may be reloaded while the dialog is hidden
+        self.update_suggestions()
+        return super().showEvent(arg__1)
+
+
+class SuggestionDialogAction(QAction):
+    def __init__(self):
+        super().__init__()
+        self.init_UI()
+
+    def init_UI(self):
+        self.suggestion_dialog = SuggestionDialog()
+        self.setText("Suggest active spaces")
+        self.triggered.connect(self.openSuggestionDialog)
+
+    def openSuggestionDialog(self):
+        self.suggestion_dialog.show()
@@ -0,0 +1,176 @@
+from array import array
+from typing import Any, Optional, Union
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QPersistentModelIndex, Qt
+from PySide6.QtGui import QColor
+
+from dcaspt2_input_generator.components.data import SortKey, colors, table_data
+
+ModelIndex = Union[QModelIndex, QPersistentModelIndex]
+
+
+# TableModel serves the rows of table_data.mo_data to TableWidget (QTableView).
+# No item objects are created for the cells,
+# the view asks the text and the background color of the visible cells only through data().
+# Columns: irrep, no. of spinor, energy (a.u.), AO type 1, percentage 1, AO type 2, percentage 2, ...
+# The background color of a row is a view of table_data.orbital_spaces[row].
+#
+# The rows of table_data are always in the energy order (the orbital spaces depend on it).
+# The display order (sort) is a permutation of the rows: the view row i shows the table_data row view_to_row[i].
+# Sorting only replaces the permutation (precomputed by TableData.get_sort_order) and emits layoutChanged.
+# Filtering (TableWidget.set_row_filter) restricts view_to_row to the matched rows, the other rows are not in the view
+# (row_to_view[row] == -1), so the hidden rows cost nothing unlike QTableView.setRowHidden.
+# The methods that take a "row" use the table_data row, index.row() is the view row.
+class TableModel(QAbstractTableModel):
+    column_before_ao_percentage = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sort_key = SortKey.ENERGY
+        self.descending = False
+        # None means the identity permutation (energy order, ascending)
+        self.view_to_row: Optional["array[int]"] = None
+        self.row_to_view: Optional["array[int]"] = None
+        # The rows matched by the filter in the energy order, None means all rows
+        self.visible_rows: Optional["array[int]"] = None
+
+    def rowCount(self, parent: ModelIndex = QModelIndex()) -> int:  # noqa: B008
+        if parent.isValid():
+            return 0
+        if self.view_to_row is not None:
+            return len(self.view_to_row)
+        return len(table_data.orbital_spaces)
+
+    def columnCount(self, parent: ModelIndex = QModelIndex()) -> int:  # noqa: B008
+        if parent.isValid():
+            return 0
+        return table_data.column_max_len
+
+    def data(self, index: ModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.cell_text(self.to_row(index.row()), index.column())
+        elif role == Qt.ItemDataRole.BackgroundRole:
+            return self.row_color(self.to_row(index.row()))
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Vertical:
+            # The row number in the energy order, the same in all display orders
+            return str(self.to_row(section) + 1)
+        header_data = ["irrep", "no. of spinor", "energy (a.u.)"]
+        init_header_len = len(header_data)
+        if section < init_header_len:
+            return header_data[section]
+        elif section % 2 == 0:
+            return f"percentage {(section-init_header_len)//2 + 1}"
+        else:
+            return f"AO type {(section-init_header_len)//2 + 1}"
+
+    def cell_text(self, row: int, column: int) -> str:
+        # Read the cell from the columns directly, MOData is not created per cell
+        mo_table = table_data.mo_data
+        if column == 0:
+            return mo_table.mo_symmetry(row)
+        elif column == 1:
+            return str(mo_table.mo_number[row])
+        elif column == 2:  # noqa: PLR2004
+            return str(mo_table.energy[row])
+        # percentage, ao_type
+        idx, is_percentage = divmod(column - self.column_before_ao_percentage, 2)
+        if idx >= mo_table.ao_len(row):
+            return ""
+        return str(mo_table.ao_percentage(row, idx)) if is_percentage else mo_table.ao_type(row, idx)
+
+    def to_row(self, view_row: int) -> int:
+        return view_row if self.view_to_row is None else self.view_to_row[view_row]
+
+    def to_view_row(self, row: int) -> int:
+        """Return the view row of the table_data row, -1 if the row is hidden by the filter"""
+        return row if self.row_to_view is None else self.row_to_view[row]
+
+    def sort_key_of_column(self, column: int) -> SortKey:
+        if column == 0:
+            return SortKey.IRREP
+        elif column == 1:
+            return SortKey.MO_NUMBER
+        elif column == 2:  # noqa: PLR2004
+            return SortKey.ENERGY
+        return SortKey.DOMINANT_AO  # AO type, percentage
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        """Called by QTableView when the header is clicked. Only the permutation of the rows is replaced."""
+        self.layoutAboutToBeChanged.emit()
+        old_view_to_row = self.view_to_row
+        persistent = self.persistentIndexList()
+        old_rows = [self.to_row(index.row()) for index in persistent]
+        self.set_display_order(self.sort_key_of_column(column), descending=order == Qt.SortOrder.DescendingOrder)
+        if old_view_to_row is not self.view_to_row:
+            # Keep the selection and the current index on the same table_data rows
+            new_indexes = [
+                self.index(self.to_view_row(row), index.column()) for row, index in zip(old_rows, persistent)
+            ]  # The hidden rows are not in persistent, to_view_row never returns -1 here
+            self.changePersistentIndexList(persistent, new_indexes)
+        self.layoutChanged.emit()
+
+    def set_display_order(self, sort_key: SortKey, *, descending: bool) -> None:
+        self.sort_key = sort_key
+        self.descending = descending
+        is_energy_order = sort_key == SortKey.ENERGY and not descending
+        visible_rows = self.visible_rows
+        if is_energy_order:
+            if visible_rows is None:
+                self.view_to_row = None
+                self.row_to_view = None
+                return
+            view_to_row = visible_rows
+        else:
+            order = table_data.get_sort_order(sort_key)
+            view_to_row = array("i", reversed(order)) if descending else order
+            if visible_rows is not None:
+                is_visible = bytearray(len(order))
+                for row in visible_rows:
+                    is_visible[row] = 1
+                view_to_row = array("i", [row for row in view_to_row if is_visible[row]])
+        row_to_view = array("i", [-1]) * len(table_data.orbital_spaces)
+        for view_row, row in enumerate(view_to_row):
+            row_to_view[row] = view_row
+        self.view_to_row = view_to_row
+        self.row_to_view = row_to_view
+
+    def set_visible_rows(self, visible_rows: Optional["array[int]"]) -> None:
+        """Show only visible_rows (table_data rows in the energy order), None shows all rows.
+        The display order is kept."""
+        self.beginResetModel()
+        self.visible_rows = visible_rows
+        self.set_display_order(self.sort_key, descending=self.descending)
+        self.endResetModel()
+
+    def reset_rows(self, visible_rows: Optional["array[int]"] = None) -> None:
+        """Reload all rows. Call this after table_data is reloaded. The display order is kept."""
+        self.set_visible_rows(visible_rows)
+
+    def row_color(self, row: int) -> QColor:
+        return colors.get_space_color_info(table_data.orbital_spaces[row]).color
+
+    def emit_rows_changed(self, first_row: int, last_row: int) -> None:
+        # Repaint only the changed rows (table_data rows first_row..last_row)
+        if first_row > last_row or self.rowCount() == 0:
+            return
+        if self.row_to_view is None:
+            first_view_row, last_view_row = first_row, last_row
+        elif last_row - first_row + 1 == len(self.row_to_view):
+            first_view_row, last_view_row = 0, self.rowCount() - 1
+        else:
+            view_rows = [view_row for view_row in self.row_to_view[first_row : last_row + 1] if view_row >= 0]
+            if not view_rows:  # All changed rows are hidden by the filter
+                return
+            first_view_row, last_view_row = min(view_rows), max(view_rows)
+        self.dataChanged.emit(
+            self.index(first_view_row, 0),
+            self.index(last_view_row, self.columnCount() - 1),
+            [Qt.ItemDataRole.BackgroundRole],
+        )
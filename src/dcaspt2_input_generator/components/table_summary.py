@@ -130,18 +130,20 @@ class TableSummary(QWidget):
         self.user_input = UserInput()
         self.recommended_moltra = QLabel("Recommended MOLTRA setting")
         self.point_group = QLabel("Point Group")
+        self.ci_space = QLabel("CI space")
 
         self.summaryLayout.addWidget(QLabel("Summary of the number of spinors"), 0, 0)
         self.summaryLayout.addLayout(self.spinor_summary, 1, 0)
         self.summaryLayout.addWidget(self.recommended_moltra, 2, 0)
         self.summaryLayout.addWidget(self.point_group, 3, 0)
+        self.summaryLayout.addWidget(self.ci_space, 4, 0)
 
         line = QFrame()
         line.setFrameShape(QFrame.Shape.HLine)
         line.setFrameShadow(QFrame.Shadow.Sunken)
-        self.summaryLayout.addWidget(line, 4, 0)
+        self.summaryLayout.addWidget(line, 5, 0)
 
-        self.summaryLayout.addWidget(QLabel("User Input"), 5, 0)
-        self.summaryLayout.addLayout(self.user_input, 6, 0)
+        self.summaryLayout.addWidget(QLabel("User Input"), 6, 0)
+        self.summaryLayout.addLayout(self.user_input, 7, 0)
 
         self.setLayout(self.summaryLayout)
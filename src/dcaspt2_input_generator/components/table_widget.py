@@ -1,273 +1,211 @@
+from array import array
 from pathlib import Path
-from typing import List
-
-from dcaspt2_input_generator.components.data import Color, colors, table_data
+from typing import List, Optional, Sequence, Tuple
+
+from dcaspt2_input_generator.components.data import OrbitalSpace, colors, table_data
+from dcaspt2_input_generator.components.table_model import TableModel
+from dcaspt2_input_generator.utils.dir_info import dir_info
+from dcaspt2_input_generator.utils.profiler import profiled, span
+from dcaspt2_input_generator.utils.selection import SpaceWindow, resolve_space_windows, select_by_electron_window
+from dcaspt2_input_generator.utils.table_index import RowFilter, TableIndex
+from dcaspt2_input_generator.utils.table_snapshot import TableSnapshotCache
 from dcaspt2_input_generator.utils.utils import debug_print
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QAction, QColor
-from PySide6.QtWidgets import QMenu, QTableWidget, QTableWidgetItem, QCommonStyle
+from PySide6.QtGui import QAction
+from PySide6.QtWidgets import QCommonStyle, QMenu, QStyle, QTableView
 
 
 # TableWidget is the widget that displays the output data
-# It is a extended class of QTableWidget
+# It is a extended class of QTableView, the data is served by TableModel
 # It has the following features:
 # 1. Load the output data from the file "data.out"
 # 2. Reload the output data
 # 3. Show the context menu when right click
-# 4. Change the background color of the selected cells
+# 4. Change the background color of the selected rows
 # 5. Emit the color_changed signal when the background color is changed
+# 6. Show only the rows matched by the filter (FilterBar), answered by TableIndex built once per loaded table
 # Display the output data like the following:
-# irrep              no. of spinor    energy (a.u.)    percentage 1    AO type 1    percentage 2    AO type 2    ...
-# E1u                1                -9.631           33.333          B3uArpx      33.333          B2uArpy      ...
-# E1u                2                -9.546           50.000          B3uArpx      50.000          B2uArpy      ...
+# irrep              no. of spinor    energy (a.u.)    AO type 1    percentage 1    AO type 2    percentage 2    ...
+# E1u                1                -9.631           B3uArpx      33.333          B2uArpy      33.333          ...
+# E1u                2                -9.546           B3uArpx      50.000          B2uArpy      50.000          ...
 # ...
-class TableWidget(QTableWidget):
-    color_changed = Signal()
+class TableWidget(QTableView):
+    # Emits the SpaceChange of the assignment, or None when the whole table is reloaded
+    color_changed = Signal(object)
+    # Number of the rows whose text is measured by resize_columns
+    column_width_sample_rows = 100
 
     def __init__(self):
         debug_print("TableWidget init")
         super().__init__()
+        self.table_model = TableModel(self)
+        self.table_snapshot_cache = TableSnapshotCache(dir_info.table_snapshot_dir)
+        self.table_index: Optional[TableIndex] = None
+        self.row_filter = RowFilter()
+        self.setModel(self.table_model)
         self.setStyle(QCommonStyle())
-        self.setStyleSheet("QTableWidget{color:black}")
+        self.setStyleSheet("QTableView{color:black}")
         # Set the context menu policy to custom context menu
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
-        self.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        # QTableWidget.ContiguousSelection: Multiple ranges selection is impossible.
+        self.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        # QTableView.ContiguousSelection: Multiple ranges selection is impossible.
         # https://doc.qt.io/qt-6/qabstractitemview.html#SelectionMode-enum
-        self.setSelectionMode(QTableWidget.SelectionMode.ContiguousSelection)
+        self.setSelectionMode(QTableView.SelectionMode.ContiguousSelection)
+        # Click the header to change the display order (TableModel.sort), energy (ascending) by default
+        self.horizontalHeader().setSortIndicator(2, Qt.SortOrder.AscendingOrder)
+        self.setSortingEnabled(True)
 
     def reload(self, output_file_path: Path):
         debug_print("TableWidget reload")
         self.load_output(output_file_path)
 
-    def update_index_info(self):
-        # Reset information
-        table_data.idx_info.reset()
-
-        # Update information
-        for row in range(self.rowCount()):
-            row_color = self.item(row, 0).background().color()
-            color_info = colors.get_color_info(row_color)
-            table_data.idx_info.update_idx_info(row, color_info.name)
+    def rowCount(self) -> int:
+        return self.table_model.rowCount()
 
+    @profiled("create_table")
     def create_table(self):
         debug_print("TableWidget create_table")
-        self.clear()
-        rows = table_data.mo_data
-        rows.sort(key=lambda x: (x.energy))
-        self.setRowCount(len(rows))
-        self.setColumnCount(table_data.column_max_len)
-
-        rem_electrons = table_data.header_info.electron_number
-        active_cnt = 0
-
-        for row_idx, row in enumerate(rows):
-            # Default CAS configuration is CAS(4,8) (4electrons, 8spinors)
-            key = row.mo_symmetry
-            moltra_info = table_data.header_info.moltra_info[key]
-            if not moltra_info.get(row.mo_number, False):
-                color_info = colors.not_used  # not in MOLTRA
-            elif rem_electrons > 4:
-                color_info = colors.inactive
-            elif active_cnt < 8:
-                active_cnt += 2
-                color_info = colors.active
-            else:
-                color_info = colors.secondary
-
-            rem_electrons -= 2
-            color = color_info.color
-            self.setItem(row_idx, 0, QTableWidgetItem(row.mo_symmetry))
-            self.setItem(row_idx, 1, QTableWidgetItem(str(row.mo_number)))
-            self.setItem(row_idx, 2, QTableWidgetItem(str(row.energy)))
-            # percentage, ao_type
-            column_before_ao_percentage = 3
-            for idx in range(table_data.column_max_len - column_before_ao_percentage):
-                try:
-                    ao_type = QTableWidgetItem(row.ao_type[idx])
-                    ao_percentage = QTableWidgetItem(str(row.percentage[idx]))
-                except IndexError:
-                    ao_type = QTableWidgetItem("")
-                    ao_percentage = QTableWidgetItem("")
-                ao_type.setBackground(color)
-                ao_percentage.setBackground(color)
-                ao_type_column = column_before_ao_percentage + 2 * idx
-                ao_percentage_column = ao_type_column + 1
-                self.setItem(row_idx, ao_type_column, ao_type)
-                self.setItem(row_idx, ao_percentage_column, ao_percentage)
-
-            for idx in range(table_data.column_max_len):
-                self.item(row_idx, idx).setBackground(color)
-        self.update_index_info()
-
-    def set_column_header_items(self):
-        header_data = ["irrep", "no. of spinor", "energy (a.u.)"]
-        init_header_len = len(header_data)
-        additional_header = []
-        for idx in range(init_header_len, table_data.column_max_len):
-            if idx % 2 == 0:
-                additional_header.append(f"percentage {(idx-init_header_len)//2 + 1}")
-            else:
-                additional_header.append(f"AO type {(idx-init_header_len)//2 + 1}")
-
-        header_data.extend(additional_header)
-        self.setHorizontalHeaderLabels(header_data)
-
+        with span("sort"):
+            table_data.sort_by_energy()
+
+        # Default CAS configuration is CAS(4,8) (4electrons, 8spinors)
+        table_data.set_orbital_spaces(select_by_electron_window(table_data, nelec=4, nact=8))
+        with span("build index"):
+            self.table_index = TableIndex(table_data)
+        with span("reset_rows"):
+            # The filter is kept across the reloads
+            self.table_model.reset_rows(self.filtered_rows())
+
+    def filtered_rows(self) -> Optional["array[int]"]:
+        if self.table_index is None or self.row_filter.is_empty():
+            return None
+        return self.table_index.filter_rows(self.row_filter)
+
+    def set_row_filter(self, row_filter: RowFilter):
+        """Show only the rows matched by row_filter, the empty filter shows all rows"""
+        self.row_filter = row_filter
+        with span("filter"):
+            self.table_model.set_visible_rows(self.filtered_rows())
+
+    @profiled("resize_columns")
     def resize_columns(self):
-        self.resizeColumnsToContents()
+        # resizeColumnsToContents measures the text of all cells, O(rows x columns).
+        # Instead, the width is estimated from the maximum text length of the column recorded by the parser
+        # (MOTable.text_len) and the text of the sampled rows is measured, so the cost does not depend on the rows.
+        metrics = self.fontMetrics()
+        char_width = max(metrics.averageCharWidth(), metrics.horizontalAdvance("0"))
+        # Same as the margin of QStyledItemDelegate.sizeHint and the grid line
+        focus_margin = self.style().pixelMetric(QStyle.PixelMetric.PM_FocusFrameHMargin, None, self)
+        margin = 2 * (focus_margin + 1) + 1
+        text_len = table_data.mo_data.text_len
+        sample_rows = self.get_sample_rows()
         for idx in range(table_data.column_max_len):
+            estimated = text_len[idx] * char_width if idx < len(text_len) else 0
+            texts = (self.table_model.cell_text(row, idx) for row in sample_rows)
+            sampled = max((metrics.horizontalAdvance(text) for text in texts), default=0)
+            header = self.horizontalHeader().sectionSizeHint(idx)
+            width = max(estimated + margin, sampled + margin, header)
             if idx == 0:  # irrep
-                self.setColumnWidth(idx, self.columnWidth(idx) + 20)
+                self.setColumnWidth(idx, width + 20)
             elif idx == 1 or idx % 2 == 0:  # no. of spinor, percentage
-                self.setColumnWidth(idx, self.columnWidth(idx) + 10)
+                self.setColumnWidth(idx, width + 10)
             else:  # energy, AO type
-                self.setColumnWidth(idx, self.columnWidth(idx) + 5)
-
-    def load_output(self, file_path: Path):
-        def set_table_data(rows: List[List[str]]):
-            try:
-                header = True
-                for row in rows:
-                    if header:
-                        if len(row) <= 1:  # Empty line, end of header
-                            header = False
-                    else:
-                        if len(row) == 0:
-                            continue
-                        table_data.add_mo_data(row)
-                        table_data.column_max_len = max(table_data.column_max_len, len(row))
-            except ValueError as e:
-                msg = "The output file is not correct, ValueError"
-                raise ValueError(msg) from e
-            except IndexError as e:
-                msg = "The output file is not correct, IndexError"
-                raise IndexError(msg) from e
+                self.setColumnWidth(idx, width + 5)
 
-        def read_header(rows: List[List[str]]):
-            try:
-                for idx, row in enumerate(rows):
-                    if len(row) <= 1:  # Empty line, end of header
-                        break
-                    elif idx == 0:
-                        # 1st line: Read key-value info
-                        # (e.g.) electron_num 18 point_group D2h moltra_scheme default
-                        if len(row) % 2 != 0:
-                            msg = f"1st header line must be even elements because this line is for key-value info.\
-len(1st header)={len(row)}"
-                            raise IndexError(msg)
+    def get_sample_rows(self) -> range:
+        # Evenly spaced table_data rows (including the rows hidden by the filter), at most column_width_sample_rows rows
+        row_num = len(table_data.mo_data)
+        step = max(1, -(-row_num // self.column_width_sample_rows))  # ceil
+        return range(0, row_num, step)
 
-                        for key_idx in range(0, len(row), 2):  # loop only key
-                            key = row[key_idx]
-                            value = row[key_idx + 1]
-                            if key == "electron_num":
-                                table_data.header_info.update_electron_number(int(value))
-                            elif key == "point_group":
-                                table_data.header_info.update_point_group(value)
-                            elif key == "moltra_scheme":
-                                table_data.header_info.update_moltra_scheme(value)
-                    elif idx == 1:
-                        # 2nd line: MOLTRA range
-                        # (e.g.) E1g 16..85 E1u 11..91
-                        table_data.header_info.read_moltra_info(row)
-                    elif idx == 2:
-                        # 3rd line: Eigenvalue info
-                        # (e.g.) E1g closed 6 open 0 virtual 30 E1u closed 10 open 0 virtual 40
-                        # => table_data.header_info.spinor_num_info = {"E1g": SpinorNumber(6, 0, 30, 36),
-                        #                                              "E1u": SpinorNumber(10, 0, 40, 50)}
-                        table_data.header_info.read_spinor_num_info(row)
-                    else:
-                        # Skip unknown header info line
-                        continue
-            except ValueError as e:
-                msg = "The output file is not correct, ValueError"
-                raise ValueError(msg) from e
-            except IndexError as e:
-                msg = "The output file is not correct, IndexError"
-                raise IndexError(msg) from e
+    def load_output(self, file_path: Path):
+        self.table_snapshot_cache.load_output(file_path, table_data)
+        self.show_table()
 
-        table_data.reset()
-        rows = [line.split() for line in open(file_path).readlines()]
-        # output is space separated file
-        read_header(rows)
-        set_table_data(rows)
-        table_data.validate()
+    def show_table(self):
         self.create_table()
-        self.set_column_header_items()
         self.resize_columns()
-        self.color_changed.emit()
+        with span("color_changed"):  # summary refresh and IVO input
+            self.color_changed.emit(None)
+
+    def selected_rows(self) -> List[int]:
+        """Return the table_data rows (energy order) of the selected view rows"""
+        selection = self.selectionModel().selection()
+        ranges = [selection.at(i) for i in range(selection.count())]
+        view_rows = {view_row for r in ranges for view_row in range(r.top(), r.bottom() + 1)}
+        return sorted(self.table_model.to_row(view_row) for view_row in view_rows)
 
     def show_context_menu(self, position):
         menu = QMenu()
-        ranges = self.selectedRanges()
-        selected_rows: List[int] = []
-        for r in ranges:
-            selected_rows.extend(range(r.topRow(), r.bottomRow() + 1))
+        selected_rows = self.selected_rows()
+        if not selected_rows:
+            return
 
+        # The first and last selected rows in the energy order (the view may be sorted by the other key)
         top_row = selected_rows[0]
         bottom_row = selected_rows[-1]
 
         # Show the inactive action
         if table_data.idx_info.should_show_inactive_action_menu(top_row):
             inactive_action = QAction(colors.inactive.icon, colors.inactive.message)
-            inactive_action.triggered.connect(lambda: self.change_background_color(colors.inactive.color))
+            inactive_action.triggered.connect(lambda: self.change_orbital_space(OrbitalSpace.INACTIVE))
             menu.addAction(inactive_action)
 
         # Show the secondary action
         if table_data.idx_info.should_show_secondary_action_menu(bottom_row):
             secondary_action = QAction(colors.secondary.icon, colors.secondary.message)
-            secondary_action.triggered.connect(lambda: self.change_background_color(colors.secondary.color))
+            secondary_action.triggered.connect(lambda: self.change_orbital_space(OrbitalSpace.SECONDARY))
             menu.addAction(secondary_action)
 
         # Show the active action
         ras1_action = QAction(colors.ras1.icon, colors.ras1.message)
-        ras1_action.triggered.connect(lambda: self.change_background_color(colors.ras1.color))
+        ras1_action.triggered.connect(lambda: self.change_orbital_space(OrbitalSpace.RAS1))
         menu.addAction(ras1_action)
 
         active_action = QAction(colors.active.icon, colors.active.message)
-        active_action.triggered.connect(lambda: self.change_background_color(colors.active.color))
+        active_action.triggered.connect(lambda: self.change_orbital_space(OrbitalSpace.ACTIVE))
         menu.addAction(active_action)
 
         ras3_action = QAction(colors.ras3.icon, colors.ras3.message)
-        ras3_action.triggered.connect(lambda: self.change_background_color(colors.ras3.color))
+        ras3_action.triggered.connect(lambda: self.change_orbital_space(OrbitalSpace.RAS3))
         menu.addAction(ras3_action)
 
         not_used_action = QAction(colors.not_used.icon, colors.not_used.message)
-        not_used_action.triggered.connect(lambda: self.change_background_color(colors.not_used.color))
+        not_used_action.triggered.connect(lambda: self.change_orbital_space(OrbitalSpace.NOT_USED))
         menu.addAction(not_used_action)
 
         menu.exec_(self.viewport().mapToGlobal(position))
 
-    def change_selected_rows_background_color(self, row, color: QColor):
-        for column in range(self.columnCount()):
-            item = self.item(row, column)
-            if item is not None:
-                item.setBackground(color)
-
-    def change_background_color(self, color):
-        indexes = self.selectedIndexes()
-        rows = {index.row() for index in indexes}
-        for row in rows:
-            self.change_selected_rows_background_color(row, color)
-        self.update_index_info()
-        self.color_changed.emit()
-
-    def update_color(self, prev_color: Color):
+    def change_orbital_space(self, space: OrbitalSpace):
+        self.assign_rows(self.selected_rows(), space)
+
+    def assign_rows(self, rows: List[int], space: OrbitalSpace):
+        """Assign space to the rows (energy order, sorted) in one batched update"""
+        if not rows:
+            return
+        change = table_data.assign_orbital_space(rows, space)
+        self.table_model.emit_rows_changed(rows[0], rows[-1])
+        self.color_changed.emit(change)
+
+    def assign_space_windows(self, windows: Sequence[SpaceWindow]):
+        """Assign the orbital spaces of all windows in one batched update (one color_changed emission)
+
+        Raises:
+            ValueError: A window is not correct
+        """
+        self.assign_row_ranges(resolve_space_windows(table_data, windows))
+
+    def assign_row_ranges(self, assignments: Sequence[Tuple[range, OrbitalSpace]]):
+        """Assign the orbital space to each row range (energy order) in one batched update"""
+        with span("assign row ranges"):
+            change = table_data.assign_row_ranges(assignments)
+        if not change.rows:
+            return
+        self.table_model.emit_rows_changed(change.rows[0], change.rows[-1])
+        self.color_changed.emit(change)
+
+    def update_color(self):
         debug_print("update_color")
-        color_mappping = {
-            prev_color.inactive.color.name(): colors.inactive.color,
-            prev_color.ras1.color.name(): colors.ras1.color,
-            prev_color.active.color.name(): colors.active.color,
-            prev_color.ras3.color.name(): colors.ras3.color,
-            prev_color.secondary.color.name(): colors.secondary.color,
-        }
-
-        for row in range(self.rowCount()):
-            item = self.item(row, 0)
-            if item is None:
-                continue
-            color = item.background().color()
-            new_color = color_mappping.get(color.name())
-            if new_color:
-                self.change_selected_rows_background_color(row, new_color)
-        self.color_changed.emit()
+        # The orbital spaces are not changed, only repaint the rows with the new color theme
+        self.table_model.emit_rows_changed(0, len(table_data.orbital_spaces) - 1)
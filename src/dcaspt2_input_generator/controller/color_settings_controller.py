@@ -20,4 +20,4 @@ class ColorSettingsController:
         color_type_str = self.dialog.buttonGroup.checkedButton().text()
         colors.change_color_templates(color_type_str)
         if prev_color != colors:
-            self.table_widget.update_color(prev_color)
+            self.table_widget.update_color()
@@ -4,7 +4,7 @@ from dcaspt2_input_generator.components.data import Color
 from dcaspt2_input_generator.components.menu_bar import SaveDefaultSettingsAction
 from dcaspt2_input_generator.components.table_summary import UserInput
 from dcaspt2_input_generator.utils.dir_info import dir_info
-from dcaspt2_input_generator.utils.settings import MultiProcess
+from dcaspt2_input_generator.utils.settings import MultiProcess, Settings
 from dcaspt2_input_generator.utils.utils import debug_print
 
 
@@ -34,6 +34,8 @@ class SaveDefaultSettingsController:
         multi_process_num = self.multi_process_input.multi_process_num
         user_input["multi_process_num"] = multi_process_num
         setting_file_path = dir_info.setting_file_path
+        if not setting_file_path.exists():
+            Settings().create_default_settings_file()  # Removed after the application has started
         with open(setting_file_path) as f:
             settings = json.load(f)
             debug_print(settings)
@@ -0,0 +1,188 @@
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QElapsedTimer, QObject, QProcess, Qt, QTimer, Signal
+from PySide6.QtWidgets import QProgressDialog, QWidget
+
+from dcaspt2_input_generator.utils.profiler import now, record_span
+from dcaspt2_input_generator.utils.sum_dirac_dfcoef import (
+    check_version,
+    create_error_message,
+    create_sum_dirac_dfcoef_command,
+    get_executable,
+    get_sum_dirac_dfcoef_options,
+)
+from dcaspt2_input_generator.utils.sum_dirac_dfcoef_cache import SumDiracDfcoefCache
+from dcaspt2_input_generator.utils.utils import debug_print
+
+
+# SumDiracDfcoefRunner runs the sum_dirac_dfcoef program without blocking the GUI thread.
+# The version of sum_dirac_dfcoef is checked before the job is queued (it is a part of the cache key),
+# then the cached result is reused or sum_dirac_dfcoef is run and the result is stored to the cache.
+# The process is driven only by the signals of QProcess.
+# The progress dialog is shown while the job is running and the job can be canceled from it.
+# The stderr is read after the process has finished.
+# The output is loaded after the process has finished, because sum_dirac_dfcoef writes the whole output
+# at the end of the run (after all MO coefficients are summarized), so no row can be shown while it is running.
+class SumDiracDfcoefRunner(QObject):
+    # Emits the path of the sum_dirac_dfcoef output
+    finished = Signal(Path)
+    # Emits the error message
+    failed = Signal(str)
+    canceled = Signal()
+
+    def __init__(
+        self,
+        cache: SumDiracDfcoefCache,
+        parent: Optional[QWidget] = None,
+        timeout_sec: int = 3600,
+    ):
+        super().__init__(parent)
+        self.parent_widget = parent
+        self.cache = cache
+        self.timeout_sec = timeout_sec
+        self.running = False
+        self.timed_out = False
+        self.file_path = Path()
+        self.output_path = Path()
+        self.num_process = 1
+        self.command = ""
+        self.start_time = 0.0  # profiler.now() when the process is started
+        self.cache_key = ""
+
+        self.process = QProcess(self)
+        self.process.finished.connect(self.on_process_finished)
+        self.process.errorOccurred.connect(self.on_process_error)
+
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self.on_timeout)
+        self.elapsed_timer = QElapsedTimer()
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(1000)  # ms
+        self.progress_timer.timeout.connect(self.update_progress)
+        self.progress_dialog: Optional[QProgressDialog] = None
+
+    def is_running(self) -> bool:
+        return self.running
+
+    def start(self, file_path: Path, output_path: Path, num_process: int) -> None:
+        """Start the job. The running job (if any) is stopped without emitting any signal.
+        finished or failed is emitted before returning if the process is not needed (cache hit or error)."""
+        self.stop()
+        self.file_path = Path(file_path)
+        self.output_path = Path(output_path)
+        self.num_process = num_process
+        try:
+            # Fail fast before the process is started
+            self.cache_key = self.cache.create_key(self.file_path, check_version())
+            cached_path = self.cache.lookup(self.cache_key)
+            if cached_path is not None:
+                # The same DIRAC output has already been summarized by the same sum_dirac_dfcoef, reuse the result
+                shutil.copyfile(cached_path, self.output_path)
+                self.finished.emit(self.output_path)
+                return
+        except Exception as e:
+            self.failed.emit(f"An error has ocurred before running the sum_dirac_dfcoef program.\n\
+file_path: {self.file_path}\n\n\ndetails: {e}")
+            return
+
+        self.running = True
+        self.timed_out = False
+        self.elapsed_timer.start()
+        self.timeout_timer.start(self.timeout_sec * 1000)
+        self.show_progress()
+        self.command = create_sum_dirac_dfcoef_command(self.file_path, self.output_path, self.num_process)
+        self.start_time = now()
+        debug_print(f"sum_dirac_dfcoef runner: {self.command}")
+        executable = get_executable()
+        options = get_sum_dirac_dfcoef_options(self.file_path, self.output_path, self.num_process)
+        self.process.start(executable[0], [*executable[1:], *options])
+
+    def cancel(self) -> None:
+        """Cancel the running job. canceled is emitted."""
+        if not self.is_running():
+            return
+        self.stop()
+        self.canceled.emit()
+
+    def stop(self) -> None:
+        self.running = False  # Ignore the finished signal of the killed process
+        if self.process.state() != QProcess.ProcessState.NotRunning:
+            self.process.kill()
+            self.process.waitForFinished()
+        self.timeout_timer.stop()
+        self.close_progress()
+
+    def on_process_finished(self, exit_code: int, exit_status: QProcess.ExitStatus) -> None:
+        if not self.running:
+            return  # stopped
+        if self.timed_out:
+            self.fail(f"The sum_dirac_dfcoef program did not finish in {self.timeout_sec} seconds, so it was stopped.\n\
+path: {self.file_path}")
+            return
+        if exit_status != QProcess.ExitStatus.NormalExit or exit_code != 0:
+            err_msg = create_error_message(self.file_path, self.command, self.read_stderr())
+            self.fail(f"It seems that the sum_dirac_dfcoef program has failed.\n\
+Please check the output file. Is this DIRAC output file?\npath: {self.file_path}\n\n\ndetails: {err_msg}")
+            return
+
+        try:
+            self.cache.store(self.cache_key, self.output_path)
+        except OSError as e:
+            # The cache is optional, the output is already created
+            debug_print(f"Failed to store the sum_dirac_dfcoef output to the cache: {e}")
+        self.succeed()
+
+    def on_process_error(self, error: QProcess.ProcessError) -> None:
+        # finished is not emitted if the process could not be started
+        if error == QProcess.ProcessError.FailedToStart and self.running:
+            self.fail(f"Failed to start the sum_dirac_dfcoef program.\n\ndetails: {self.process.errorString()}")
+
+    def on_timeout(self) -> None:
+        if self.process.state() != QProcess.ProcessState.NotRunning:
+            self.timed_out = True
+            self.process.kill()  # finished is emitted after the process is killed
+
+    def read_stderr(self) -> str:
+        return bytes(self.process.readAllStandardError().data()).decode(errors="replace")
+
+    def succeed(self) -> None:
+        self.running = False
+        self.timeout_timer.stop()
+        record_span("sum_dirac_dfcoef", self.start_time, file=self.file_path)
+        self.close_progress()
+        self.finished.emit(self.output_path)
+
+    def fail(self, message: str) -> None:
+        self.running = False
+        self.timeout_timer.stop()
+        record_span("sum_dirac_dfcoef (failed)", self.start_time, file=self.file_path)
+        self.close_progress()
+        self.failed.emit(message)
+
+    def show_progress(self) -> None:
+        # Busy indicator (minimum == maximum == 0), shown only if the job takes longer than minimumDuration
+        self.progress_dialog = QProgressDialog("Running sum_dirac_dfcoef...", "Cancel", 0, 0, self.parent_widget)
+        self.progress_dialog.setWindowTitle("sum_dirac_dfcoef")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(500)  # ms
+        self.progress_dialog.canceled.connect(self.cancel)
+        self.progress_dialog.setValue(0)
+        self.progress_timer.start()
+
+    def update_progress(self) -> None:
+        if self.progress_dialog is not None:
+            elapsed_sec = self.elapsed_timer.elapsed() // 1000
+            label = f"Running sum_dirac_dfcoef... ({elapsed_sec} s)\n{self.file_path.name}"
+            self.progress_dialog.setLabelText(label)
+
+    def close_progress(self) -> None:
+        self.progress_timer.stop()
+        if self.progress_dialog is not None:
+            progress_dialog, self.progress_dialog = self.progress_dialog, None
+            # Do not emit canceled by closing the dialog
+            progress_dialog.canceled.disconnect(self.cancel)
+            progress_dialog.close()
+            progress_dialog.deleteLater()
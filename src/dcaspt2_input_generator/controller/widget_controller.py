@@ -1,121 +1,122 @@
-from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
 
-from dcaspt2_input_generator.components.data import colors, table_data
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from dcaspt2_input_generator.components.data import OrbitalSpace, SpaceChange, table_data
 from dcaspt2_input_generator.components.table_summary import TableSummary
 from dcaspt2_input_generator.components.table_widget import TableWidget
-from dcaspt2_input_generator.utils.dir_info import dir_info
+from dcaspt2_input_generator.utils.ci_estimator import estimate_ci_space
+from dcaspt2_input_generator.utils.file_writer import BackgroundFileWriter
+from dcaspt2_input_generator.utils.input_generator import create_ivo_input
+from dcaspt2_input_generator.utils.memory_estimator import estimate_memory_breakdowns, format_memory_size
+from dcaspt2_input_generator.utils.profiler import profiled
+from dcaspt2_input_generator.utils.space_summary import SpaceSummary
+
 
+class WidgetController(QObject):
+    # Emitted in the background thread of the writer, the slots are called in the GUI thread (queued connection)
+    ivo_input_failed = Signal(str)
 
-class WidgetController:
     def __init__(self, table_summary: TableSummary, table_widget: TableWidget):
+        super().__init__()
         self.table_summary = table_summary
         self.table_widget = table_widget
+        self.space_summary = SpaceSummary()
+        # active.ivo.inp is written in the background thread to the workspace of the document (set_ivo_input_path).
+        # Bursts of changes (e.g. rapid right-click assignments) are coalesced into one write by the timer.
+        self.ivo_input_writer: Optional[BackgroundFileWriter] = None
+        self.ivo_input_timer = QTimer()
+        self.ivo_input_timer.setSingleShot(True)
+        self.ivo_input_timer.setInterval(200)  # ms
+        self.ivo_input_timer.timeout.connect(self.writeIVOInput)
 
         # Connect signals and slots
         self.table_summary.user_input.changed.connect(self.onUserInputChanged)
-        # change_background_color is a slot
+        # The CI space depends on the RAS constraints
+        self.table_summary.user_input.ras1_max_hole_number.textChanged.connect(self.updateCISpace)
+        self.table_summary.user_input.ras3_max_electron_number.textChanged.connect(self.updateCISpace)
+        # change_orbital_space is a slot
         self.table_widget.color_changed.connect(self.onTableWidgetColorChanged)
 
     def handleIVOInput(self):
-        """Create standard input for IVO"""
+        """Schedule the update of the standard input for IVO"""
+        # (Re)start the timer, the input is written after the changes stop for the interval
+        self.ivo_input_timer.start()
 
-        # Create info for standard IVO input
-        # E1g,u or E1?
-        is_gerade_ungerade = True if table_data.header_info.spinor_num_info.keys() == {"E1g", "E1u"} else False
-        if is_gerade_ungerade:
-            nocc = {"E1g": 0, "E1u": 0}
-            nvcut = {"E1g": 0, "E1u": 0}
-        else:
-            nocc = {"E1": 0}
-            nvcut = {"E1": 0}
-        act = 0
-        sec = 0
-        rem_electrons = table_data.header_info.electron_number
-        row_count = self.table_widget.rowCount()
-        for row in range(row_count):
-            item = self.table_widget.item(row, 0)
-            color = item.background()
-            sym_str = item.text()
-
-            # nocc, nvcut
-            if rem_electrons > 0:
-                nocc[sym_str] += 1
-            elif color != colors.not_used.color:
-                # Reset nvcut
-                for k in nvcut.keys():
-                    nvcut[k] = 0
-            else:
-                nvcut[sym_str] += 1
-
-            # act, sec
-            if color == colors.not_used.color:
-                pass
-            elif rem_electrons > 0:
-                act += 2
-            else:
-                sec += 2
-            rem_electrons -= 2
-
-        # Create standard IVO input
-        output = ".ninact\n0\n"
-        output += f".nact\n{act}\n"
-        output += f".nsec\n{sec}\n"
-        output += f".nelec\n{act}\n"
-        if is_gerade_ungerade:
-            output += f".noccg\n{nocc['E1g']}\n.noccu\n{nocc['E1u']}\n"
-            output += "" if sum(nvcut.values()) == 0 else f".nvcutg\n{nvcut['E1g']}\n.nvcutu\n{nvcut['E1u']}\n"
-        else:
-            output += f".nocc\n{nocc['E1']}\n"
-            output += "" if sum(nvcut.values()) == 0 else f".nvcut\n{nvcut['E1']}\n"
-        output += f".totsym\n{self.table_summary.user_input.totsym_number.get_value()}\n"
-        output += f".diracver\n{self.table_summary.user_input.dirac_ver_number.get_value()}\n"
-        if table_data.header_info.moltra_scheme is not None:
-            output += f".scheme\n{table_data.header_info.moltra_scheme}\n"  # Explicitly set MOLTRA scheme.
-        output += ".subprograms\nIVO\n"
-        output += ".end\n"
+    def writeIVOInput(self):
+        """Create standard input for IVO"""
+        if self.ivo_input_writer is None:
+            return  # No document is loaded
+        output = create_ivo_input(
+            table_data,
+            table_data.orbital_spaces,
+            totsym=self.table_summary.user_input.totsym_number.get_value(),
+            dirac_ver=self.table_summary.user_input.dirac_ver_number.get_value(),
+        )
 
         # Save standard IVO input (replace active.ivo.inp)
-        with open(dir_info.ivo_input_path, "w") as f:
-            f.write(output)
+        self.ivo_input_writer.write(output)
+
+    def set_ivo_input_path(self, ivo_input_path: Path):
+        """Write the IVO input to ivo_input_path (e.g. the workspace of the newly loaded document)"""
+        self.ivo_input_timer.stop()
+        if self.ivo_input_writer is not None:
+            self.ivo_input_writer.close()
+        self.ivo_input_writer = BackgroundFileWriter(
+            ivo_input_path, on_error=lambda e: self.ivo_input_failed.emit(f"Failed to write {ivo_input_path}: {e}")
+        )
+        self.handleIVOInput()
+
+    def close(self):
+        # Write the pending IVO input before the application exits
+        if self.ivo_input_timer.isActive():
+            self.ivo_input_timer.stop()
+            self.writeIVOInput()
+        if self.ivo_input_writer is not None:
+            self.ivo_input_writer.close()
 
     def onUserInputChanged(self):
         self.handleIVOInput()
 
-    def onTableWidgetColorChanged(self):
-        def get_max_mem_str(estimated_max_mem: int) -> str:
-            kb = 1024
-            mb = kb ** 2
-            gb = kb ** 3
-            if estimated_max_mem < kb:  # byte
-                return f"{estimated_max_mem} byte"
-            elif estimated_max_mem < mb:  # KB
-                mem = float(estimated_max_mem) / kb
-                return f"{mem:.3f} KB"
-            elif estimated_max_mem < gb:  # MB
-                mem = float(estimated_max_mem) / mb
-                return f"{mem:.3f} MB"
-            else:
-                mem = float(estimated_max_mem) / gb
-                return f"{mem:.3f} GB"
-
-        color_count = {"inactive": 0, "ras1": 0, "active, ras2": 0, "ras3": 0, "secondary": 0}
-        row_count = self.table_widget.rowCount()
-        for row in range(row_count):
-            color = self.table_widget.item(row, 0).background()
-            sym_str = self.table_widget.item(row, 0).text()
-            mo_num = int(self.table_widget.item(row, 1).text())
-            table_data.header_info.moltra_info[sym_str][mo_num] = False if color == colors.not_used.color else True
-
-            if color == colors.inactive.color:
-                color_count["inactive"] += 2
-            elif color == colors.ras1.color:
-                color_count["ras1"] += 2
-            elif color == colors.active.color:
-                color_count["active, ras2"] += 2
-            elif color == colors.ras3.color:
-                color_count["ras3"] += 2
-            elif color == colors.secondary.color:
-                color_count["secondary"] += 2
+    @profiled("CI space estimation")
+    def updateCISpace(self):
+        """Show the number of the CASCI determinants of the current active space and the RAS constraints"""
+        user_input = self.table_summary.user_input
+        active = self.space_summary.active_spinors(
+            user_input.ras1_max_hole_number.get_value(), user_input.ras3_max_electron_number.get_value()
+        )
+        estimate = estimate_ci_space(active)
+        txt = f"CASCI determinants (all symmetries): {estimate.determinants:,}"
+        if estimate.determinants_by_parity is not None:
+            by_parity = estimate.determinants_by_parity
+            txt += f" (gerade: {by_parity['g']:,}, ungerade: {by_parity['u']:,})"
+        if estimate.determinants == 0:
+            txt += ", no determinant satisfies the number of electrons and the RAS constraints"
+        else:
+            txt += f", nonzero CI Hamiltonian elements: {estimate.hamiltonian_elements():.3e} at most"
+        if estimate.is_too_large():
+            txt += ", the CI space is too large, reduce the active spinors or use RAS"
+            self.table_summary.ci_space.setStyleSheet("color: red")
+        else:
+            self.table_summary.ci_space.setStyleSheet("")
+        self.table_summary.ci_space.setText(txt)
+
+    @profiled("summary refresh")
+    def onTableWidgetColorChanged(self, change: Optional[SpaceChange]):
+        if change is None:
+            # The table is reloaded, recount all rows
+            self.space_summary.rebuild(table_data)
+        else:
+            self.space_summary.apply(change, table_data)
+
+        color_count = {
+            "inactive": self.space_summary.spinor_count(OrbitalSpace.INACTIVE),
+            "ras1": self.space_summary.spinor_count(OrbitalSpace.RAS1),
+            "active, ras2": self.space_summary.spinor_count(OrbitalSpace.ACTIVE),
+            "ras3": self.space_summary.spinor_count(OrbitalSpace.RAS3),
+            "secondary": self.space_summary.spinor_count(OrbitalSpace.SECONDARY),
+        }
 
         # Update summary information
         self.table_summary.spinor_summary.inactive_label.setText(f"inactive: {color_count['inactive']}")
@@ -127,59 +128,30 @@ class WidgetController:
         # Update the maximum number of holes and electrons
         self.table_summary.user_input.ras1_max_hole_number.set_top(color_count["ras1"])
         self.table_summary.user_input.ras3_max_electron_number.set_top(color_count["ras3"])
-        res = ""
-        for k, d in table_data.header_info.moltra_info.items():
-            res += f"\n {k}"
-            range_str = ""
-            start = True
-            prev_mo_num = 0
-            range_start_num = 0
-            search_end = False
-            sorted_d = OrderedDict(sorted(d.items()))
-            for mo_num, is_used in sorted_d.items():
-                search_end = True
-                if not is_used:
-                    continue
-                if start:
-                    # First used MO
-                    range_str += f" {mo_num}"
-                    range_start_num = mo_num
-                    start = False
-                elif mo_num != prev_mo_num + 1:
-                    if range_start_num == prev_mo_num:
-                        # Prev MO is alone, already added to range_str
-                        range_str += f" {mo_num}"
-                        range_start_num = mo_num
-                    else:
-                        # Prev MO is not alone, not added to range_str yet
-                        range_str += f"..{prev_mo_num} {mo_num}"
-                        range_start_num = mo_num
-                prev_mo_num = mo_num
-            if search_end and range_start_num != prev_mo_num:
-                # prev_mo_num is not added to range_str
-                range_str += f"..{prev_mo_num}"
-            res += range_str
+        res = self.space_summary.moltra_str()
 
         self.table_summary.recommended_moltra.setText(f"Recommended MOLTRA setting: {res}")
         if table_data.header_info.point_group is not None:
             inact = color_count["inactive"]
             act = color_count["ras1"] + color_count["active, ras2"] + color_count["ras3"]
             sec = color_count["secondary"]
-            inttwo = 8 * ((inact + act) ** 4) * (2 if table_data.header_info.point_group == "C1" else 1)  # inttwr, inttwi # noqa E501
-            inttwo_f1_f2 = 8 * (sec**2 * (inact + act) ** 2) * (4 if table_data.header_info.point_group == "C1" else 2)  # inttwr_f1, inttwi_f1, inttwr_f2, inttwi_f2 # noqa E501
-            indkl = (8 * (inact + act + sec) ** 2) * 2  # indk, indl
-            rkl = (8 * (inact + act + sec) ** 2) * (2 if table_data.header_info.point_group == "C1" else 1)  # rklr, rkli # noqa E501
-            estimated_max_mem = inttwo + inttwo_f1_f2 + indkl + rkl
-            if estimated_max_mem < 0:
-                estimated_max_mem = 0
-            mem_str = get_max_mem_str(estimated_max_mem)
+            breakdown = estimate_memory_breakdowns([inact], [act], [sec], table_data.header_info.point_group)[0]
+            mem_str = format_memory_size(breakdown.total)
 
             txt = f"Point Group: {table_data.header_info.point_group}, estimated max memory size: {mem_str}"
             self.table_summary.point_group.setText(txt)
+            self.table_summary.point_group.setToolTip(
+                f"inttwo: {format_memory_size(breakdown.inttwo)}\n"
+                f"inttwo_f1_f2: {format_memory_size(breakdown.inttwo_f1_f2)}\n"
+                f"indkl: {format_memory_size(breakdown.indkl)}\n"
+                f"rkl: {format_memory_size(breakdown.rkl)}"
+            )
         else:
             txt = "Point Group: could not be obtained, cannot detect the maximum memory size of the dirac_caspt2 calcluation."  # noqa E501
             self.table_summary.point_group.setText(txt)
 
+        self.updateCISpace()
+
         # Reload the input
         self.table_summary.update()
 
@@ -1,16 +1,23 @@
-import os
 import sys
 
-from PySide6.QtWidgets import QApplication
-
-from dcaspt2_input_generator.utils.dir_info import dir_info
+# Import the modules of this package in the functions, not to slow down `import dcaspt2_input_generator`
+# and the paths that do not need them (e.g. --version, batch does not need Qt)
+# Check the import time with `python -X importtime -m dcaspt2_input_generator --version` or benchmarks/bench_startup.py
 
 # import qt_material
 
 
 class MainApp:
     def __init__(self):
+        # Import PySide6 here, not to import it in the batch mode
+        from PySide6.QtWidgets import QApplication
+
+        from dcaspt2_input_generator.utils.dir_info import dir_info
+        from dcaspt2_input_generator.utils.workspace import cleanup_stale_workspaces
+
         self.app = QApplication(sys.argv)
+        # The workspaces of this process are removed by MainWindow.closeEvent
+        cleanup_stale_workspaces(dir_info.workspace_dir)
         self.init_gui()
 
     def init_gui(self):
@@ -20,17 +27,20 @@ class MainApp:
         self.window.setWindowTitle("DIRAC-CASPT2 Input Generator")
         self.window.show()
 
-    def delete_unneeded_files(self):
-        if dir_info.sum_dirac_dfcoef_path.exists():
-            os.remove(dir_info.sum_dirac_dfcoef_path)
-
     def run(self):
-        try:
-            sys.exit(self.app.exec_())
-        except SystemExit:
-            self.delete_unneeded_files()
+        sys.exit(self.app.exec_())
 
 
 def main():
+    from dcaspt2_input_generator.utils.args import args
+
+    if args.profile is not None:
+        from dcaspt2_input_generator.utils.profiler import enable_profiling
+
+        enable_profiling(args.profile)
+    if args.command == "batch":
+        from dcaspt2_input_generator.utils.batch import run_batch
+
+        return run_batch(args)
     app = MainApp()
     app.run()
@@ -0,0 +1,225 @@
+# This script suggests the active spaces (CAS and RAS partitions around the Fermi level) of the loaded table
+# and ranks them by the energy gaps at their boundaries, the AO composition and the estimated memory size.
+# Only the rows used in the calculation (not NOT_USED, e.g. the core and the high virtual spinors out of MOLTRA)
+# are partitioned, the NOT_USED rows are kept as they are.
+# All candidates are enumerated as columns (lists of the same length, one element per candidate)
+# and each score is computed column by column from the prefix sums of the rows,
+# so the cost per candidate is O(1) and thousands of candidates are scored in a few milliseconds.
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from itertools import accumulate, groupby
+from typing import List, Optional, Sequence, Tuple
+
+from dcaspt2_input_generator.utils.memory_estimator import estimate_memory_breakdowns
+from dcaspt2_input_generator.utils.profiler import profiled
+from dcaspt2_input_generator.utils.selection import used_rows
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, TableData
+
+
+@dataclass
+class SuggestionOptions:
+    """Search space and weights of suggest_active_spaces
+
+    max_occupied, max_virtual: Maximum number of the active spinors below / above the HOMO-LUMO gap
+    max_ras1, max_ras3: Maximum number of the RAS1 spinors below / RAS3 spinors above the active spinors (0: CAS only)
+    ao_labels: Part of the AO labels of interest (e.g. ["Uf", "Ud"]), the active spinors rich in them are preferred
+    max_memory: The candidates estimated to use more memory (byte) than this are discarded, None means no limit
+    gap_weight, ao_weight, cost_weight: Weights of the scores (see ActiveSpaceSuggestion)
+    """
+
+    max_occupied: int = 16
+    max_virtual: int = 16
+    max_ras1: int = 0
+    max_ras3: int = 0
+    ao_labels: Sequence[str] = field(default_factory=tuple)
+    max_memory: Optional[int] = None
+    gap_weight: float = 1.0
+    ao_weight: float = 1.0
+    cost_weight: float = 0.5
+
+    def validate(self) -> None:
+        for name in ("max_occupied", "max_virtual", "max_ras1", "max_ras3"):
+            value = getattr(self, name)
+            if value < 0 or value % 2 != 0:
+                msg = f"{name} must be a non-negative even number of spinors, but got {value}"
+                raise ValueError(msg)
+        if self.max_occupied == 0 or self.max_virtual == 0:
+            msg = "max_occupied and max_virtual must be positive, the active space needs occupied and virtual spinors"
+            raise ValueError(msg)
+
+
+@dataclass
+class ActiveSpaceSuggestion:
+    """A partition of the rows (energy order) into inactive, RAS1, active, RAS3 and secondary.
+    The rows in not_used are in the ranges but stay NOT_USED.
+
+    score = gap_weight * gap_score + ao_weight * ao_score - cost_weight * log10(memory / smallest memory)
+    gap_score: The energy gaps at the lower and the upper boundaries divided by the mean spacing of the scanned rows
+               (the active space is well separated from the inactive and the secondary spinors)
+    ao_score: Mean fraction (0 to 1) of the AO labels of interest in the RAS1, active and RAS3 spinors
+    """
+
+    inactive: range
+    ras1: range
+    active: range
+    ras3: range
+    secondary: range
+    electrons: int  # Electrons in RAS1, active and RAS3
+    memory: int  # byte, estimate_max_memory
+    gap_score: float
+    ao_score: float
+    score: float
+    not_used: "array[int]" = field(default_factory=lambda: array("i"))  # sorted
+
+    def spinors(self, rows: range) -> int:
+        not_used = bisect_left(self.not_used, rows.stop) - bisect_left(self.not_used, rows.start)
+        return 2 * (len(rows) - not_used)
+
+    def name(self) -> str:
+        """(e.g.) "CAS(4,8)", "RAS(6,12) ras1 2 ras3 2" """
+        act = self.spinors(self.ras1) + self.spinors(self.active) + self.spinors(self.ras3)
+        if not self.ras1 and not self.ras3:
+            return f"CAS({self.electrons},{act})"
+        return f"RAS({self.electrons},{act}) ras1 {self.spinors(self.ras1)} ras3 {self.spinors(self.ras3)}"
+
+    def to_row_ranges(self) -> List[Tuple[range, OrbitalSpace]]:
+        """The argument of TableData.assign_row_ranges"""
+        row_ranges = [
+            (self.inactive, OrbitalSpace.INACTIVE),
+            (self.ras1, OrbitalSpace.RAS1),
+            (self.active, OrbitalSpace.ACTIVE),
+            (self.ras3, OrbitalSpace.RAS3),
+            (self.secondary, OrbitalSpace.SECONDARY),
+        ]
+        # The consecutive NOT_USED rows are restored by one range (the later ranges take precedence)
+        for _, run in groupby(enumerate(self.not_used), key=lambda item: item[1] - item[0]):
+            rows = [row for _, row in run]
+            row_ranges.append((range(rows[0], rows[-1] + 1), OrbitalSpace.NOT_USED))
+        return row_ranges
+
+
+def ao_fractions(table_data: TableData, rows: Sequence[int], ao_labels: Sequence[str]) -> "array[float]":
+    """Return the fraction (0 to 1) of the AO labels containing any of ao_labels for each row in rows"""
+    mo_table = table_data.mo_data
+    is_target = [any(label in name for label in ao_labels) for name in mo_table.ao_type_names]
+    offsets, codes, percentages = mo_table.ao_offsets, mo_table.ao_type_code, mo_table.percentage
+    fractions = array("d")
+    for row in rows:
+        start, end = offsets[row], offsets[row + 1]
+        total = sum(p for code, p in zip(codes[start:end], percentages[start:end]) if is_target[code])
+        fractions.append(min(total / 100, 1.0))
+    return fractions
+
+
+@profiled("suggest active spaces")
+def suggest_active_spaces(
+    table_data: TableData, options: Optional[SuggestionOptions] = None, limit: int = 20
+) -> List[ActiveSpaceSuggestion]:
+    """Return the best limit candidates in descending order of the score.
+    table_data must be sorted by energy (TableData.sort_by_energy).
+
+    Raises:
+        ValueError: options is not correct
+    """
+    options = SuggestionOptions() if options is None else options
+    options.validate()
+    row_num = len(table_data.mo_data)
+    point_group = table_data.header_info.point_group
+    # The candidates are partitions of the used rows, the indexes below are the positions in used
+    # (e.g. first = 3 is the row used[3]), so the NOT_USED rows are neither counted nor scored
+    used = used_rows(table_data)
+    used_num = len(used)
+    energy = array("d", [table_data.mo_data.energy[row] for row in used])
+    # The lowest energy rows (including the NOT_USED ones) are occupied by 2 electrons each
+    lumo = bisect_left(used, min(max(0, table_data.header_info.electron_number // 2), row_num))
+    # The rows that can be in RAS1, active or RAS3, and the rows next to them (the boundary gaps)
+    window = range(
+        max(0, lumo - (options.max_occupied + options.max_ras1) // 2),
+        min(used_num, lumo + (options.max_virtual + options.max_ras3) // 2),
+    )
+    if not window:
+        return []
+
+    # Prefix sums over the window, the sum of rows [first, last) is prefix[last - start] - prefix[first - start]
+    start = window.start
+    window_rows = used[window.start : window.stop]
+    fractions = ao_fractions(table_data, window_rows, options.ao_labels) if options.ao_labels else None
+    ao_prefix = array("d", [0.0]) + array("d", accumulate(fractions)) if fractions is not None else None
+    lo_energy = energy[max(window.start - 1, 0)]
+    hi_energy = energy[min(window.stop, used_num - 1)]
+    mean_spacing = max((hi_energy - lo_energy) / (len(window) + 1), 1e-12)
+
+    # Candidates as columns: the number of rows of each space
+    occupied, virtual, ras1, ras3 = [], [], [], []
+    for ras1_rows in range(options.max_ras1 // 2 + 1):
+        for ras3_rows in range(options.max_ras3 // 2 + 1):
+            # At least one occupied and one virtual kramers pair are active
+            for occupied_rows in range(1, min(lumo - window.start - ras1_rows, options.max_occupied // 2) + 1):
+                for virtual_rows in range(1, min(window.stop - lumo - ras3_rows, options.max_virtual // 2) + 1):
+                    occupied.append(occupied_rows)
+                    virtual.append(virtual_rows)
+                    ras1.append(ras1_rows)
+                    ras3.append(ras3_rows)
+    if not occupied:
+        return []
+
+    first = [lumo - o - r for o, r in zip(occupied, ras1)]
+    last = [lumo + v + r for v, r in zip(virtual, ras3)]
+    gap_score = [
+        ((energy[f] - energy[f - 1] if f > 0 else 0.0) + (energy[e] - energy[e - 1] if e < used_num else 0.0))
+        / mean_spacing
+        for f, e in zip(first, last)
+    ]
+    if ao_prefix is not None:
+        ao_score = [(ao_prefix[e - start] - ao_prefix[f - start]) / (e - f) for f, e in zip(first, last)]
+    else:
+        ao_score = [0.0] * len(first)
+    inact = [2 * f for f in first]
+    act = [2 * (e - f) for f, e in zip(first, last)]
+    sec = [2 * (used_num - e) for e in last]
+    memory = estimate_memory_breakdowns(inact, act, sec, point_group).total
+    min_memory = max(min(memory), 1)
+    score = [
+        options.gap_weight * g + options.ao_weight * a - options.cost_weight * math.log10(max(m, 1) / min_memory)
+        for g, a, m in zip(gap_score, ao_score, memory)
+    ]
+
+    candidates = [idx for idx, m in enumerate(memory) if options.max_memory is None or m <= options.max_memory]
+    candidates.sort(key=lambda idx: (-score[idx], memory[idx], ras1[idx] + ras3[idx]))
+    suggestions: List[ActiveSpaceSuggestion] = []
+    not_used = array("i", sorted(set(range(row_num)) - set(used)))
+
+    def to_row(position: int) -> int:
+        # The ranges of the table rows start at the used rows, the NOT_USED rows in them are kept by not_used
+        return used[position] if position < used_num else row_num
+
+    # The splits of the same rows into RAS1, active and RAS3 have the same score,
+    # only the first one (the fewest RAS spinors) is suggested
+    suggested_rows = set()
+    for idx in candidates:
+        if len(suggestions) == limit:
+            break
+        f, e = first[idx], last[idx]
+        if (f, e) in suggested_rows:
+            continue
+        suggested_rows.add((f, e))
+        suggestions.append(
+            ActiveSpaceSuggestion(
+                inactive=range(0, to_row(f)),
+                ras1=range(to_row(f), to_row(f + ras1[idx])),
+                active=range(to_row(f + ras1[idx]), to_row(e - ras3[idx])),
+                ras3=range(to_row(e - ras3[idx]), to_row(e)),
+                secondary=range(to_row(e), row_num),
+                electrons=2 * (occupied[idx] + ras1[idx]),
+                memory=memory[idx],
+                gap_score=gap_score[idx],
+                ao_score=ao_score[idx],
+                score=score[idx],
+                not_used=not_used,
+            )
+        )
+    return suggestions
@@ -1,5 +1,6 @@
 import argparse
 import sys
+from typing import Any
 
 
 class PrintVersionExitAction(argparse.Action):
@@ -19,6 +20,60 @@ class PrintVersionExitAction(argparse.Action):
         sys.exit()
 
 
+def add_batch_parser(subparsers: "argparse._SubParsersAction") -> None:
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Create dirac_caspt2 inputs for many files without GUI",
+        description="Create CASPT2 and IVO inputs for many DIRAC outputs or sum_dirac_dfcoef outputs without GUI.\
+ Orbital spaces are selected by the electron window (default: CAS(4,8)), the energy window or the explicit ranges.",
+    )
+    batch_parser.add_argument(
+        "files", nargs="+", type=str, help="DIRAC outputs or sum_dirac_dfcoef outputs", metavar="FILE"
+    )
+    batch_parser.add_argument(
+        "-o", "--output-dir", type=str, default=".", help="Directory to write the inputs. Default: current directory"
+    )
+    batch_parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Number of parallel processes. Default: multi_process_num setting"
+    )
+    window = batch_parser.add_mutually_exclusive_group()
+    window.add_argument(
+        "--electron-window",
+        type=int,
+        nargs=2,
+        metavar=("NELEC", "NACT"),
+        help="Put NELEC electrons in NACT active spinors around the Fermi level. Default: 4 8",
+    )
+    window.add_argument(
+        "--energy-window",
+        type=float,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        help="Spinors whose energy (a.u.) is in [MIN, MAX] are active, lower ones inactive, higher ones secondary",
+    )
+    ranges_help = "1-based row numbers in the energy order (e.g. 1..8,11). Rows not in any range are not used."
+    batch_parser.add_argument("--inactive", type=str, default="", help=f"Inactive rows. {ranges_help}")
+    batch_parser.add_argument("--ras1", type=str, default="", help=f"ras1 rows. {ranges_help}")
+    batch_parser.add_argument("--active", type=str, default="", help=f"active, ras2 rows. {ranges_help}")
+    batch_parser.add_argument("--ras3", type=str, default="", help=f"ras3 rows. {ranges_help}")
+    batch_parser.add_argument("--secondary", type=str, default="", help=f"secondary rows. {ranges_help}")
+    batch_parser.add_argument("--totsym", type=int, default=None, help="Total symmetry number. Default: settings")
+    batch_parser.add_argument("--diracver", type=int, default=None, help="DIRAC major version. Default: settings")
+    batch_parser.add_argument("--ras1-max-hole", type=int, default=None, help="ras1 max hole. Default: settings")
+    batch_parser.add_argument(
+        "--ras3-max-electron", type=int, default=None, help="ras3 max electron. Default: settings"
+    )
+    batch_parser.add_argument("--no-ivo", action="store_true", help="Do not create the IVO input")
+    batch_parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=None,
+        help="Not use the highest energy secondary spinors to fit the estimated memory size of dirac_caspt2 within\
+ this size (GB)",
+        metavar="GB",
+    )
+
+
 def parse_args() -> "argparse.Namespace":
     parser = argparse.ArgumentParser(
         description="Load DIRAC output or sum_dirac_dfcoef output and create input file for DIRAC-CASPT2 calculation."
@@ -30,8 +85,32 @@ def parse_args() -> "argparse.Namespace":
         help="print debug output (Normalization constant, Sum of MO coefficient)",
         dest="debug",
     )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="dcaspt2_input_generator_profile.json",
+        default=None,
+        help="Write the time spent in each phase (version check, sum_dirac_dfcoef, parse, ...) as a Chrome trace\
+ (open it with chrome://tracing or https://ui.perfetto.dev) when the application exits.\
+ Default: dcaspt2_input_generator_profile.json",
+        metavar="FILE",
+        dest="profile",
+    )
+    subparsers = parser.add_subparsers(dest="command", title="subcommands")
+    add_batch_parser(subparsers)
     # If -v or --version option is used, print version and exit
     return parser.parse_args()
 
 
-args = parse_args()
+args: "argparse.Namespace"  # Created by __getattr__
+
+
+def __getattr__(name: str) -> Any:
+    # args is parsed when it is used for the first time, not when this module is imported
+    if name == "args":
+        global args
+        args = parse_args()
+        return args
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
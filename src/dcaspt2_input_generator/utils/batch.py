@@ -0,0 +1,198 @@
+# This script implements the batch subcommand (dcaspt2_input_generator batch ...).
+# It creates dirac_caspt2 inputs for many files in parallel without GUI.
+# Do not import PySide6 (directly or indirectly) in this script,
+# the batch mode must work on compute nodes without display.
+
+import argparse
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dcaspt2_input_generator.utils.dir_info import dir_info
+from dcaspt2_input_generator.utils.input_generator import create_caspt2_input, create_ivo_input
+from dcaspt2_input_generator.utils.memory_budget import plan_memory_budget
+from dcaspt2_input_generator.utils.output_loader import load_output
+from dcaspt2_input_generator.utils.profiler import span
+from dcaspt2_input_generator.utils.selection import select_by_electron_window, select_by_energy_window, select_by_ranges
+from dcaspt2_input_generator.utils.sum_dirac_dfcoef import (
+    SumDiracDfcoefVersionError,
+    check_version,
+    run_sum_dirac_dfcoef,
+)
+from dcaspt2_input_generator.utils.sum_dirac_dfcoef_cache import SumDiracDfcoefCache
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, TableData
+from dcaspt2_input_generator.utils.table_snapshot import TableSnapshotCache
+from dcaspt2_input_generator.utils.workspace import Workspace, cleanup_stale_workspaces
+
+
+@dataclass
+class BatchOptions:
+    output_dir: Path
+    totsym: int
+    dirac_ver: int
+    ras1_max_hole: int
+    ras3_max_electron: int
+    create_ivo: bool = True
+    electron_window: Optional[Tuple[int, int]] = None
+    energy_window: Optional[Tuple[float, float]] = None
+    ranges: Dict[str, str] = field(default_factory=dict)
+    memory_budget: Optional[int] = None  # byte
+
+    def select(self, table_data: TableData) -> List[OrbitalSpace]:
+        if self.energy_window is not None:
+            return select_by_energy_window(table_data, *self.energy_window)
+        elif self.ranges:
+            return select_by_ranges(table_data, **self.ranges)
+        elif self.electron_window is not None:
+            return select_by_electron_window(table_data, *self.electron_window)
+        return select_by_electron_window(table_data)
+
+
+def load_table_data(file_path: Path) -> TableData:
+    table_data = TableData()
+    table_snapshot_cache = TableSnapshotCache(dir_info.table_snapshot_dir)
+    try:
+        table_snapshot_cache.load_output(file_path, table_data)
+    except (ValueError, IndexError, KeyError):
+        # Not a sum_dirac_dfcoef output, regard it as a DIRAC output
+        cache = SumDiracDfcoefCache(dir_info.sum_dirac_dfcoef_cache_dir)
+        cache_key = cache.create_key(file_path, check_version())
+        cached_path = cache.lookup(cache_key)
+        if cached_path is not None:
+            table_snapshot_cache.load_output(cached_path, table_data)
+        else:
+            with Workspace(dir_info.workspace_dir) as workspace:
+                run_sum_dirac_dfcoef(file_path, workspace.sum_dirac_dfcoef_path)
+                load_output(workspace.sum_dirac_dfcoef_path, table_data)
+                cache.store(cache_key, workspace.sum_dirac_dfcoef_path)
+    with span("sort"):
+        table_data.sort_by_energy()
+    return table_data
+
+
+def create_inputs(file_path: Path, options: BatchOptions) -> List[Path]:
+    """Create the CASPT2 (and IVO) input for one file. Runs in a worker process."""
+    with span("load", file=file_path):
+        table_data = load_table_data(file_path)
+    with span("select orbital spaces"):
+        spaces: Sequence[int] = options.select(table_data)
+    if options.memory_budget is not None:
+        # Not use the highest energy secondary spinors to fit the estimated memory size within the budget
+        table_data.set_orbital_spaces(spaces)
+        plan = plan_memory_budget(table_data, options.memory_budget)
+        table_data.assign_orbital_space(plan.trimmed_rows, OrbitalSpace.NOT_USED)
+        spaces = table_data.orbital_spaces
+
+    caspt2_input = create_caspt2_input(
+        table_data, spaces, options.totsym, options.dirac_ver, options.ras1_max_hole, options.ras3_max_electron
+    )
+    caspt2_input_path = options.output_dir / f"{file_path.stem}.caspt2.inp"
+    caspt2_input_path.write_text(caspt2_input)
+    created = [caspt2_input_path]
+
+    if options.create_ivo:
+        ivo_input = create_ivo_input(table_data, spaces, options.totsym, options.dirac_ver)
+        ivo_input_path = options.output_dir / f"{file_path.stem}.ivo.inp"
+        ivo_input_path.write_text(ivo_input)
+        created.append(ivo_input_path)
+    return created
+
+
+def create_batch_options(args: "argparse.Namespace") -> BatchOptions:
+    from dcaspt2_input_generator.utils.settings import settings
+
+    ranges = {
+        key: getattr(args, key)
+        for key in ("inactive", "ras1", "active", "ras3", "secondary")
+        if getattr(args, key)  # Skip empty ranges
+    }
+    if ranges and (args.electron_window is not None or args.energy_window is not None):
+        msg = "The explicit ranges (--inactive, --ras1, ...) cannot be used with --electron-window or --energy-window"
+        raise ValueError(msg)
+
+    def or_default(value: Optional[int], default: int) -> int:
+        return default if value is None else value
+
+    return BatchOptions(
+        output_dir=Path(args.output_dir).expanduser().resolve(),
+        totsym=or_default(args.totsym, settings.input.totsym),
+        dirac_ver=or_default(args.diracver, settings.input.dirac_ver),
+        ras1_max_hole=or_default(args.ras1_max_hole, settings.input.ras1_max_hole),
+        ras3_max_electron=or_default(args.ras3_max_electron, settings.input.ras3_max_electron),
+        create_ivo=not args.no_ivo,
+        electron_window=None if args.electron_window is None else tuple(args.electron_window),
+        energy_window=None if args.energy_window is None else tuple(args.energy_window),
+        ranges=ranges,
+        memory_budget=None if args.memory_budget is None else int(args.memory_budget * 1024**3),
+    )
+
+
+def get_error_message(e: Exception) -> str:
+    if isinstance(e, subprocess.CalledProcessError):
+        return str(e.stderr)
+    return f"{type(e).__name__}: {e}"
+
+
+def run_batch(args: "argparse.Namespace") -> int:
+    """Entry point of the batch subcommand. Returns the exit code."""
+    try:
+        options = create_batch_options(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    try:
+        # Fail fast before any job is queued (the version is memoized for the workers created by fork)
+        check_version()
+    except SumDiracDfcoefVersionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    file_paths = [Path(f).expanduser().resolve() for f in args.files]
+    stems = [f.stem for f in file_paths]
+    duplicated_stems = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicated_stems:
+        print(
+            f"Error: The output file names conflict, input files have same names: {duplicated_stems}", file=sys.stderr
+        )
+        return 2
+    options.output_dir.mkdir(parents=True, exist_ok=True)
+    cleanup_stale_workspaces(dir_info.workspace_dir)
+
+    if args.jobs is None:
+        from dcaspt2_input_generator.utils.settings import settings
+
+        num_process = settings.multi_process_input.multi_process_num
+    else:
+        num_process = args.jobs
+    num_process = max(1, min(num_process, len(file_paths)))
+
+    failed = 0
+
+    def report(file_path: Path, created: List[Path]) -> None:
+        print(f"{file_path} -> {', '.join(str(p) for p in created)}")
+
+    def report_error(file_path: Path, e: Exception) -> None:
+        nonlocal failed
+        failed += 1
+        print(f"Error: {file_path}\n{get_error_message(e)}", file=sys.stderr)
+
+    if num_process == 1:
+        # Do not create the process pool for one process
+        for file_path in file_paths:
+            try:
+                report(file_path, create_inputs(file_path, options))
+            except Exception as e:
+                report_error(file_path, e)
+    else:
+        with ProcessPoolExecutor(max_workers=num_process) as executor:
+            futures = {executor.submit(create_inputs, file_path, options): file_path for file_path in file_paths}
+            for future in as_completed(futures):
+                try:
+                    report(futures[future], future.result())
+                except Exception as e:
+                    report_error(futures[future], e)
+
+    return 1 if failed else 0
@@ -0,0 +1,184 @@
+# This script estimates the size of the CASCI space of dirac_caspt2 (the number of the determinants of the spinors)
+# for CAS and RAS (ras1 max hole, ras3 max electron) active spaces. The CI space size is the dominant factor
+# of the runtime, so the runaway active spaces can be caught before submitting the job.
+# The spinors are grouped by (RAS subspace, parity) and the determinants are counted by the dynamic programming
+# over the occupations of the groups (memoized, exact Python ints), so the cost does not depend on the determinants
+# and it is fast enough to be updated on every assignment change.
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+#
+# The determinants are counted over all symmetries. The spinor irreps of the abelian double group used by
+# dirac_caspt2 (and therefore the irrep of totsym) are not in the sum_dirac_dfcoef output,
+# so the count is an upper bound of the totsym block. When all active irreps have the parity (e.g. E1g, E1u in D2h),
+# the count is split into the gerade and the ungerade determinants exactly.
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dcaspt2_input_generator.utils.table_data import MOTable, OrbitalSpace, TableData
+
+# The CI spaces larger than this are reported as too large
+LARGE_CI_DETERMINANTS = 10**8
+ACTIVE_SPACES = (OrbitalSpace.RAS1, OrbitalSpace.ACTIVE, OrbitalSpace.RAS3)
+
+
+@lru_cache(maxsize=None)
+def binomial(n: int, k: int) -> int:
+    """n choose k (math.comb is not available in Python 3.7)"""
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    result = 1
+    for i in range(1, k + 1):
+        result = result * (n - k + i) // i
+    return result
+
+
+@dataclass
+class ActiveSpinors:
+    """The active spinors of the CASCI calculation
+
+    ras1, ras2, ras3: Number of the spinors of each subspace ({parity: spinors}, parity is "g", "u" or "" (no parity))
+    electrons: Number of the active electrons (.nelec)
+    ras1_max_hole: Maximum number of the holes in RAS1
+    ras3_max_electron: Maximum number of the electrons in RAS3
+    """
+
+    ras1: Dict[str, int]
+    ras2: Dict[str, int]
+    ras3: Dict[str, int]
+    electrons: int
+    ras1_max_hole: int = 0
+    ras3_max_electron: int = 0
+
+    def spinors(self) -> int:
+        return sum(self.ras1.values()) + sum(self.ras2.values()) + sum(self.ras3.values())
+
+    def is_cas(self) -> bool:
+        return not any(self.ras1.values()) and not any(self.ras3.values())
+
+    def has_parity(self) -> bool:
+        spaces = (self.ras1, self.ras2, self.ras3)
+        parities = [parity for space in spaces for parity, spinors in space.items() if spinors]
+        return bool(parities) and all(parity in ("g", "u") for parity in parities)
+
+
+@dataclass
+class CIEstimate:
+    """The size of the CASCI space
+
+    determinants: Number of the determinants over all symmetries
+    determinants_by_parity: {"g": gerade determinants, "u": ungerade determinants}, None if the irreps have no parity
+    singles, doubles: Number of the single / double excitations within the active spinors from a determinant
+                      (CAS, upper bound for RAS), the CI Hamiltonian has determinants * (1 + singles + doubles)
+                      nonzero elements at most, which is the cost of a sigma vector (Davidson iteration)
+    """
+
+    determinants: int
+    determinants_by_parity: Optional[Dict[str, int]]
+    singles: int
+    doubles: int
+
+    def hamiltonian_elements(self) -> int:
+        return self.determinants * (1 + self.singles + self.doubles)
+
+    def is_too_large(self) -> bool:
+        return self.determinants > LARGE_CI_DETERMINANTS
+
+
+def count_determinants(active: ActiveSpinors) -> Dict[str, int]:
+    """Return {parity of the determinant: number of the determinants} ("" if the irreps have no parity)
+    of active.electrons electrons in the active spinors under the RAS constraints"""
+    # Groups of the spinors: (subspace, parity, spinors), 0: ras1, 1: ras2, 2: ras3
+    groups: List[Tuple[int, str, int]] = [
+        (subspace, parity, spinors)
+        for subspace, space in enumerate((active.ras1, active.ras2, active.ras3))
+        for parity, spinors in sorted(space.items())
+        if spinors > 0
+    ]
+    ras1_spinors = sum(active.ras1.values())
+    max_hole = ras1_spinors if active.is_cas() else active.ras1_max_hole
+    max_electron = sum(active.ras3.values()) if active.is_cas() else active.ras3_max_electron
+    track_parity = active.has_parity()
+    # The groups of RAS1 come first, the holes are checked as soon as all RAS1 groups are occupied
+    ras1_end = sum(1 for subspace, _, _ in groups if subspace == 0)
+
+    @lru_cache(maxsize=None)
+    def count(
+        idx: int, electrons: int, ras1_electrons: int, ras3_electrons: int, ungerade_parity: int
+    ) -> Tuple[int, int]:
+        # (gerade, ungerade) determinants of the remaining electrons in groups[idx:],
+        # ungerade_parity: Number of the electrons in the ungerade spinors of groups[:idx] modulo 2
+        if idx == ras1_end and ras1_spinors - ras1_electrons > max_hole:
+            return (0, 0)
+        if idx == len(groups):
+            if electrons != 0:
+                return (0, 0)
+            return (0, 1) if ungerade_parity else (1, 0)
+        subspace, parity, spinors = groups[idx]
+        gerade, ungerade = 0, 0
+        for occupied in range(min(spinors, electrons) + 1):
+            if subspace == 2 and ras3_electrons + occupied > max_electron:  # noqa: PLR2004
+                break
+            g, u = count(
+                idx + 1,
+                electrons - occupied,
+                ras1_electrons + occupied * (subspace == 0),
+                ras3_electrons + occupied * (subspace == 2),  # noqa: PLR2004
+                (ungerade_parity + occupied * (track_parity and parity == "u")) % 2,
+            )
+            ways = binomial(spinors, occupied)
+            gerade += ways * g
+            ungerade += ways * u
+        return gerade, ungerade
+
+    if active.electrons < 0 or active.electrons > active.spinors():
+        return {"g": 0, "u": 0} if track_parity else {"": 0}
+    gerade, ungerade = count(0, active.electrons, 0, 0, 0)
+    return {"g": gerade, "u": ungerade} if track_parity else {"": gerade}
+
+
+def irrep_parities(mo_table: MOTable) -> List[str]:
+    """The parity of each irrep code (e.g. E1g -> "g", E1u -> "u", A -> "")"""
+    return [name[-1] if name[-1:] in ("g", "u") else "" for name in mo_table.symmetry_names]
+
+
+def row_electrons(electron_number: int, row: int) -> int:
+    """Electrons of the row (energy order) in the same way as input_generator.create_caspt2_input:
+    the lowest energy rows are occupied by 2 electrons each"""
+    return max(0, min(2, electron_number - 2 * row))
+
+
+def get_active_spinors(
+    table_data: TableData, spaces: Sequence[int], ras1_max_hole: int, ras3_max_electron: int
+) -> ActiveSpinors:
+    """Count the active spinors and electrons of all rows (SpaceSummary.active_spinors keeps them up to date)"""
+    ras: Dict[int, Dict[str, int]] = {space: {} for space in ACTIVE_SPACES}
+    mo_table = table_data.mo_data
+    parities = irrep_parities(mo_table)
+    electron_number = table_data.header_info.electron_number
+    electrons = 0
+    for row, (code, space) in enumerate(zip(mo_table.symmetry_code, spaces)):
+        if space in ras:
+            parity = parities[code]
+            ras[space][parity] = ras[space].get(parity, 0) + 2  # 1 row = 2 spinors
+            electrons += row_electrons(electron_number, row)
+    return ActiveSpinors(
+        ras1=ras[OrbitalSpace.RAS1],
+        ras2=ras[OrbitalSpace.ACTIVE],
+        ras3=ras[OrbitalSpace.RAS3],
+        electrons=electrons,
+        ras1_max_hole=ras1_max_hole,
+        ras3_max_electron=ras3_max_electron,
+    )
+
+
+def estimate_ci_space(active: ActiveSpinors) -> CIEstimate:
+    by_parity = count_determinants(active)
+    nact, nelec = active.spinors(), active.electrons
+    return CIEstimate(
+        determinants=sum(by_parity.values()),
+        determinants_by_parity=by_parity if active.has_parity() else None,
+        singles=nelec * (nact - nelec),
+        doubles=binomial(nelec, 2) * binomial(nact - nelec, 2),
+    )
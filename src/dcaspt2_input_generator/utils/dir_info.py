@@ -7,12 +7,11 @@ class DirInfo:
         self.app_default_save_dir = Path.home() / ".dcaspt2_input_generator"
         self.app_rootdir = Path(__file__).parent.parent.expanduser().resolve()  # src/dcaspt2_input_generator
         self.setting_file_path = self.app_default_save_dir / "settings.json"
-        self.sum_dirac_dfcoef_path = self.app_default_save_dir / "sum_dirac_dfcoef.out"
-        self.ivo_input_path = self.app_default_save_dir / "active.ivo.inp"
-        self.__init_mkdir()
-
-    def __init_mkdir(self):
-        self.app_default_save_dir.mkdir(parents=True, exist_ok=True)
+        # sum_dirac_dfcoef.out and active.ivo.inp are created in the workspace of each document (utils/workspace.py)
+        self.workspace_dir = self.app_default_save_dir / "workspace"
+        self.sum_dirac_dfcoef_cache_dir = self.app_default_save_dir / "cache" / "sum_dirac_dfcoef"
+        self.table_snapshot_dir = self.app_default_save_dir / "cache" / "table_snapshot"
+        # The directories are created by their users when they write the files, not when this module is imported
 
 
 dir_info = DirInfo()
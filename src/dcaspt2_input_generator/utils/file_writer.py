@@ -0,0 +1,95 @@
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write text to a temporary file in the same directory and rename it to path.
+    Readers of path never see a partially written file."""
+    _atomic_write(path, text, "w")
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Binary version of atomic_write_text"""
+    _atomic_write(path, data, "wb")
+
+
+def _atomic_write(path: Path, data: Union[str, bytes], mode: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        # mkstemp creates the file with 0o600, keep the permission of the file to replace
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode) if path.exists() else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class BackgroundFileWriter:
+    """Write the text to the file in a background thread.
+
+    Only the latest text is written if write() is called again before the previous write starts,
+    and the write is skipped if the content is the same as the last written content (sha256).
+    The failure of the write is kept in error (None after a successful write) and passed to on_error
+    in the background thread, only the first failure is passed until a write succeeds.
+    """
+
+    path: Path
+    error: Optional[OSError]
+
+    def __init__(self, path: Path, on_error: Optional[Callable[[OSError], None]] = None):
+        self.path = path
+        self.error = None
+        self._on_error = on_error
+        self._cond = threading.Condition()
+        self._pending: Optional[str] = None
+        self._closed = False
+        self._last_digest: Optional[bytes] = None
+        self._thread = threading.Thread(target=self._run, name=f"BackgroundFileWriter({path.name})", daemon=True)
+        self._thread.start()
+
+    def write(self, text: str) -> None:
+        with self._cond:
+            self._pending = text
+            self._cond.notify()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write the pending text (if any) and stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:  # closed and nothing to write
+                    return
+                text, self._pending = self._pending, None
+            self._write(text)
+
+    def _write(self, text: str) -> None:
+        digest = hashlib.sha256(text.encode()).digest()
+        try:
+            if not self.path.exists():
+                self._last_digest = None  # Removed by others
+            elif self._last_digest is None:
+                self._last_digest = hashlib.sha256(self.path.read_bytes()).digest()
+            if digest != self._last_digest:  # Skip writing if not changed
+                atomic_write_text(self.path, text)
+                self._last_digest = digest
+        except OSError as e:
+            is_first_failure = self.error is None
+            self.error = e
+            if is_first_failure and self._on_error is not None:
+                self._on_error(e)
+        else:
+            self.error = None
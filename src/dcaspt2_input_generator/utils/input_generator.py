@@ -0,0 +1,145 @@
+# This script creates the dirac_caspt2 input (CASCI/CASPT2 and IVO) from the orbital spaces of the rows.
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+
+from typing import Sequence, Union
+
+from dcaspt2_input_generator.utils.profiler import profiled
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, TableData
+from dcaspt2_input_generator.utils.utils import create_ras_str, debug_print
+
+
+@profiled("create_caspt2_input")
+def create_caspt2_input(
+    table_data: TableData,
+    spaces: Sequence[int],
+    totsym: int,
+    dirac_ver: int,
+    ras1_max_hole: Union[int, str],
+    ras3_max_electron: Union[int, str],
+) -> str:
+    def add_nelec(cur_nelec: int, rem_electrons: int) -> int:
+        if rem_electrons > 0:
+            cur_nelec += min(rem_electrons, 2)
+        return cur_nelec
+
+    inact = 0
+    act = 0
+    sec = 0
+    elec = 0
+    idx_caspt2 = 0
+    ras1_list = []
+    ras2_list = []
+    ras3_list = []
+    rem_electrons = table_data.header_info.electron_number
+    is_cas = True
+    last_ras2_idx = -1
+    for idx, space in enumerate(spaces):
+        spinor_indices = [2 * idx_caspt2 + 1, 2 * idx_caspt2 + 2]  # 1 row = 2 spinors
+        if space != OrbitalSpace.NOT_USED:
+            idx_caspt2 += 1
+        if space == OrbitalSpace.INACTIVE:
+            debug_print(f"{idx}, inactive")
+            inact += 2
+        elif space == OrbitalSpace.RAS1:
+            debug_print(f"{idx}, ras1")
+            act += 2
+            ras1_list.extend(spinor_indices)
+            elec = add_nelec(elec, rem_electrons)
+            is_cas = False
+        elif space == OrbitalSpace.ACTIVE:
+            debug_print(f"{idx}, active")
+            act += 2
+            ras2_list.extend(spinor_indices)
+            elec = add_nelec(elec, rem_electrons)
+            if last_ras2_idx not in (-1, idx - 1):
+                is_cas = False
+            last_ras2_idx = idx
+        elif space == OrbitalSpace.RAS3:
+            debug_print(f"{idx}, ras3")
+            act += 2
+            elec = add_nelec(elec, rem_electrons)
+            ras3_list.extend(spinor_indices)
+            is_cas = False
+        elif space == OrbitalSpace.SECONDARY:
+            debug_print(f"{idx}, secondary")
+            sec += 2
+        rem_electrons -= 2
+
+    output = f".ninact\n{inact}\n"
+    output += f".nact\n{act}\n"
+    output += f".nelec\n{elec}\n"
+    output += f".nsec\n{sec}\n"
+    output += f".caspt2_ciroots\n{totsym} 1\n"  # CASCI/CASPT2 root is fixed to 1
+    output += f".diracver\n{dirac_ver}\n"
+    output += ".subprograms\nCASCI\nCASPT2\n"
+    if table_data.header_info.moltra_scheme is not None:
+        output += f".scheme\n{table_data.header_info.moltra_scheme}\n"  # Explicitly set MOLTRA scheme.
+
+    if not is_cas:
+        ras1_str = create_ras_str(sorted(ras1_list))
+        ras2_str = create_ras_str(sorted(ras2_list))
+        ras3_str = create_ras_str(sorted(ras3_list))
+        output += "" if len(ras1_list) == 0 else "ras1\n" + ras1_str + "\n" + str(ras1_max_hole) + "\n"
+        output += "" if len(ras2_list) == 0 else "ras2\n" + ras2_str + "\n"
+        output += "" if len(ras3_list) == 0 else "ras3\n" + ras3_str + "\n" + str(ras3_max_electron) + "\n"
+    output += "end\n"
+    return output
+
+
+@profiled("create_ivo_input")
+def create_ivo_input(table_data: TableData, spaces: Sequence[int], totsym: int, dirac_ver: int) -> str:
+    """Create standard input for IVO"""
+
+    # Create info for standard IVO input
+    # E1g,u or E1?
+    is_gerade_ungerade = True if table_data.header_info.spinor_num_info.keys() == {"E1g", "E1u"} else False
+    if is_gerade_ungerade:
+        nocc = {"E1g": 0, "E1u": 0}
+        nvcut = {"E1g": 0, "E1u": 0}
+    else:
+        nocc = {"E1": 0}
+        nvcut = {"E1": 0}
+    act = 0
+    sec = 0
+    rem_electrons = table_data.header_info.electron_number
+    mo_table = table_data.mo_data
+    for code, space in zip(mo_table.symmetry_code, spaces):
+        sym_str = mo_table.symmetry_names[code]
+
+        # nocc, nvcut
+        if rem_electrons > 0:
+            nocc[sym_str] += 1
+        elif space != OrbitalSpace.NOT_USED:
+            # Reset nvcut
+            for k in nvcut.keys():
+                nvcut[k] = 0
+        else:
+            nvcut[sym_str] += 1
+
+        # act, sec
+        if space == OrbitalSpace.NOT_USED:
+            pass
+        elif rem_electrons > 0:
+            act += 2
+        else:
+            sec += 2
+        rem_electrons -= 2
+
+    # Create standard IVO input
+    output = ".ninact\n0\n"
+    output += f".nact\n{act}\n"
+    output += f".nsec\n{sec}\n"
+    output += f".nelec\n{act}\n"
+    if is_gerade_ungerade:
+        output += f".noccg\n{nocc['E1g']}\n.noccu\n{nocc['E1u']}\n"
+        output += "" if sum(nvcut.values()) == 0 else f".nvcutg\n{nvcut['E1g']}\n.nvcutu\n{nvcut['E1u']}\n"
+    else:
+        output += f".nocc\n{nocc['E1']}\n"
+        output += "" if sum(nvcut.values()) == 0 else f".nvcut\n{nvcut['E1']}\n"
+    output += f".totsym\n{totsym}\n"
+    output += f".diracver\n{dirac_ver}\n"
+    if table_data.header_info.moltra_scheme is not None:
+        output += f".scheme\n{table_data.header_info.moltra_scheme}\n"  # Explicitly set MOLTRA scheme.
+    output += ".subprograms\nIVO\n"
+    output += ".end\n"
+    return output
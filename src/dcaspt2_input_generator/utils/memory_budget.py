@@ -0,0 +1,74 @@
+# This script fits the estimated maximum memory size of dirac_caspt2 to a memory budget (e.g. the RAM of a node)
+# by trimming the secondary spinors. The estimated memory size increases with the number of the secondary spinors,
+# so the largest number of the secondary spinors within the budget is found by binary search,
+# and the secondary rows with the highest energies beyond it are not used (they are removed from MOLTRA too).
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+
+from dataclasses import dataclass, field
+from typing import List
+
+from dcaspt2_input_generator.utils.memory_estimator import estimate_max_memory
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, TableData
+
+
+@dataclass
+class MemoryBudgetPlan:
+    """The result of plan_memory_budget. Apply it by TableData.assign_orbital_space(plan.trimmed_rows, NOT_USED)"""
+
+    budget: int  # byte
+    inactive: int  # spinors
+    active: int  # spinors, ras1 + active + ras3
+    secondary_before: int  # spinors
+    secondary_after: int  # spinors
+    memory_before: int  # byte
+    memory_after: int  # byte
+    # The secondary rows to be not used, in the energy order
+    trimmed_rows: List[int] = field(default_factory=list)
+
+
+def max_secondary_within_budget(inact: int, act: int, max_sec: int, point_group: str, budget: int) -> int:
+    """Return the largest even number of the secondary spinors (<= max_sec) whose estimated memory size is
+    within budget (byte), or -1 if it does not fit even without the secondary spinors"""
+    if estimate_max_memory(inact, act, 0, point_group) > budget:
+        return -1
+    # Binary search over the number of the kramers pairs, the memory size is monotonic in sec
+    low, high = 0, max_sec // 2  # low always fits
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_max_memory(inact, act, 2 * mid, point_group) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return 2 * low
+
+
+def plan_memory_budget(table_data: TableData, budget: int) -> MemoryBudgetPlan:
+    """Plan the secondary rows to be not used to fit the estimated memory size within budget (byte).
+    table_data must be sorted by energy (TableData.sort_by_energy).
+
+    Raises:
+        ValueError: The estimated memory size exceeds the budget even without the secondary spinors
+    """
+    point_group = table_data.header_info.point_group
+    count = table_data.count_orbital_spaces()
+    inact = 2 * count[OrbitalSpace.INACTIVE]
+    act = 2 * (count[OrbitalSpace.RAS1] + count[OrbitalSpace.ACTIVE] + count[OrbitalSpace.RAS3])
+    sec = 2 * count[OrbitalSpace.SECONDARY]
+    sec_after = max_secondary_within_budget(inact, act, sec, point_group, budget)
+    if sec_after < 0:
+        minimum = estimate_max_memory(inact, act, 0, point_group)
+        msg = f"The estimated memory size without the secondary spinors ({minimum} byte) exceeds the budget \
+({budget} byte). Reduce the inactive or the active spinors."
+        raise ValueError(msg)
+    # The rows are in the energy order, the secondary rows after the first sec_after / 2 ones are trimmed
+    secondary_rows = [row for row, space in enumerate(table_data.orbital_spaces) if space == OrbitalSpace.SECONDARY]
+    return MemoryBudgetPlan(
+        budget=budget,
+        inactive=inact,
+        active=act,
+        secondary_before=sec,
+        secondary_after=sec_after,
+        memory_before=estimate_max_memory(inact, act, sec, point_group),
+        memory_after=estimate_max_memory(inact, act, sec_after, point_group),
+        trimmed_rows=secondary_rows[sec_after // 2 :],
+    )
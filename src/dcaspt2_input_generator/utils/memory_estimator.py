@@ -0,0 +1,125 @@
+# This script estimates the maximum memory size of the dirac_caspt2 calculation from the number of spinors.
+# The estimation is vectorized: estimate_memory_breakdowns takes the columns (sequences) of the numbers of spinors
+# and computes each term of the formula column by column, so a sweep of thousands of configurations is one call.
+# It does not depend on Qt, therefore it is shared by the GUI, the batch mode and the benchmarks.
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+
+@dataclass
+class MemoryBreakdown:
+    """The memory size (byte) of the largest arrays of dirac_caspt2"""
+
+    inttwo: int  # inttwr, inttwi
+    inttwo_f1_f2: int  # inttwr_f1, inttwi_f1, inttwr_f2, inttwi_f2
+    indkl: int  # indk, indl
+    rkl: int  # rklr, rkli
+    total: int
+
+
+class MemoryBreakdowns:
+    """The columns of the memory breakdowns, breakdowns[i] is the MemoryBreakdown of the i-th configuration"""
+
+    inttwo: List[int]
+    inttwo_f1_f2: List[int]
+    indkl: List[int]
+    rkl: List[int]
+    total: List[int]
+
+    def __init__(self, inttwo: List[int], inttwo_f1_f2: List[int], indkl: List[int], rkl: List[int]):
+        self.inttwo = inttwo
+        self.inttwo_f1_f2 = inttwo_f1_f2
+        self.indkl = indkl
+        self.rkl = rkl
+        self.total = [t1 + t2 + t3 + t4 for t1, t2, t3, t4 in zip(inttwo, inttwo_f1_f2, indkl, rkl)]
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+    def __getitem__(self, idx: int) -> MemoryBreakdown:
+        return MemoryBreakdown(
+            self.inttwo[idx], self.inttwo_f1_f2[idx], self.indkl[idx], self.rkl[idx], self.total[idx]
+        )
+
+
+def estimate_memory_breakdowns(
+    inact: Sequence[int], act: Sequence[int], sec: Sequence[int], point_group: Union[str, Sequence[str]]
+) -> MemoryBreakdowns:
+    """Return the estimated memory breakdowns (byte) of the dirac_caspt2 calculations.
+    inact[i], act[i] (ras1 + active + ras3) and sec[i] are the numbers of spinors of the i-th configuration.
+    point_group is the point group of all configurations or the sequence of the point groups of each configuration.
+    The sizes are Python ints, they do not overflow for any number of spinors.
+
+    Raises:
+        ValueError: The lengths of the sequences are different
+    """
+    point_group_len = len(inact) if isinstance(point_group, str) else len(point_group)
+    if not len(inact) == len(act) == len(sec) == point_group_len:
+        msg = f"The lengths must be the same, but got inact: {len(inact)}, act: {len(act)}, sec: {len(sec)}, \
+point_group: {point_group_len}"
+        raise ValueError(msg)
+    occ = [i + a for i, a in zip(inact, act)]  # inact + act
+    occ2 = [o * o for o in occ]  # (inact + act)^2
+    all2 = [(o + s) ** 2 for o, s in zip(occ, sec)]  # (inact + act + sec)^2
+    indkl = [16 * n for n in all2]
+    # The real and imaginary parts are stored separately in C1, only the real part in the other point groups
+    if isinstance(point_group, str):
+        # The same point group for all configurations (the common case), no column of the factors is needed
+        f = 2 if point_group == "C1" else 1
+        return MemoryBreakdowns(
+            inttwo=[8 * f * o * o for o in occ2],
+            inttwo_f1_f2=[16 * f * s * s * o for s, o in zip(sec, occ2)],
+            indkl=indkl,
+            rkl=[8 * f * n for n in all2],
+        )
+    factors = [2 if pg == "C1" else 1 for pg in point_group]
+    return MemoryBreakdowns(
+        inttwo=[8 * f * o * o for o, f in zip(occ2, factors)],
+        inttwo_f1_f2=[16 * f * s * s * o for s, o, f in zip(sec, occ2, factors)],
+        indkl=indkl,
+        rkl=[8 * f * n for n, f in zip(all2, factors)],
+    )
+
+
+def estimate_max_memory(inact: int, act: int, sec: int, point_group: str) -> int:
+    """Return the estimated maximum memory size (byte) of the dirac_caspt2 calculation.
+    inact, act (ras1 + active + ras3) and sec are the numbers of spinors."""
+    return estimate_memory_breakdowns([inact], [act], [sec], point_group).total[0]
+
+
+def sweep_memory(
+    inact: int,
+    act: int,
+    sec: int,
+    point_group: str,
+    active_deltas: Sequence[int],
+    secondary_deltas: Sequence[int],
+) -> List[List[Optional[int]]]:
+    """Return grid[i][j], the estimated maximum memory size (byte) with act + active_deltas[i] active spinors
+    and sec + secondary_deltas[j] secondary spinors (None if the number of spinors is negative).
+    All cells are estimated by one estimate_memory_breakdowns call."""
+    cells = [(act + da, sec + ds) for da in active_deltas for ds in secondary_deltas]
+    valid = [(a, s) for a, s in cells if a >= 0 and s >= 0]
+    breakdowns = estimate_memory_breakdowns(
+        [inact] * len(valid), [a for a, _ in valid], [s for _, s in valid], point_group
+    )
+    totals = iter(breakdowns.total)
+    values = [next(totals) if a >= 0 and s >= 0 else None for a, s in cells]
+    width = len(secondary_deltas)
+    return [values[row * width : (row + 1) * width] for row in range(len(active_deltas))]
+
+
+def format_memory_size(size: int) -> str:
+    """(e.g.) 1536 -> "1.500 KB" """
+    kb = 1024
+    mb = kb**2
+    gb = kb**3
+    if size < kb:  # byte
+        return f"{size} byte"
+    elif size < mb:  # KB
+        return f"{float(size) / kb:.3f} KB"
+    elif size < gb:  # MB
+        return f"{float(size) / mb:.3f} MB"
+    else:
+        return f"{float(size) / gb:.3f} GB"
@@ -0,0 +1,99 @@
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from dcaspt2_input_generator.utils.profiler import span
+from dcaspt2_input_generator.utils.table_data import HeaderInfo, TableData
+
+
+def read_header_line(idx: int, row: List[str], header_info: HeaderInfo) -> None:
+    if idx == 0:
+        # 1st line: Read key-value info
+        # (e.g.) electron_num 18 point_group D2h moltra_scheme default
+        if len(row) % 2 != 0:
+            msg = f"1st header line must be even elements because this line is for key-value info.\
+len(1st header)={len(row)}"
+            raise IndexError(msg)
+
+        for key_idx in range(0, len(row), 2):  # loop only key
+            key = row[key_idx]
+            value = row[key_idx + 1]
+            if key == "electron_num":
+                header_info.update_electron_number(int(value))
+            elif key == "point_group":
+                header_info.update_point_group(value)
+            elif key == "moltra_scheme":
+                header_info.update_moltra_scheme(value)
+    elif idx == 1:
+        # 2nd line: MOLTRA range
+        # (e.g.) E1g 16..85 E1u 11..91
+        header_info.read_moltra_info(row)
+    elif idx == 2:  # noqa: PLR2004
+        # 3rd line: Eigenvalue info
+        # (e.g.) E1g closed 6 open 0 virtual 30 E1u closed 10 open 0 virtual 40
+        # => header_info.spinor_num_info = {"E1g": SpinorNumber(6, 0, 30, 36),
+        #                                   "E1u": SpinorNumber(10, 0, 40, 50)}
+        header_info.read_spinor_num_info(row)
+    # Skip unknown header info line
+
+
+class OutputParser:
+    """Line by line parser of the sum_dirac_dfcoef output.
+    The header lines are read into header_info and the tokens of the MO rows are returned.
+    """
+
+    header_info: HeaderInfo
+
+    def __init__(self, header_info: HeaderInfo):
+        self.header_info = header_info
+        self.line_idx = 0
+        self.in_header = True
+
+    def parse_line(self, line: str) -> Optional[List[str]]:
+        row = line.split()  # output is space separated file
+        if self.in_header:
+            if len(row) <= 1:  # Empty line, end of header
+                self.in_header = False
+            else:
+                read_header_line(self.line_idx, row, self.header_info)
+                self.line_idx += 1
+            return None
+        if len(row) == 0:
+            return None
+        return row
+
+
+def parse_output(lines: Iterable[str], header_info: HeaderInfo) -> Iterator[List[str]]:
+    """Read the header of the sum_dirac_dfcoef output into header_info
+    and yield the tokens of the MO rows one by one.
+    The lines are consumed in a single pass, so the whole file is never kept in memory.
+    """
+    parser = OutputParser(header_info)
+    for line in lines:
+        row = parser.parse_line(line)
+        if row is not None:
+            yield row
+
+
+def load_output(file_path: Path, table_data: TableData) -> None:
+    """Read the sum_dirac_dfcoef output file and store the data to table_data.
+    This function does not depend on Qt, so it can be used without GUI (e.g. batch mode).
+
+    Raises:
+        ValueError: The output file is not correct
+        IndexError: The output file is not correct
+        KeyError: The header info and the MO data are inconsistent
+    """
+    table_data.reset()
+    try:
+        with span("parse", file=file_path), open(file_path) as f:
+            for row in parse_output(f, table_data.header_info):
+                table_data.add_mo_data(row)
+                table_data.column_max_len = max(table_data.column_max_len, len(row))
+    except ValueError as e:
+        msg = "The output file is not correct, ValueError"
+        raise ValueError(msg) from e
+    except IndexError as e:
+        msg = "The output file is not correct, IndexError"
+        raise IndexError(msg) from e
+    with span("validate"):
+        table_data.validate()
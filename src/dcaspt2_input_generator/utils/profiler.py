@@ -0,0 +1,127 @@
+# This script measures the time spent in the phases of loading a file (version check, sum_dirac_dfcoef, parse, ...)
+# and writes them as a Chrome trace (JSON), which can be opened with chrome://tracing or https://ui.perfetto.dev.
+# Profiling is enabled by the --profile option. When it is disabled, span() returns a shared no-op context manager
+# and the functions decorated by profiled() are called directly, so the instrumentation costs almost nothing.
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+# (In the batch mode, the spans of the worker processes are not recorded, use -j 1 to profile each file.)
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Profiler:
+    output_path: Path
+    events: List[Dict[str, Any]]
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self.events = []
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+
+    def add_span(self, name: str, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> None:
+        """Add the span from start to end (time.perf_counter() seconds)"""
+        # Complete event of the trace event format, ts and dur are microseconds
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        with self.lock:
+            self.events.append(event)
+
+    def write(self) -> None:
+        with self.lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(self.output_path, "w") as f:
+            json.dump(trace, f)
+        print(f"profile written: {self.output_path} ({len(trace['traceEvents'])} spans)", file=sys.stderr)
+
+
+_profiler: Optional[Profiler] = None
+
+
+def enable_profiling(output_path: Path) -> Profiler:
+    """Record the spans from now on and write them to output_path when the application exits"""
+    global _profiler
+    _profiler = Profiler(Path(output_path).expanduser().resolve())
+    atexit.register(_profiler.write)
+    return _profiler
+
+
+def is_profiling() -> bool:
+    return _profiler is not None
+
+
+def now() -> float:
+    return time.perf_counter()
+
+
+def record_span(name: str, start: float, **args: Any) -> None:
+    """Record the span from start (now()) to now, for the phases that do not fit in a with block
+    (e.g. the phases driven by the Qt signals)"""
+    if _profiler is not None:
+        _profiler.add_span(name, start, time.perf_counter(), args)
+
+
+@contextmanager
+def _span(profiler: Profiler, name: str, args: Dict[str, Any]) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add_span(name, start, time.perf_counter(), args)
+
+
+class _NullSpan:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_null_span = _NullSpan()
+
+
+def span(name: str, **args: Any):
+    """Context manager that records the time spent in the with block as name
+
+    (e.g.)
+    with span("parse", file=file_path):
+        ...
+    """
+    if _profiler is None:
+        return _null_span
+    return _span(_profiler, name, args)
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Decorator version of span"""
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _span(_profiler, name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -0,0 +1,163 @@
+# This script contains the rules to assign orbital spaces to the rows of TableData.
+# All functions assume that table_data.mo_data is sorted by energy (TableData.sort_by_energy)
+# and return one OrbitalSpace per row (= per kramers pair).
+# The energy column is sorted, so the energy windows are resolved by binary search (bisect) to row ranges.
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, TableData
+from dcaspt2_input_generator.utils.utils import parse_ras_str
+
+
+def is_in_moltra(table_data: TableData, row_idx: int) -> bool:
+    mo_table = table_data.mo_data
+    return table_data.header_info.moltra_info[mo_table.mo_symmetry(row_idx)].get(mo_table.mo_number[row_idx], False)
+
+
+def used_rows(table_data: TableData) -> "array[int]":
+    """Return the rows used in the CASPT2 calculation (not NOT_USED) in the energy order.
+    If the orbital spaces are not assigned yet, the rows in MOLTRA are used."""
+    row_num = len(table_data.mo_data)
+    if len(table_data.orbital_spaces) == row_num:
+        spaces = table_data.orbital_spaces
+        return array("i", [row for row in range(row_num) if spaces[row] != OrbitalSpace.NOT_USED])
+    return array("i", [row for row in range(row_num) if is_in_moltra(table_data, row)])
+
+
+def select_by_electron_window(table_data: TableData, nelec: int = 4, nact: int = 8) -> List[OrbitalSpace]:
+    """Assign nelec electrons in nact active spinors around the Fermi level.
+    The spinors below the active space are inactive and the spinors above it are secondary.
+    The default is CAS(4,8) (4electrons, 8spinors).
+    """
+    spaces: List[OrbitalSpace] = []
+    rem_electrons = table_data.header_info.electron_number
+    active_cnt = 0
+    for row_idx in range(len(table_data.mo_data)):
+        if not is_in_moltra(table_data, row_idx):
+            space = OrbitalSpace.NOT_USED  # not in MOLTRA
+        elif rem_electrons > nelec:
+            space = OrbitalSpace.INACTIVE
+        elif active_cnt < nact:
+            active_cnt += 2
+            space = OrbitalSpace.ACTIVE
+        else:
+            space = OrbitalSpace.SECONDARY
+        rem_electrons -= 2
+        spaces.append(space)
+    return spaces
+
+
+def select_by_energy_window(table_data: TableData, min_energy: float, max_energy: float) -> List[OrbitalSpace]:
+    """Spinors whose energy is in [min_energy, max_energy] are active.
+    The spinors below min_energy are inactive and the spinors above max_energy are secondary.
+    """
+    if min_energy > max_energy:
+        msg = f"min_energy must be smaller than max_energy. min_energy: {min_energy}, max_energy: {max_energy}"
+        raise ValueError(msg)
+    spaces: List[OrbitalSpace] = []
+    for row_idx, energy in enumerate(table_data.mo_data.energy):
+        if not is_in_moltra(table_data, row_idx):
+            spaces.append(OrbitalSpace.NOT_USED)
+        elif energy < min_energy:
+            spaces.append(OrbitalSpace.INACTIVE)
+        elif energy <= max_energy:
+            spaces.append(OrbitalSpace.ACTIVE)
+        else:
+            spaces.append(OrbitalSpace.SECONDARY)
+    return spaces
+
+
+@dataclass
+class SpaceWindow:
+    """Rows to assign to space, by the energy window or by the number of spinors around the HOMO-LUMO gap
+
+    min_energy, max_energy: The rows whose energy (a.u.) is in [min_energy, max_energy], None means no limit
+    occupied, virtual: The occupied spinors just below and the virtual spinors just above the HOMO-LUMO gap
+                       (e.g. occupied=6, virtual=6 => 12 spinors around HOMO-LUMO)
+    """
+
+    space: OrbitalSpace
+    min_energy: Optional[float] = None
+    max_energy: Optional[float] = None
+    occupied: Optional[int] = None
+    virtual: Optional[int] = None
+
+    def is_by_count(self) -> bool:
+        return self.occupied is not None or self.virtual is not None
+
+    def validate(self) -> None:
+        if self.is_by_count() and (self.min_energy is not None or self.max_energy is not None):
+            msg = f"Specify either the energy window or the number of spinors for {self.space.name}, not both."
+            raise ValueError(msg)
+        for name, count in (("occupied", self.occupied), ("virtual", self.virtual)):
+            if count is not None and (count < 0 or count % 2 != 0):
+                msg = f"{name} must be a non-negative even number of spinors, but got {count} for {self.space.name}"
+                raise ValueError(msg)
+        if self.min_energy is not None and self.max_energy is not None and self.min_energy > self.max_energy:
+            msg = f"min_energy must be smaller than max_energy for {self.space.name}. \
+min_energy: {self.min_energy}, max_energy: {self.max_energy}"
+            raise ValueError(msg)
+
+
+def rows_in_energy_window(table_data: TableData, min_energy: Optional[float], max_energy: Optional[float]) -> range:
+    """Return the rows whose energy is in [min_energy, max_energy] by binary search"""
+    energy = table_data.mo_data.energy
+    first = 0 if min_energy is None else bisect_left(energy, min_energy)
+    last = len(energy) if max_energy is None else bisect_right(energy, max_energy)
+    return range(first, max(first, last))
+
+
+def rows_around_fermi_level(table_data: TableData, occupied: int, virtual: int) -> range:
+    """Return the rows of the occupied spinors below and the virtual spinors above the HOMO-LUMO gap"""
+    # The lowest energy rows are occupied by 2 electrons each (the same as select_by_electron_window)
+    row_num = len(table_data.mo_data)
+    lumo = min(max(0, table_data.header_info.electron_number // 2), row_num)
+    return range(max(0, lumo - occupied // 2), min(row_num, lumo + virtual // 2))
+
+
+def resolve_space_windows(table_data: TableData, windows: Sequence[SpaceWindow]) -> List[Tuple[range, OrbitalSpace]]:
+    """Resolve the windows to the row ranges. The later windows take precedence over the earlier ones."""
+    resolved: List[Tuple[range, OrbitalSpace]] = []
+    for window in windows:
+        window.validate()
+        if window.is_by_count():
+            rows = rows_around_fermi_level(table_data, window.occupied or 0, window.virtual or 0)
+        else:
+            rows = rows_in_energy_window(table_data, window.min_energy, window.max_energy)
+        resolved.append((rows, window.space))
+    return resolved
+
+
+def select_by_ranges(
+    table_data: TableData,
+    inactive: str = "",
+    ras1: str = "",
+    active: str = "",
+    ras3: str = "",
+    secondary: str = "",
+) -> List[OrbitalSpace]:
+    """Assign the orbital spaces from the explicit row ranges.
+    The ranges are 1-based row numbers in the energy order (e.g. "1..8,11"),
+    and the rows not included in any range are not used in CASPT2.
+    """
+    row_num = len(table_data.mo_data)
+    spaces = [OrbitalSpace.NOT_USED] * row_num
+    for space, ras_str in (
+        (OrbitalSpace.INACTIVE, inactive),
+        (OrbitalSpace.RAS1, ras1),
+        (OrbitalSpace.ACTIVE, active),
+        (OrbitalSpace.RAS3, ras3),
+        (OrbitalSpace.SECONDARY, secondary),
+    ):
+        for row_num_1based in parse_ras_str(ras_str):
+            if row_num_1based > row_num:
+                msg = f"The row number {row_num_1based} is out of range. The number of rows is {row_num}."
+                raise ValueError(msg)
+            if spaces[row_num_1based - 1] != OrbitalSpace.NOT_USED:
+                msg = f"The row number {row_num_1based} is assigned to multiple orbital spaces."
+                raise ValueError(msg)
+            spaces[row_num_1based - 1] = space
+    return spaces
@@ -3,7 +3,7 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict, Union
+from typing import Any, Dict, Union
 
 from dcaspt2_input_generator.utils.dir_info import dir_info
 
@@ -71,7 +71,7 @@ class Settings:
         # Application Default Settings
         self.default_settings = SettingsDict(
             {
-                "total symmetry": 1,
+                "totsym": 1,
                 "ras1_max_hole": 0,
                 "ras3_max_electron": 0,
                 "dirac_ver": 23,
@@ -90,8 +90,19 @@ class Settings:
         self.multi_process_input = MultiProcess(self.json_dict)
 
     def create_default_settings_file(self):
+        dir_info.setting_file_path.parent.mkdir(parents=True, exist_ok=True)
         with open(dir_info.setting_file_path, mode="w") as f:
             json.dump(self.default_settings, f, indent=4)
 
 
-settings = Settings()
+settings: Settings  # Created by __getattr__
+
+
+def __getattr__(name: str) -> Any:
+    # settings.json is read when settings is used for the first time, not when this module is imported
+    if name == "settings":
+        global settings
+        settings = Settings()
+        return settings
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
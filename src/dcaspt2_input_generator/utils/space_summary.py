@@ -0,0 +1,161 @@
+# This script keeps the summary of the orbital spaces
+# (the number of spinors per space, the MOLTRA range and the active spinors and electrons of the CI space)
+# up to date by the delta of each orbital space change,
+# so that assigning a few rows costs O(number of changed rows), not O(number of rows).
+
+from bisect import bisect_right
+from dataclasses import replace
+from typing import Dict, Iterable, List
+
+from dcaspt2_input_generator.utils.ci_estimator import (
+    ACTIVE_SPACES,
+    ActiveSpinors,
+    get_active_spinors,
+    irrep_parities,
+    row_electrons,
+)
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, SpaceChange, TableData
+
+
+class MoltraIntervals:
+    """Sorted and disjoint intervals [starts[i], ends[i]] of the MO numbers used in MOLTRA for one irrep"""
+
+    starts: List[int]
+    ends: List[int]
+
+    def __init__(self, sorted_mo_numbers: Iterable[int] = ()):
+        self.starts = []
+        self.ends = []
+        for mo_number in sorted_mo_numbers:
+            if self.ends and self.ends[-1] + 1 == mo_number:
+                self.ends[-1] = mo_number
+            else:
+                self.starts.append(mo_number)
+                self.ends.append(mo_number)
+
+    def add(self, mo_number: int) -> None:
+        # idx is the interval that starts at or before mo_number
+        idx = bisect_right(self.starts, mo_number) - 1
+        if idx >= 0 and self.ends[idx] >= mo_number:
+            return  # Already included
+        merge_prev = idx >= 0 and self.ends[idx] + 1 == mo_number
+        merge_next = idx + 1 < len(self.starts) and self.starts[idx + 1] - 1 == mo_number
+        if merge_prev and merge_next:
+            self.ends[idx] = self.ends[idx + 1]
+            del self.starts[idx + 1]
+            del self.ends[idx + 1]
+        elif merge_prev:
+            self.ends[idx] = mo_number
+        elif merge_next:
+            self.starts[idx + 1] = mo_number
+        else:
+            self.starts.insert(idx + 1, mo_number)
+            self.ends.insert(idx + 1, mo_number)
+
+    def remove(self, mo_number: int) -> None:
+        idx = bisect_right(self.starts, mo_number) - 1
+        if idx < 0 or self.ends[idx] < mo_number:
+            return  # Not included
+        start, end = self.starts[idx], self.ends[idx]
+        if start == end:
+            del self.starts[idx]
+            del self.ends[idx]
+        elif mo_number == start:
+            self.starts[idx] = mo_number + 1
+        elif mo_number == end:
+            self.ends[idx] = mo_number - 1
+        else:  # Split the interval
+            self.ends[idx] = mo_number - 1
+            self.starts.insert(idx + 1, mo_number + 1)
+            self.ends.insert(idx + 1, end)
+
+    def to_str(self) -> str:
+        # (e.g.) [1, 8], [11, 11], [13, 20] -> " 1..8 11 13..20"
+        return "".join(
+            f" {start}" if start == end else f" {start}..{end}" for start, end in zip(self.starts, self.ends)
+        )
+
+
+class SpaceSummary:
+    # row_count[space] is the number of rows (= kramers pairs) assigned to the space
+    row_count: Dict[OrbitalSpace, int]
+    moltra_intervals: Dict[str, MoltraIntervals]
+    # The spinors of RAS1, active and RAS3 per parity and the active electrons (the RAS constraints are not set)
+    active: ActiveSpinors
+    parities: List[str]
+
+    def __init__(self):
+        self.row_count = {space: 0 for space in OrbitalSpace}
+        self.moltra_intervals = {}
+        self.active = ActiveSpinors(ras1={}, ras2={}, ras3={}, electrons=0)
+        self.parities = []
+
+    def rebuild(self, table_data: TableData) -> None:
+        """Recount all rows. Call this after table_data is reloaded."""
+        self.row_count = table_data.count_orbital_spaces()
+        moltra_info = table_data.header_info.moltra_info
+        mo_table = table_data.mo_data
+        for code, mo_number, space in zip(mo_table.symmetry_code, mo_table.mo_number, table_data.orbital_spaces):
+            moltra_info[mo_table.symmetry_names[code]][mo_number] = space != OrbitalSpace.NOT_USED
+        self.moltra_intervals = {
+            key: MoltraIntervals(mo_number for mo_number, is_used in sorted(d.items()) if is_used)
+            for key, d in moltra_info.items()
+        }
+        self.active = get_active_spinors(table_data, table_data.orbital_spaces, 0, 0)
+        self.parities = irrep_parities(mo_table)
+
+    def apply(self, change: SpaceChange, table_data: TableData) -> None:
+        """Update the summary by the delta of the change"""
+        for row, old_space, new_space in zip(change.rows, change.old_spaces, change.new_spaces):
+            if old_space == new_space:
+                continue
+            self.row_count[OrbitalSpace(old_space)] -= 1
+            self.row_count[OrbitalSpace(new_space)] += 1
+            if old_space in ACTIVE_SPACES or new_space in ACTIVE_SPACES:
+                self.apply_active(row, old_space, new_space, table_data)
+            is_used = new_space != OrbitalSpace.NOT_USED
+            if (old_space != OrbitalSpace.NOT_USED) == is_used:
+                continue  # MOLTRA range is not changed
+            mo_symmetry = table_data.mo_data.mo_symmetry(row)
+            mo_number = table_data.mo_data.mo_number[row]
+            table_data.header_info.moltra_info[mo_symmetry][mo_number] = is_used
+            if is_used:
+                self.moltra_intervals[mo_symmetry].add(mo_number)
+            else:
+                self.moltra_intervals[mo_symmetry].remove(mo_number)
+
+    def active_subspace(self, space: int) -> Dict[str, int]:
+        if space == OrbitalSpace.RAS1:
+            return self.active.ras1
+        elif space == OrbitalSpace.ACTIVE:
+            return self.active.ras2
+        return self.active.ras3
+
+    def apply_active(self, row: int, old_space: int, new_space: int, table_data: TableData) -> None:
+        parity = self.parities[table_data.mo_data.symmetry_code[row]]
+        electrons = row_electrons(table_data.header_info.electron_number, row)
+        if old_space in ACTIVE_SPACES:
+            self.active_subspace(old_space)[parity] -= 2  # 1 row = 2 spinors
+            self.active.electrons -= electrons
+        if new_space in ACTIVE_SPACES:
+            subspace = self.active_subspace(new_space)
+            subspace[parity] = subspace.get(parity, 0) + 2
+            self.active.electrons += electrons
+
+    def active_spinors(self, ras1_max_hole: int, ras3_max_electron: int) -> ActiveSpinors:
+        """Return the active spinors with the RAS constraints (the argument of ci_estimator.estimate_ci_space)"""
+        return replace(
+            self.active,
+            ras1=dict(self.active.ras1),
+            ras2=dict(self.active.ras2),
+            ras3=dict(self.active.ras3),
+            ras1_max_hole=ras1_max_hole,
+            ras3_max_electron=ras3_max_electron,
+        )
+
+    def spinor_count(self, space: OrbitalSpace) -> int:
+        return 2 * self.row_count[space]  # 1 row = 2 spinors
+
+    def moltra_str(self) -> str:
+        # (e.g.) "\n E1g 1..33\n E1u 1..10 12..33"
+        return "".join(f"\n {key}{intervals.to_str()}" for key, intervals in self.moltra_intervals.items())
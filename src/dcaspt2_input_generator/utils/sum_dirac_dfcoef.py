@@ -0,0 +1,125 @@
+# This script contains all functions to run the sum_dirac_dfcoef program.
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+
+import re
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Union
+
+from dcaspt2_input_generator.utils.profiler import profiled, span
+
+if sys.version_info >= (3, 8):
+    from importlib import metadata
+else:
+    import importlib_metadata as metadata
+
+# Options of the sum_dirac_dfcoef program that change its output (used for the cache key too)
+# -d 3: 3 decimal places, -c: one line per kramers pair (the format read by output_loader)
+SUM_DIRAC_DFCOEF_OPTIONS = ["-d", "3", "-c"]
+# Keep the same as the requirement of sum_dirac_dfcoef in pyproject.toml
+REQUIRED_VERSION = (5, 0, 0)
+
+
+def create_command(command: str) -> str:
+    if sys.executable:
+        return f"{sys.executable} -m {command}"
+    return command
+
+
+def get_executable() -> List[str]:
+    return [sys.executable, "-m", "sum_dirac_dfcoef"] if sys.executable else ["sum_dirac_dfcoef"]
+
+
+class SumDiracDfcoefVersionError(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def get_version() -> str:
+    """Return the installed version of sum_dirac_dfcoef (memoized for the session)"""
+    try:
+        # Read the package metadata, it is much faster than running a new python interpreter
+        return metadata.version("sum_dirac_dfcoef")
+    except metadata.PackageNotFoundError:
+        pass
+    # Not installed as a package (e.g. only in PYTHONPATH), ask the program itself
+    command = create_command("sum_dirac_dfcoef -v")
+    try:
+        p = subprocess.run(command.split(), check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except (OSError, subprocess.CalledProcessError) as e:
+        msg = f"sum_dirac_dfcoef is not found. Please install it with `pip install -U sum_dirac_dfcoef`\n\
+details: {e}"
+        raise SumDiracDfcoefVersionError(msg) from e
+    return p.stdout.decode("utf-8").strip()
+
+
+@profiled("version check")
+def check_version() -> str:
+    """Return the version of sum_dirac_dfcoef
+
+    Raises:
+        SumDiracDfcoefVersionError: sum_dirac_dfcoef is not found or older than REQUIRED_VERSION
+    """
+    return validate_version(get_version())
+
+
+def validate_version(version: str) -> str:
+    """Return the version if it is REQUIRED_VERSION or later
+
+    Raises:
+        SumDiracDfcoefVersionError: The version is older than REQUIRED_VERSION
+    """
+    # (e.g.) "5.2.1", "5.2.1.dev0", "6.0.0rc1", "6"
+    m = re.match(r"(\d+)(?:\.(\d+))?(?:\.(\d+))?", version.strip())
+    if m is None:
+        msg = f"Cannot read the version of sum_dirac_dfcoef: {version}"
+        raise SumDiracDfcoefVersionError(msg)
+    if tuple(int(v or 0) for v in m.groups()) < REQUIRED_VERSION:
+        required = ".".join(str(v) for v in REQUIRED_VERSION)
+        msg = f"The version of sum_dirac_dfcoef is too old.\n\
+sum_dirac_dfcoef version: {version.strip()}\n\
+Please update sum_dirac_dfcoef to v{required} or later with `pip install -U sum_dirac_dfcoef`"
+        raise SumDiracDfcoefVersionError(msg)
+    return version.strip()
+
+
+def get_sum_dirac_dfcoef_options(
+    file_path: Union[str, Path], output_path: Union[str, Path], num_process: int
+) -> List[str]:
+    # Same options as create_sum_dirac_dfcoef_command, but not quoted (for subprocess.run)
+    return ["-i", str(file_path), *SUM_DIRAC_DFCOEF_OPTIONS, "-o", str(output_path), "-j", str(max(1, num_process))]
+
+
+def create_sum_dirac_dfcoef_command(
+    file_path: Union[str, Path], output_path: Union[str, Path], num_process: int
+) -> str:
+    num_process = max(1, num_process)
+    options = " ".join(SUM_DIRAC_DFCOEF_OPTIONS)
+    return create_command(f'sum_dirac_dfcoef -i "{file_path}" {options} -o "{output_path}" -j {num_process}')
+
+
+def run_sum_dirac_dfcoef(file_path: Union[str, Path], output_path: Union[str, Path], num_process: int = 1) -> None:
+    """Run the sum_dirac_dfcoef program and wait until it finishes.
+
+    Raises:
+        subprocess.CalledProcessError: The sum_dirac_dfcoef program has failed
+    """
+    command = create_sum_dirac_dfcoef_command(file_path, output_path, num_process)
+    with span("sum_dirac_dfcoef", file=file_path):
+        p = subprocess.run(
+            [*get_executable(), *get_sum_dirac_dfcoef_options(file_path, output_path, num_process)],
+            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    if p.returncode != 0:
+        err_msg = create_error_message(file_path, command, p.stderr.decode())
+        raise subprocess.CalledProcessError(p.returncode, command, "", err_msg)
+
+
+def create_error_message(file_path: Union[str, Path], command: str, stderr: str) -> str:
+    return f"An error has ocurred while running the sum_dirac_dfcoef program.\n\
+Please check the output file. path: {file_path}\nExecuted command: {command}\n\
+all stderr: {stderr}"
@@ -0,0 +1,75 @@
+# This script caches the sum_dirac_dfcoef outputs,
+# so that opening the same DIRAC output again does not run the sum_dirac_dfcoef program again.
+# The cache entries are keyed by the sha256 of the DIRAC output content, the sum_dirac_dfcoef version and options,
+# and the total size of the cache directory is bounded by evicting the least recently used entries.
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from dcaspt2_input_generator.utils.sum_dirac_dfcoef import SUM_DIRAC_DFCOEF_OPTIONS
+from dcaspt2_input_generator.utils.utils import debug_print, evict_least_recently_used
+
+
+class SumDiracDfcoefCache:
+    cache_dir: Path
+    max_bytes: int
+    hits: int
+    misses: int
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def create_key(self, file_path: Union[str, Path], version: str) -> str:
+        """Return the cache key of the DIRAC output file.
+        The key changes if the content of the file, the sum_dirac_dfcoef version or its options change."""
+        h = hashlib.sha256()
+        h.update(f"sum_dirac_dfcoef {version.strip()} {' '.join(SUM_DIRAC_DFCOEF_OPTIONS)}\n".encode())
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def get_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.out"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the path of the cached sum_dirac_dfcoef output, or None if it is not cached"""
+        path = self.get_path(key)
+        try:
+            # Update the access time of the entry for the LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            debug_print(f"sum_dirac_dfcoef cache miss: {key} (hits: {self.hits}, misses: {self.misses})")
+            return None
+        self.hits += 1
+        debug_print(f"sum_dirac_dfcoef cache hit: {key} (hits: {self.hits}, misses: {self.misses})")
+        return path
+
+    def store(self, key: str, output_path: Union[str, Path]) -> Path:
+        """Copy the sum_dirac_dfcoef output to the cache and evict the old entries if the cache is too large"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.get_path(key)
+        # Copy to a temporary file and rename it, other processes never see a partially copied entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Remove the least recently used entries until the total size is less than or equal to max_bytes"""
+        evict_least_recently_used(self.cache_dir, "*.out", self.max_bytes, keep)
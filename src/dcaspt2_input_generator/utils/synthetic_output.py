@@ -0,0 +1,146 @@
+# This script creates synthetic sum_dirac_dfcoef outputs for the benchmarks and the scaling tests.
+# Real DIRAC calculations of large molecules take days, so the outputs are generated from the random numbers
+# with a fixed seed instead. The generated output has the same format as `sum_dirac_dfcoef -d 3 -c`
+# and its header is consistent with the MO rows, so it can be loaded by output_loader.load_output.
+# It does not depend on Qt.
+
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+# Irreps of the kramers pairs and the D2h irreps of their AO labels
+POINT_GROUP_IRREPS: Dict[str, Dict[str, List[str]]] = {
+    "C1": {"A": ["A"]},
+    "D2h": {"E1g": ["Ag", "B1g", "B2g", "B3g"], "E1u": ["Au", "B1u", "B2u", "B3u"]},
+}
+SHELLS = ["s", "px", "py", "pz", "dxx", "dxy", "dxz", "dyy", "dyz", "dzz", "f", "g"]
+
+
+@dataclass
+class SyntheticOutputSpec:
+    """Parameters of a synthetic sum_dirac_dfcoef output
+
+    point_group: "C1" (irrep A) or "D2h" (irreps E1g and E1u)
+    spinors_per_irrep: Number of spinors of each irrep (even, 1 row = 1 kramers pair = 2 spinors),
+                       the same number for all irreps or {irrep: number} (e.g. {"E1g": 100, "E1u": 140})
+    ao_per_row: Number of the AO contributions of each row (0 is allowed, the row has only the energy)
+    electron_number: Number of electrons (even), the lowest energy spinors are closed shell
+    moltra_ranges: MOLTRA range of each irrep (e.g. {"E1g": "1..10,15..20"}). Default: all rows
+    atoms: Atom labels of the AO labels (e.g. "U" => "AgUs", "B1uUpz")
+    seed: Seed of the random numbers, the same spec always creates the same output
+    """
+
+    point_group: str = "D2h"
+    spinors_per_irrep: Union[int, Dict[str, int]] = 200
+    ao_per_row: int = 3
+    electron_number: int = 40
+    moltra_ranges: Dict[str, str] = field(default_factory=dict)
+    atoms: Sequence[str] = ("U", "O")
+    seed: int = 0
+
+    def get_spinors(self, irrep: str) -> int:
+        if isinstance(self.spinors_per_irrep, int):
+            return self.spinors_per_irrep
+        return self.spinors_per_irrep.get(irrep, 0)
+
+    def validate(self) -> None:
+        if self.point_group not in POINT_GROUP_IRREPS:
+            msg = f"point_group must be one of {list(POINT_GROUP_IRREPS)}, but got {self.point_group}"
+            raise ValueError(msg)
+        irreps = POINT_GROUP_IRREPS[self.point_group]
+        if not isinstance(self.spinors_per_irrep, int) and set(self.spinors_per_irrep) != set(irreps):
+            msg = f"spinors_per_irrep must have the irreps {list(irreps)}, but got {list(self.spinors_per_irrep)}"
+            raise ValueError(msg)
+        for irrep in irreps:
+            spinors = self.get_spinors(irrep)
+            if spinors <= 0 or spinors % 2 != 0:
+                msg = f"spinors_per_irrep must be a positive even number, but got {spinors} for {irrep}"
+                raise ValueError(msg)
+        total_spinors = sum(self.get_spinors(irrep) for irrep in irreps)
+        if self.electron_number < 0 or self.electron_number % 2 != 0 or self.electron_number > total_spinors:
+            msg = f"electron_number must be an even number in [0, {total_spinors}], but got {self.electron_number}"
+            raise ValueError(msg)
+        if self.ao_per_row < 0:
+            msg = f"ao_per_row must not be negative, but got {self.ao_per_row}"
+            raise ValueError(msg)
+        unknown = set(self.moltra_ranges) - set(irreps)
+        if unknown:
+            msg = f"moltra_ranges has unknown irreps {sorted(unknown)} for point_group {self.point_group}"
+            raise ValueError(msg)
+
+
+def create_energies(rng: random.Random, rows: int) -> List[float]:
+    """Sorted orbital energies (a.u.) like a heavy element: a few deep core orbitals, valence and virtual orbitals"""
+    energies = []
+    for _ in range(rows):
+        x = rng.random()
+        if x < 0.1:  # core
+            energies.append(-rng.uniform(10.0, 4000.0))
+        elif x < 0.5:  # valence
+            energies.append(-rng.uniform(0.1, 10.0))
+        else:  # virtual
+            energies.append(rng.uniform(0.01, 1000.0))
+    return sorted(energies)
+
+
+def create_contributions(rng: random.Random, ao_labels: List[str], count: int) -> str:
+    # (e.g.) " AgUs 60.123 B1uUpz 39.877", sorted in descending order of the percentage like sum_dirac_dfcoef
+    if count == 0:
+        return ""
+    weights = [rng.random() + 1e-3 for _ in range(count)]
+    total = sum(weights)
+    labels = rng.sample(ao_labels, count) if count <= len(ao_labels) else rng.choices(ao_labels, k=count)
+    pairs = sorted(zip(labels, weights), key=lambda pair: -pair[1])
+    return "".join(f" {label} {100 * weight / total:.3f}" for label, weight in pairs)
+
+
+def generate_synthetic_output(spec: SyntheticOutputSpec) -> Iterator[str]:
+    """Yield the lines (with "\\n") of the synthetic sum_dirac_dfcoef output
+
+    Raises:
+        ValueError: spec is not correct
+    """
+    spec.validate()
+    rng = random.Random(spec.seed)
+    irreps = POINT_GROUP_IRREPS[spec.point_group]
+    rows_per_irrep = {irrep: spec.get_spinors(irrep) // 2 for irrep in irreps}
+
+    # rows: (energy, irrep, mo_number)
+    rows: List[Tuple[float, str, int]] = []
+    for irrep in irreps:
+        energies = create_energies(rng, rows_per_irrep[irrep])
+        rows.extend((energy, irrep, mo_number) for mo_number, energy in enumerate(energies, start=1))
+    rows.sort()
+
+    # The lowest energy kramers pairs are occupied by 2 electrons
+    closed = {irrep: 0 for irrep in irreps}
+    for _, irrep, _ in rows[: spec.electron_number // 2]:
+        closed[irrep] += 2
+
+    yield f"electron_num {spec.electron_number} point_group {spec.point_group} moltra_scheme default\n"
+    yield " ".join(f"{irrep} {spec.moltra_ranges.get(irrep, f'1..{rows_per_irrep[irrep]}')}" for irrep in irreps)
+    yield " \n"
+    yield " ".join(
+        f"{irrep} closed {closed[irrep]} open 0 virtual {spec.get_spinors(irrep) - closed[irrep]}" for irrep in irreps
+    )
+    yield " \n"
+    yield "\n"
+
+    ao_labels = {
+        irrep: [f"{sym}{atom}{shell}" for sym in syms for atom in spec.atoms for shell in SHELLS]
+        for irrep, syms in irreps.items()
+    }
+    for energy, irrep, mo_number in rows:
+        yield f"{irrep} {mo_number} {energy:.3f}{create_contributions(rng, ao_labels[irrep], spec.ao_per_row)}\n"
+
+
+def write_synthetic_output(file_path: Path, spec: SyntheticOutputSpec) -> Path:
+    """Write the synthetic sum_dirac_dfcoef output to file_path and return file_path
+
+    Raises:
+        ValueError: spec is not correct
+    """
+    with open(file_path, "w") as f:
+        f.writelines(generate_synthetic_output(spec))
+    return file_path
@@ -0,0 +1,508 @@
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+from typing import OrderedDict as ODict
+
+
+class OrbitalSpace(IntEnum):
+    """Orbital space of a row (= a kramers pair) in the dirac_caspt2 calculation"""
+
+    NOT_USED = 0
+    INACTIVE = 1
+    RAS1 = 2
+    ACTIVE = 3
+    RAS3 = 4
+    SECONDARY = 5
+
+
+class SortKey(IntEnum):
+    """Display order of the rows. The rows of TableData are always stored in the energy order."""
+
+    ENERGY = 0
+    IRREP = 1  # irrep, then MO number
+    MO_NUMBER = 2  # MO number, then irrep
+    DOMINANT_AO = 3  # AO type of the largest contribution, then the percentage (descending)
+
+
+@dataclass
+class MOData:
+    mo_number: int = 0
+    mo_symmetry: str = ""
+    energy: float = 0.0
+    ao_type: List[str] = field(default_factory=list)
+    percentage: List[float] = field(default_factory=list)
+    ao_len: int = 0
+
+    def update_mo_data(
+        self, mo_number: int, mo_symmetry: str, energy: float, ao_type: List[str], percentage: List[float], ao_len: int
+    ) -> None:
+        self.mo_number = mo_number
+        self.mo_symmetry = mo_symmetry
+        self.energy = energy
+        self.ao_type = ao_type
+        self.percentage = percentage
+        self.ao_len = ao_len
+
+    def create_mo_data(self, row: List[str]) -> None:
+        mo_symmetry = row[0]
+        mo_number_dirac = int(row[1])
+        mo_energy = float(row[2])
+        ao_type = [row[i] for i in range(3, len(row), 2)]
+        ao_percentage = [float(row[i]) for i in range(4, len(row), 2)]
+        self.update_mo_data(mo_number_dirac, mo_symmetry, mo_energy, ao_type, ao_percentage, len(ao_type))
+
+
+class MOTable:
+    """Columnar storage of the MO rows.
+
+    The scalar values of the rows are stored in the arrays indexed by the row
+    and the AO types and percentages of row i are stored in ao_type_code[ao_offsets[i]:ao_offsets[i+1]]
+    and percentage[ao_offsets[i]:ao_offsets[i+1]] (CSR format).
+    The irreps and the AO types are stored as the codes of symmetry_names and ao_type_names.
+    text_len[column] is the maximum length of the tokens of the column in the sum_dirac_dfcoef output,
+    recorded while the rows are appended, so that the width of the column is known without scanning the rows.
+    mo_table[i] returns the MOData of row i.
+    """
+
+    symmetry_names: List[str]
+    ao_type_names: List[str]
+    symmetry_code: "array[int]"
+    mo_number: "array[int]"
+    energy: "array[float]"
+    ao_offsets: "array[int]"
+    ao_type_code: "array[int]"
+    percentage: "array[float]"
+    text_len: "array[int]"
+
+    def __init__(self):
+        self.symmetry_names = []
+        self.ao_type_names = []
+        self._symmetry_codes: Dict[str, int] = {}
+        self._ao_type_codes: Dict[str, int] = {}
+        self.symmetry_code = array("b")
+        self.mo_number = array("i")
+        self.energy = array("d")
+        self.ao_offsets = array("q", [0])
+        self.ao_type_code = array("i")
+        self.percentage = array("d")
+        self.text_len = array("i")
+
+    def __len__(self) -> int:
+        return len(self.energy)
+
+    def __getitem__(self, row: int) -> MOData:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            msg = f"row {row} is out of range. The number of rows is {len(self)}"
+            raise IndexError(msg)
+        start, end = self.ao_offsets[row], self.ao_offsets[row + 1]
+        ao_type = [self.ao_type_names[code] for code in self.ao_type_code[start:end]]
+        return MOData(
+            self.mo_number[row],
+            self.mo_symmetry(row),
+            self.energy[row],
+            ao_type,
+            self.percentage[start:end].tolist(),
+            end - start,
+        )
+
+    def __iter__(self) -> Iterator[MOData]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def mo_symmetry(self, row: int) -> str:
+        return self.symmetry_names[self.symmetry_code[row]]
+
+    def ao_len(self, row: int) -> int:
+        return self.ao_offsets[row + 1] - self.ao_offsets[row]
+
+    def ao_type(self, row: int, idx: int) -> str:
+        return self.ao_type_names[self.ao_type_code[self.ao_offsets[row] + idx]]
+
+    def ao_percentage(self, row: int, idx: int) -> float:
+        return self.percentage[self.ao_offsets[row] + idx]
+
+    def append(self, row: List[str]) -> None:
+        """Append the row of the sum_dirac_dfcoef output
+        (e.g.) E1u 11 -8.8 B3uUp 49.999 B3uUpx 49.999
+        """
+        mo_symmetry = row[0]
+        mo_number = int(row[1])
+        energy = float(row[2])
+        ao_type_code = [self._code(self._ao_type_codes, self.ao_type_names, row[i]) for i in range(3, len(row), 2)]
+        percentage = [float(row[i]) for i in range(4, len(row), 2)]
+        # Append after all values are parsed, so that the columns are not broken by a wrong row
+        self.symmetry_code.append(self._code(self._symmetry_codes, self.symmetry_names, mo_symmetry))
+        self.mo_number.append(mo_number)
+        self.energy.append(energy)
+        self.ao_type_code.extend(ao_type_code)
+        self.percentage.extend(percentage)
+        self.ao_offsets.append(len(self.ao_type_code))
+        self.update_text_len(row)
+
+    def update_text_len(self, row: List[str]) -> None:
+        text_len = self.text_len
+        if len(row) > len(text_len):
+            text_len.extend([0] * (len(row) - len(text_len)))
+        for column, token_len in enumerate(map(len, row)):
+            if token_len > text_len[column]:
+                text_len[column] = token_len
+
+    def set_names(self, symmetry_names: List[str], ao_type_names: List[str]) -> None:
+        """Replace the name tables of the codes (e.g. when the columns are restored from a snapshot)"""
+        self.symmetry_names = symmetry_names
+        self.ao_type_names = ao_type_names
+        self._symmetry_codes = {name: code for code, name in enumerate(symmetry_names)}
+        self._ao_type_codes = {name: code for code, name in enumerate(ao_type_names)}
+
+    def sort_by_energy(self) -> None:
+        """Sort the rows in ascending order of energy (stable)"""
+        self.take(sorted(range(len(self)), key=self.energy.__getitem__))
+
+    def sort_order(self, key: SortKey) -> "array[int]":
+        """Return the rows sorted by key. The ties are kept in the current order of the rows (stable)."""
+        # Each key is sorted by the stable sorts of the columns from the least significant one,
+        # so no tuple keys are created per row
+        order = list(range(len(self)))
+        if key == SortKey.ENERGY:
+            order.sort(key=self.energy.__getitem__)
+        elif key in (SortKey.IRREP, SortKey.MO_NUMBER):
+            symmetry_rank = self._name_rank(self.symmetry_names)
+            symmetry_ranks = [symmetry_rank[code] for code in self.symmetry_code]
+            if key == SortKey.IRREP:
+                order.sort(key=self.mo_number.__getitem__)
+                order.sort(key=symmetry_ranks.__getitem__)
+            else:
+                order.sort(key=symmetry_ranks.__getitem__)
+                order.sort(key=self.mo_number.__getitem__)
+        elif key == SortKey.DOMINANT_AO:
+            ao_type_rank = self._name_rank(self.ao_type_names)
+            # The rows without AO contributions are sorted last
+            dominant_ranks = [len(self.ao_type_names)] * len(self)
+            dominant_percentages = [0.0] * len(self)
+            offsets = self.ao_offsets
+            for row, (start, end) in enumerate(zip(offsets, offsets[1:])):
+                if start == end:
+                    continue
+                percentages = self.percentage[start:end]
+                largest = max(percentages)
+                dominant_ranks[row] = ao_type_rank[self.ao_type_code[start + percentages.index(largest)]]
+                dominant_percentages[row] = -largest
+            order.sort(key=dominant_percentages.__getitem__)
+            order.sort(key=dominant_ranks.__getitem__)
+        return array("i", order)
+
+    @staticmethod
+    def _name_rank(names: List[str]) -> List[int]:
+        # rank[code] is the position of names[code] in the alphabetical order
+        rank = [0] * len(names)
+        for position, code in enumerate(sorted(range(len(names)), key=names.__getitem__)):
+            rank[code] = position
+        return rank
+
+    def take(self, order: Sequence[int]) -> None:
+        """Reorder the rows, the new row i is the old row order[i]"""
+        ao_offsets = array("q", [0])
+        ao_type_code = array("i")
+        percentage = array("d")
+        for row in order:
+            start, end = self.ao_offsets[row], self.ao_offsets[row + 1]
+            ao_type_code.extend(self.ao_type_code[start:end])
+            percentage.extend(self.percentage[start:end])
+            ao_offsets.append(len(ao_type_code))
+        self.symmetry_code = array("b", (self.symmetry_code[row] for row in order))
+        self.mo_number = array("i", (self.mo_number[row] for row in order))
+        self.energy = array("d", (self.energy[row] for row in order))
+        self.ao_offsets = ao_offsets
+        self.ao_type_code = ao_type_code
+        self.percentage = percentage
+
+    @staticmethod
+    def _code(codes: Dict[str, int], names: List[str], name: str) -> int:
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+
+@dataclass
+class SpinorNumber:
+    closed_shell: int = 0
+    open_shell: int = 0
+    virtual_orbitals: int = 0
+    sum_of_orbitals: int = 0
+
+    def __add__(self, other: "SpinorNumber") -> "SpinorNumber":
+        if not isinstance(other, SpinorNumber):
+            msg = f"unsupported operand type(s) for +: {type(self)} and {type(other)}"
+            raise TypeError(msg)
+        return SpinorNumber(
+            self.closed_shell + other.closed_shell,
+            self.open_shell + other.open_shell,
+            self.virtual_orbitals + other.virtual_orbitals,
+            self.sum_of_orbitals + other.sum_of_orbitals,
+        )
+
+
+class MoltraInfo(Dict[str, ODict[int, bool]]):
+    pass
+
+
+class SpinorNumInfo(Dict[str, SpinorNumber]):
+    pass
+
+
+@dataclass
+class HeaderInfo:
+    spinor_num_info: SpinorNumInfo = field(default_factory=SpinorNumInfo)
+    moltra_info: MoltraInfo = field(default_factory=MoltraInfo)
+    point_group: str = ""
+    moltra_scheme: Union[int, None] = None
+    electron_number: int = 0
+
+    def read_spinor_num_info(self, row: List[str]) -> None:
+        # spinor_num info is following the format:
+        # spinor_num_type1 closed int open int virtual int ...
+        # (e.g.) E1g closed 6 open 0 virtual 30 E1u closed 10 open 0 virtual 40 point_group C2v
+        # => self.spinor_num_info = {"E1g": SpinorNumber(6, 0, 30, 36),
+        #                                              "E1u": SpinorNumber(10, 0, 40, 50)}
+        if len(row) < 7:
+            msg = f"spinor_num info is not correct: {row},\
+spinor_num_type1 closed int open int virtual int spinor_num_type2 closed int open int virtual int ... point_group str\n\
+is the correct format"
+            raise ValueError(msg)
+        idx = 0
+        while idx + 7 <= len(row):
+            spinor_num_type = row[idx]
+            closed_shell = int(row[idx + 2])
+            open_shell = int(row[idx + 4])
+            virtual_orbitals = int(row[idx + 6])
+            sum_of_orbitals = closed_shell + open_shell + virtual_orbitals
+            self.spinor_num_info[spinor_num_type] = SpinorNumber(
+                closed_shell, open_shell, virtual_orbitals, sum_of_orbitals
+            )
+            idx += 7
+
+    def read_moltra_info(self, row: List[str]) -> None:
+        idx = 0
+        while idx + 2 <= len(row):
+            moltra_type = row[idx]
+            moltra_range_str = row[idx + 1]
+            moltra_range: ODict[int, bool] = OrderedDict()
+            for elem in moltra_range_str.split(","):
+                moltra_range_elem = elem.strip()
+                if ".." in moltra_range_elem:
+                    moltra_range_start_str, moltra_range_end_str = moltra_range_elem.split("..")
+                    moltra_range_start = int(moltra_range_start_str)
+                    moltra_range_end = int(moltra_range_end_str)
+                    for i in range(moltra_range_start, moltra_range_end + 1):
+                        moltra_range[i] = True
+                else:
+                    key_elem = int(moltra_range_elem)
+                    moltra_range[key_elem] = True
+            self.moltra_info[moltra_type] = moltra_range
+            idx += 2
+        for key in self.moltra_info.keys():
+            self.moltra_info[key] = OrderedDict(sorted(self.moltra_info[key].items()))
+
+    def update_electron_number(self, number: int) -> None:
+        self.electron_number = number
+
+    def update_point_group(self, value: str) -> None:
+        self.point_group = value
+
+    def update_moltra_scheme(self, value: str) -> None:
+        if value == "default":
+            self.moltra_scheme = None
+        else:
+            self.moltra_scheme = int(value)
+
+
+class OrbitalSpaceData:
+    found: bool
+    first: int
+    last: int
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.found = False
+        self.first = -1
+        self.last = -1
+
+
+class TableIdxInfo:
+    """This class stores the first and last indexes for inactive and secondary
+    to determine if the context menu (right-click menu) should be displayed.
+    """
+
+    inactive: OrbitalSpaceData
+    secondary: OrbitalSpaceData
+
+    def __init__(self):
+        self.inactive = OrbitalSpaceData()
+        self.secondary = OrbitalSpaceData()
+
+    def reset(self) -> None:
+        self.inactive.reset()
+        self.secondary.reset()
+
+    def update_idx_info(self, orbital_spaces: "array[int]") -> None:
+        # active, ras1, ras3 are not included because their context menu (right click menu) is always shown
+        # and they are not needed to store the index information
+        # bytes.find and bytes.rfind scan the int8 codes without the python loop
+        spaces_bytes = orbital_spaces.tobytes()
+        for space, space_data in ((OrbitalSpace.INACTIVE, self.inactive), (OrbitalSpace.SECONDARY, self.secondary)):
+            space_data.reset()
+            first = spaces_bytes.find(bytes([space]))
+            if first != -1:
+                space_data.found = True
+                space_data.first = first
+                space_data.last = spaces_bytes.rfind(bytes([space]))
+
+    def should_show_inactive_action_menu(self, top_row: int) -> bool:
+        if self.secondary.found and top_row > self.secondary.first:
+            # secondary starts from the row before top_row.
+            # All inactive are before secondary, so it is guaranteed that there are no inactive in the selection range.
+            return False
+        return True
+
+    def should_show_secondary_action_menu(self, bottom_row: int) -> bool:
+        if self.inactive.found and bottom_row < self.inactive.last:
+            # inactive ends on the row after bottom_row.
+            # All inactive are before secondary, so it is guaranteed that there are no secondary in the selection range.
+            return False
+        return True
+
+
+@dataclass
+class SpaceChange:
+    """The orbital space change of the rows by TableData.assign_orbital_space or TableData.assign_row_ranges.
+    old_spaces[i] and new_spaces[i] are the orbital spaces of rows[i] before and after the change.
+    """
+
+    rows: List[int]
+    old_spaces: "array[int]"
+    new_spaces: "array[int]"
+
+
+class TableData:
+    mo_data: MOTable
+    # orbital_spaces[row] is the OrbitalSpace code of mo_data[row] (int8).
+    # This is the only place where the orbital spaces are stored, the colors of the table are just a view of it.
+    orbital_spaces: "array[int]"
+    column_max_len: int
+    header_info: HeaderInfo
+    idx_info: TableIdxInfo
+    # Cache of get_sort_order, cleared when the rows are reloaded or reordered
+    sort_orders: Dict[SortKey, "array[int]"]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.sort_orders = {}
+        self.mo_data = MOTable()
+        self.orbital_spaces = array("b")
+        self.column_max_len = 0
+        self.header_info = HeaderInfo()
+        self.idx_info = TableIdxInfo()
+
+    def add_mo_data(self, row: List[str]) -> None:
+        """Add a row of the sum_dirac_dfcoef output to self.mo_data"""
+        self.mo_data.append(row)
+
+    def sort_by_energy(self) -> None:
+        """Sort self.mo_data in ascending order of energy"""
+        self.mo_data.sort_by_energy()
+        self.sort_orders = {}
+
+    def get_sort_order(self, key: SortKey) -> "array[int]":
+        """Return the rows in the display order of key (computed once per loaded table).
+        The rows themselves are not reordered, the orbital spaces are still defined in the energy order."""
+        order = self.sort_orders.get(key)
+        if order is None:
+            order = self.sort_orders[key] = self.mo_data.sort_order(key)
+        return order
+
+    def set_orbital_spaces(self, spaces: Iterable[int]) -> None:
+        """Replace the orbital spaces of all rows"""
+        self.orbital_spaces = array("b", spaces)
+        if len(self.orbital_spaces) != len(self.mo_data):
+            msg = f"The number of orbital spaces must be {len(self.mo_data)}, but got {len(self.orbital_spaces)}"
+            raise ValueError(msg)
+        self.idx_info.update_idx_info(self.orbital_spaces)
+
+    def assign_orbital_space(self, rows: Iterable[int], space: OrbitalSpace) -> SpaceChange:
+        """Change the orbital space of the given rows and return the change with the old spaces"""
+        sorted_rows = sorted(rows)
+        change = SpaceChange(sorted_rows, array("b"), array("b", [space]) * len(sorted_rows))
+        for row in change.rows:
+            change.old_spaces.append(self.orbital_spaces[row])
+            self.orbital_spaces[row] = space
+        self.idx_info.update_idx_info(self.orbital_spaces)
+        return change
+
+    def assign_row_ranges(self, assignments: Iterable[Tuple[range, int]]) -> SpaceChange:
+        """Assign the orbital space to each row range (e.g. resolved by selection.resolve_space_windows) at once
+        and return one change of the rows whose orbital space is actually changed.
+        The later ranges take precedence over the earlier ones."""
+        new_spaces = array("b", self.orbital_spaces)
+        for rows, space in assignments:
+            if rows.step != 1:
+                msg = f"The step of the row range must be 1, but got {rows.step}"
+                raise ValueError(msg)
+            # Slice assignment, no Python loop over the rows
+            new_spaces[rows.start : rows.stop] = array("b", [space]) * len(rows)
+        changed_rows = [row for row, (old, new) in enumerate(zip(self.orbital_spaces, new_spaces)) if old != new]
+        change = SpaceChange(
+            changed_rows,
+            array("b", [self.orbital_spaces[row] for row in changed_rows]),
+            array("b", [new_spaces[row] for row in changed_rows]),
+        )
+        self.orbital_spaces = new_spaces
+        self.idx_info.update_idx_info(self.orbital_spaces)
+        return change
+
+    def count_orbital_spaces(self) -> Dict[OrbitalSpace, int]:
+        """Return the number of rows (= kramers pairs) per orbital space"""
+        return {space: self.orbital_spaces.count(space) for space in OrbitalSpace}
+
+    def validate(self) -> None:
+        """Check TableData values consistency.
+        In addition, decrease header_info.electron_number
+        by the number of electrons that are not included in the sum_dirac_dfcoef output.
+
+        Raises:
+            KeyError: _description_
+            KeyError: _description_
+        """
+
+        # Check whether header_info.moltra_info and header_info.spinor_num_info have same keys or not.
+        if self.header_info.spinor_num_info.keys() != self.header_info.moltra_info.keys():
+            msg = "Keys of spinor_num_info.keys() and moltra_info.keys() are not same."
+            raise KeyError(msg)
+
+        # Get the minimum mo_number index per mo_symmetry
+        keys = self.header_info.spinor_num_info.keys()
+        max_int = 10**10
+        min_idx = {key: max_int for key in keys}
+        for code, mo_number in zip(self.mo_data.symmetry_code, self.mo_data.mo_number):
+            key = self.mo_data.symmetry_names[code]
+            if key not in keys:
+                msg = f"mo_symmetry {key} is not found in the eigenvalues data"
+                raise KeyError(msg)
+            min_idx[key] = min(min_idx[key], mo_number)
+
+        # Decrease the 2*(min_idx[key]-1) from header_info.electron_number
+        # Because min_idx[key] stores the first orbitals mo_number included in the output,
+        # we need to decrease the electron number that is not included in the output.
+        self.header_info.electron_number -= sum(first_mo_idx - 1 for first_mo_idx in min_idx.values()) * 2
+
+
+table_data = TableData()
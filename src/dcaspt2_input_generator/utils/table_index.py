@@ -0,0 +1,110 @@
+# This script builds the search index of the loaded table and answers the filter queries
+# (e.g. "the rows with more than 30% of Uf AO contributions in E1u between -2.0 and 1.0 a.u.")
+# without scanning all rows and AO columns.
+# The index is built once per loaded table (the rows must be in the energy order, TableData.sort_by_energy):
+#   - inverted index: AO label -> postings (rows in ascending order, percentages)
+#   - irrep -> rows in ascending order
+#   - the energy column itself, which is sorted, for the energy window by binary search
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dcaspt2_input_generator.utils.table_data import TableData
+
+
+@dataclass
+class RowFilter:
+    """Conditions of the rows to show. The empty conditions match all rows.
+
+    ao_label: Part of the AO labels (e.g. "Uf" matches AgUf, B1uUf, ...),
+              the percentages of the matched labels are summed per row
+    min_percentage: The rows whose summed percentage of ao_label is larger than or equal to this value are matched
+    irreps: The rows of these irreps are matched
+    energy_min, energy_max: The rows whose energy (a.u.) is in [energy_min, energy_max] are matched
+    """
+
+    ao_label: str = ""
+    min_percentage: float = 0.0
+    irreps: Sequence[str] = field(default_factory=tuple)
+    energy_min: Optional[float] = None
+    energy_max: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return not self.ao_label and not self.irreps and self.energy_min is None and self.energy_max is None
+
+
+class TableIndex:
+    # postings[ao_label] = (rows, percentages), rows are in ascending order
+    postings: Dict[str, Tuple["array[int]", "array[float]"]]
+    irrep_rows: Dict[str, "array[int]"]
+    energy: "array[float]"
+
+    def __init__(self, table_data: TableData):
+        mo_table = table_data.mo_data
+        self.row_num = len(mo_table)
+        self.energy = mo_table.energy
+        rows_by_code = [array("i") for _ in mo_table.ao_type_names]
+        percentages_by_code = [array("d") for _ in mo_table.ao_type_names]
+        # entry_rows[i] is the row of the i-th AO entry (the CSR offsets are expanded)
+        offsets = mo_table.ao_offsets
+        entry_rows = array("i")
+        for row, (start, end) in enumerate(zip(offsets, offsets[1:])):
+            entry_rows.extend([row] * (end - start))
+        # The entries are visited in ascending order of the rows, so that the postings are sorted without sorting
+        for code, row, percentage in zip(mo_table.ao_type_code, entry_rows, mo_table.percentage):
+            rows_by_code[code].append(row)
+            percentages_by_code[code].append(percentage)
+        self.postings = {
+            name: (rows_by_code[code], percentages_by_code[code]) for code, name in enumerate(mo_table.ao_type_names)
+        }
+        symmetry_rows: List["array[int]"] = [array("i") for _ in mo_table.symmetry_names]
+        for row, code in enumerate(mo_table.symmetry_code):
+            symmetry_rows[code].append(row)
+        self.irrep_rows = {name: symmetry_rows[code] for code, name in enumerate(mo_table.symmetry_names)}
+
+    def energy_range(self, energy_min: Optional[float], energy_max: Optional[float]) -> Tuple[int, int]:
+        """Return [first, last) of the rows whose energy is in [energy_min, energy_max]"""
+        first = 0 if energy_min is None else bisect_left(self.energy, energy_min)
+        last = self.row_num if energy_max is None else bisect_right(self.energy, energy_max)
+        return first, max(first, last)
+
+    def ao_label_percentages(self, ao_label: str, first: int = 0, last: Optional[int] = None) -> Dict[int, float]:
+        """Return {row: summed percentage of the AO labels containing ao_label} of the rows in [first, last)"""
+        last = self.row_num if last is None else last
+        summed: Dict[int, float] = {}
+        for name, (rows, percentages) in self.postings.items():
+            if ao_label not in name:
+                continue
+            # The postings are sorted, so only the part in [first, last) is read
+            begin, end = bisect_left(rows, first), bisect_left(rows, last)
+            if not summed:
+                summed = dict(zip(rows[begin:end], percentages[begin:end]))
+                continue
+            for row, percentage in zip(rows[begin:end], percentages[begin:end]):
+                summed[row] = summed.get(row, 0.0) + percentage
+        return summed
+
+    def filter_rows(self, row_filter: RowFilter) -> "array[int]":
+        """Return the matched rows in ascending order (= the energy order)"""
+        first, last = self.energy_range(row_filter.energy_min, row_filter.energy_max)
+        candidates: Optional[List[int]] = None
+        if row_filter.irreps:
+            candidates = []
+            for irrep in row_filter.irreps:
+                rows = self.irrep_rows.get(irrep)
+                if rows is not None:
+                    candidates.extend(rows[bisect_left(rows, first) : bisect_left(rows, last)])
+            candidates.sort()
+        if row_filter.ao_label:
+            summed = self.ao_label_percentages(row_filter.ao_label, first, last)
+            matched = {row for row, percentage in summed.items() if percentage >= row_filter.min_percentage}
+            if candidates is None:
+                candidates = sorted(matched)
+            else:
+                candidates = [row for row in candidates if row in matched]
+        if candidates is None:
+            return array("i", range(first, last))
+        return array("i", candidates)
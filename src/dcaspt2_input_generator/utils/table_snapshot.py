@@ -0,0 +1,258 @@
+# This script saves the parsed TableData of a sum_dirac_dfcoef output as a binary snapshot,
+# so that reopening the same output restores the columns of MOTable by memcpy instead of parsing the text again.
+# The snapshot is read into memory at once and the columns are copied into new arrays (array.frombytes),
+# the columns are not backed by the file because MOTable modifies them (e.g. sort_by_energy).
+# The snapshots are keyed by the sha256 of the content of the source file, not by its path,
+# because the GUI loads the sum_dirac_dfcoef outputs from the per-document workspaces (random paths removed later),
+# so the same content opened from another path (or copied from the sum_dirac_dfcoef cache again) hits the snapshot.
+# Hashing the source is much faster than parsing it (a few ms for a few MB).
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+#
+# Snapshot format (native byte order and itemsizes, a snapshot created on another machine is just ignored):
+#   header (SNAPSHOT_HEADER)
+#   header_info (utf-8 JSON), symmetry_names and ao_type_names (utf-8, "\n" separated)
+#   symmetry_code, mo_number, energy, ao_offsets, ao_type_code, percentage, text_len (raw bytes of the arrays)
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from dcaspt2_input_generator.utils.file_writer import atomic_write_bytes
+from dcaspt2_input_generator.utils.output_loader import load_output
+from dcaspt2_input_generator.utils.profiler import span
+from dcaspt2_input_generator.utils.table_data import HeaderInfo, MoltraInfo, MOTable, SpinorNumber, TableData
+from dcaspt2_input_generator.utils.utils import debug_print, evict_least_recently_used
+
+SNAPSHOT_MAGIC = b"DCSNAP\x00\x00"
+SNAPSHOT_VERSION = 2
+# magic, version, byteorder, itemsize of "i", itemsize of "q",
+# source size, source mtime_ns, source sha256,
+# column_max_len, number of rows, number of AO entries,
+# length of header_info, length of symmetry_names, length of ao_type_names
+SNAPSHOT_HEADER = struct.Struct("<8sHBBBQq32sIQQQQQ")
+
+
+class SourceInfo:
+    """The identity of the source file of a snapshot"""
+
+    size: int
+    mtime_ns: int
+    sha256: bytes
+
+    def __init__(self, size: int, mtime_ns: int, sha256: bytes):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sha256 = sha256
+
+    @staticmethod
+    def hash_file(file_path: Path) -> bytes:
+        h = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.digest()
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> "SourceInfo":
+        st = file_path.stat()
+        return cls(st.st_size, st.st_mtime_ns, cls.hash_file(file_path))
+
+    def matches(self, other: "SourceInfo") -> bool:
+        """The same content, the mtime is ignored (e.g. the same output copied to another workspace)"""
+        return self.size == other.size and self.sha256 == other.sha256
+
+
+def header_info_to_json(header_info: HeaderInfo) -> bytes:
+    return json.dumps(
+        {
+            "spinor_num_info": {
+                key: [num.closed_shell, num.open_shell, num.virtual_orbitals]
+                for key, num in header_info.spinor_num_info.items()
+            },
+            # [[mo_number, is_used], ...] per irrep
+            "moltra_info": {key: [[k, v] for k, v in d.items()] for key, d in header_info.moltra_info.items()},
+            "point_group": header_info.point_group,
+            "moltra_scheme": header_info.moltra_scheme,
+            "electron_number": header_info.electron_number,
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+def header_info_from_json(data: bytes) -> HeaderInfo:
+    d = json.loads(data)
+    header_info = HeaderInfo(
+        point_group=d["point_group"], moltra_scheme=d["moltra_scheme"], electron_number=d["electron_number"]
+    )
+    for key, (closed_shell, open_shell, virtual_orbitals) in d["spinor_num_info"].items():
+        header_info.spinor_num_info[key] = SpinorNumber(
+            closed_shell, open_shell, virtual_orbitals, closed_shell + open_shell + virtual_orbitals
+        )
+    header_info.moltra_info = MoltraInfo(
+        {key: OrderedDict((k, v) for k, v in pairs) for key, pairs in d["moltra_info"].items()}
+    )
+    return header_info
+
+
+def get_columns(mo_table: MOTable) -> List[array]:
+    return [
+        mo_table.symmetry_code,
+        mo_table.mo_number,
+        mo_table.energy,
+        mo_table.ao_offsets,
+        mo_table.ao_type_code,
+        mo_table.percentage,
+        mo_table.text_len,
+    ]
+
+
+def write_snapshot(snapshot_path: Path, table_data: TableData, source: SourceInfo) -> None:
+    mo_table = table_data.mo_data
+    header_info = header_info_to_json(table_data.header_info)
+    symmetry_names = "\n".join(mo_table.symmetry_names).encode()
+    ao_type_names = "\n".join(mo_table.ao_type_names).encode()
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        sys.byteorder == "little",
+        array("i").itemsize,
+        array("q").itemsize,
+        source.size,
+        source.mtime_ns,
+        source.sha256,
+        table_data.column_max_len,
+        len(mo_table),
+        len(mo_table.percentage),
+        len(header_info),
+        len(symmetry_names),
+        len(ao_type_names),
+    )
+    chunks = [header, header_info, symmetry_names, ao_type_names]
+    chunks.extend(column.tobytes() for column in get_columns(mo_table))
+    atomic_write_bytes(snapshot_path, b"".join(chunks))
+
+
+def read_snapshot(snapshot_path: Path, source: SourceInfo, table_data: TableData) -> bool:
+    """Restore table_data from the snapshot.
+    Returns False (table_data is not changed) if the snapshot does not exist, is broken or is not of the source.
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            data = f.read()
+        with memoryview(data) as buf:  # Slices of the memoryview are not copied
+            restored = _restore(buf, source)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+        # ValueError: broken JSON or arrays, struct.error: truncated header
+        debug_print(f"table snapshot is ignored: {snapshot_path}, {type(e).__name__}: {e}")
+        return False
+    if restored is None:
+        return False
+    table_data.reset()
+    table_data.mo_data, table_data.header_info, table_data.column_max_len = restored
+    return True
+
+
+def _restore(buf: memoryview, source: SourceInfo) -> Optional[Tuple[MOTable, HeaderInfo, int]]:
+    (
+        magic,
+        version,
+        is_little,
+        int_size,
+        long_size,
+        source_size,
+        source_mtime_ns,
+        source_sha256,
+        column_max_len,
+        row_num,
+        ao_num,
+        header_info_len,
+        symmetry_names_len,
+        ao_type_names_len,
+    ) = SNAPSHOT_HEADER.unpack_from(buf)
+    if (
+        magic != SNAPSHOT_MAGIC
+        or version != SNAPSHOT_VERSION
+        or is_little != (sys.byteorder == "little")
+        or int_size != array("i").itemsize
+        or long_size != array("q").itemsize
+    ):
+        return None
+    if not SourceInfo(source_size, source_mtime_ns, source_sha256).matches(source):
+        return None
+
+    offset = SNAPSHOT_HEADER.size
+
+    def read_bytes(length: int) -> bytes:
+        nonlocal offset
+        data = bytes(buf[offset : offset + length])
+        offset += length
+        return data
+
+    header_info = header_info_from_json(read_bytes(header_info_len))
+    symmetry_names = read_bytes(symmetry_names_len).decode().split("\n") if symmetry_names_len else []
+    ao_type_names = read_bytes(ao_type_names_len).decode().split("\n") if ao_type_names_len else []
+
+    mo_table = MOTable()
+    mo_table.set_names(symmetry_names, ao_type_names)
+    mo_table.ao_offsets = array("q")  # The leading 0 is also restored from the snapshot
+    lengths = [row_num, row_num, row_num, row_num + 1, ao_num, ao_num, column_max_len]
+    for column, length in zip(get_columns(mo_table), lengths):
+        size = length * column.itemsize
+        if offset + size > len(buf):
+            msg = "The snapshot is truncated"
+            raise ValueError(msg)
+        column.frombytes(buf[offset : offset + size])
+        offset += size
+    return mo_table, header_info, column_max_len
+
+
+class TableSnapshotCache:
+    """The snapshots of the loaded sum_dirac_dfcoef outputs, keyed by the sha256 of the content of the output"""
+
+    cache_dir: Path
+    max_bytes: int
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def get_path(self, source: SourceInfo) -> Path:
+        return self.cache_dir / f"{source.sha256.hex()}.snap"
+
+    def load_output(self, file_path: Path, table_data: TableData) -> None:
+        """Same as output_loader.load_output, but restore table_data from the snapshot if it is up to date.
+
+        Raises:
+            Same as output_loader.load_output
+        """
+        file_path = Path(file_path)
+        with span("hash source", file=file_path):
+            source = SourceInfo.from_file(file_path)
+        snapshot_path = self.get_path(source)
+        with span("read table snapshot", file=file_path):
+            hit = read_snapshot(snapshot_path, source, table_data)
+        if hit:
+            debug_print(f"table snapshot hit: {file_path}")
+            os.utime(snapshot_path)  # for the LRU eviction
+            return
+        debug_print(f"table snapshot miss: {file_path}")
+        load_output(file_path, table_data)
+        st = file_path.stat()
+        if (source.size, source.mtime_ns) != (st.st_size, st.st_mtime_ns):
+            return  # The file is changed while loading it, do not save the snapshot of the mixed content
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with span("write table snapshot", file=file_path):
+                write_snapshot(snapshot_path, table_data, source)
+            evict_least_recently_used(self.cache_dir, "*.snap", self.max_bytes, keep=snapshot_path)
+        except OSError as e:
+            # The snapshot is optional, the output is already loaded
+            debug_print(f"Failed to write the table snapshot {snapshot_path}: {e}")
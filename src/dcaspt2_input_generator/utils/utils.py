@@ -1,3 +1,8 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+
 def create_ras_str(ras_list: "list[int]") -> str:
     # ras_str: if the consecutive numbers are found, replace them with ".."
     # (e.g.) [1, 2, 3, 4, 5, 6, 7, 8, 11, 12] -> "1..8, 11..12"
@@ -27,8 +32,60 @@ def create_ras_str(ras_list: "list[int]") -> str:
     return ",".join(ranges)
 
 
-def debug_print(s: str):
-    from dcaspt2_input_generator.utils.args import args
+def parse_ras_str(ras_str: str) -> "list[int]":
+    # Inverse of create_ras_str
+    # (e.g.) "1..8, 11..12" -> [1, 2, 3, 4, 5, 6, 7, 8, 11, 12]
+    # Return empty list if ras_str is empty
+    ras_list: "list[int]" = []
+    for ras_elem in ras_str.split(","):
+        elem = ras_elem.strip()
+        if not elem:
+            continue
+        if ".." in elem:
+            start_str, end_str = elem.split("..")
+            ras_list.extend(range(int(start_str), int(end_str) + 1))
+        else:
+            ras_list.append(int(elem))
+    # if ras_list contains negative or zero, raise an error
+    if any(i <= 0 for i in ras_list):
+        msg = f"ras_str must contain only positive integers, ras_str: {ras_str}"
+        raise ValueError(msg)
+    return sorted(set(ras_list))
+
 
-    if args.debug:
+def evict_least_recently_used(cache_dir: Path, pattern: str, max_bytes: int, keep: Optional[Path] = None) -> None:
+    """Remove the least recently used (oldest mtime) files matching pattern in cache_dir
+    until their total size is less than or equal to max_bytes. keep is never removed."""
+    entries = []
+    for path in cache_dir.glob(pattern):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue  # Removed by another process
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        debug_print(f"cache evicted: {path}")
+
+
+@lru_cache(maxsize=None)
+def is_debug() -> bool:
+    from dcaspt2_input_generator.utils import args
+
+    # args is parsed by main() before anything is printed.
+    # Do not parse sys.argv here, it belongs to the other program if this package is used as a library.
+    return "args" in vars(args) and args.args.debug
+
+
+def debug_print(s: str):
+    if is_debug():
         print(s)
@@ -0,0 +1,138 @@
+# This script manages the workspaces, the private directories for the intermediate files of the loaded documents
+# (sum_dirac_dfcoef.out, active.ivo.inp), so that two instances or two documents never overwrite each other's files.
+# The name of a workspace starts with the host name and the pid of its owner process,
+# and the workspaces left by the processes that are not running (e.g. crashed) are removed by cleanup_stale_workspaces.
+# The workspace root is often in a home directory shared by the nodes (NFS), so only the workspaces of this host
+# are removed (the pids of the other hosts cannot be checked). The owner holds an exclusive lock (fcntl.flock)
+# on the lock file of its workspace while it is alive, so a reused pid neither keeps a dead workspace
+# nor removes a live one. Without flock (Windows), the pid of the owner is checked.
+# It does not depend on Qt, therefore it is shared by the GUI and the batch mode.
+
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Optional, Tuple
+
+from dcaspt2_input_generator.utils.utils import debug_print
+
+LOCK_FILE_NAME = ".lock"
+# The workspaces younger than this are never removed, the owner may be creating the lock file
+STALE_GRACE_SECONDS = 60.0
+
+
+def get_host_name() -> str:
+    # "-" separates the host name and the pid in the workspace name
+    return socket.gethostname().replace("-", "_") or "localhost"
+
+
+def hold_lock(lock_path: Path) -> Optional[IO[bytes]]:
+    """Lock lock_path exclusively until the returned file is closed (None if flock is not available)"""
+    if sys.platform == "win32":
+        return None
+    import fcntl
+
+    lock_file = open(lock_path, "wb")
+    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    return lock_file
+
+
+def is_locked(lock_path: Path) -> bool:
+    """Whether a live process holds the lock of lock_path"""
+    import fcntl
+
+    with open(lock_path, "rb") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return False
+
+
+class Workspace:
+    path: Path
+    lock_file: Optional[IO[bytes]]
+
+    def __init__(self, root_dir: Path):
+        root_dir.mkdir(parents=True, exist_ok=True)
+        self.path = Path(tempfile.mkdtemp(prefix=f"{get_host_name()}-{os.getpid()}-", dir=root_dir))
+        self.lock_file = hold_lock(self.path / LOCK_FILE_NAME)
+        debug_print(f"workspace created: {self.path}")
+
+    @property
+    def sum_dirac_dfcoef_path(self) -> Path:
+        return self.path / "sum_dirac_dfcoef.out"
+
+    @property
+    def ivo_input_path(self) -> Path:
+        return self.path / "active.ivo.inp"
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+        debug_print(f"workspace removed: {self.path}")
+
+    def __enter__(self) -> "Workspace":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.cleanup()
+
+
+def get_owner(workspace_path: Path) -> Optional[Tuple[str, int]]:
+    # (e.g.) node01-12345-k2j4h6g8 => ("node01", 12345), the random suffix of mkdtemp has no "-"
+    parts = workspace_path.name.rsplit("-", 2)
+    if len(parts) != 3 or not parts[1].isdigit():  # noqa: PLR2004
+        return None
+    return parts[0], int(parts[1])
+
+
+def is_process_running(pid: int) -> bool:
+    if sys.platform == "win32":
+        import ctypes
+
+        process_query_limited_information = 0x1000
+        handle = ctypes.windll.kernel32.OpenProcess(process_query_limited_information, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)  # Signal 0 only checks the existence of the process
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Owned by another user
+    return True
+
+
+def is_stale(workspace_path: Path, pid: int) -> bool:
+    """Whether the owner (pid on this host) of the workspace is not running"""
+    try:
+        if time.time() - workspace_path.stat().st_mtime < STALE_GRACE_SECONDS:
+            return False
+        lock_path = workspace_path / LOCK_FILE_NAME
+        if sys.platform != "win32" and lock_path.exists():
+            return not is_locked(lock_path)
+    except OSError:
+        return False  # Removed by another process
+    return pid != os.getpid() and not is_process_running(pid)
+
+
+def cleanup_stale_workspaces(root_dir: Path) -> None:
+    """Remove the workspaces of this host whose owner process is not running"""
+    if not root_dir.is_dir():
+        return
+    host_name = get_host_name()
+    for workspace_path in root_dir.iterdir():
+        owner = get_owner(workspace_path)
+        if owner is None or owner[0] != host_name or not is_stale(workspace_path, owner[1]):
+            continue
+        shutil.rmtree(workspace_path, ignore_errors=True)
+        debug_print(f"stale workspace removed: {workspace_path}")
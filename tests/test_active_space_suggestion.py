@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from dcaspt2_input_generator.utils.active_space_suggestion import suggest_active_spaces
+from dcaspt2_input_generator.utils.memory_estimator import estimate_max_memory
+from dcaspt2_input_generator.utils.output_loader import load_output
+from dcaspt2_input_generator.utils.selection import select_by_electron_window
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, TableData
+
+# 10 E1g and 10 E1u kramers pairs, the 2 lowest and the 2 highest pairs of each irrep are out of MOLTRA
+ROW_NUM = 10
+
+
+def create_table_data(tmp_path: Path) -> TableData:
+    lines = [
+        "electron_num 20 point_group D2h moltra_scheme default",
+        f"E1g 3..{ROW_NUM - 2} E1u 3..{ROW_NUM - 2}",
+        "E1g closed 5 open 0 virtual 5 E1u closed 5 open 0 virtual 5",
+        "",
+    ]
+    for mo_number in range(1, ROW_NUM + 1):
+        lines.append(f"E1g {mo_number} {-5.0 + mo_number:.3f} Ags 100.000")
+        lines.append(f"E1u {mo_number} {-5.0 + mo_number + 0.4:.3f} B3uUp 100.000")
+    output_path = tmp_path / "sum_dirac_dfcoef.out"
+    output_path.write_text("\n".join(lines) + "\n")
+    table_data = TableData()
+    load_output(output_path, table_data)
+    table_data.sort_by_energy()
+    table_data.set_orbital_spaces(select_by_electron_window(table_data, nelec=4, nact=8))
+    return table_data
+
+
+def count_spinors(table_data: TableData):
+    count = table_data.count_orbital_spaces()
+    inact = 2 * count[OrbitalSpace.INACTIVE]
+    act = 2 * (count[OrbitalSpace.RAS1] + count[OrbitalSpace.ACTIVE] + count[OrbitalSpace.RAS3])
+    sec = 2 * count[OrbitalSpace.SECONDARY]
+    return inact, act, sec
+
+
+def get_not_used_rows(table_data: TableData):
+    return [row for row, space in enumerate(table_data.orbital_spaces) if space == OrbitalSpace.NOT_USED]
+
+
+@pytest.mark.parametrize("exclude_row", [None, 9])
+def test_applying_suggestion_keeps_not_used_rows(tmp_path: Path, exclude_row):
+    table_data = create_table_data(tmp_path)
+    if exclude_row is not None:
+        # A row near the Fermi level excluded by the user
+        table_data.assign_orbital_space([exclude_row], OrbitalSpace.NOT_USED)
+    not_used = get_not_used_rows(table_data)
+    assert len(not_used) > 0
+
+    suggestions = suggest_active_spaces(table_data)
+    assert suggestions
+    for suggestion in suggestions:
+        table_data.assign_row_ranges(suggestion.to_row_ranges())
+        assert get_not_used_rows(table_data) == not_used
+        # The ranking is based on the spinors actually used in the calculation
+        inact, act, sec = count_spinors(table_data)
+        assert estimate_max_memory(inact, act, sec, table_data.header_info.point_group) == suggestion.memory
+        assert suggestion.name().startswith(("CAS", "RAS"))
+        assert f",{act})" in suggestion.name()
@@ -0,0 +1,69 @@
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import pytest
+
+from dcaspt2_input_generator.utils.ci_estimator import ActiveSpinors, count_determinants
+
+
+def brute_force(active: ActiveSpinors) -> Dict[str, int]:
+    """Enumerate all determinants (sets of the occupied spinors) and count the allowed ones by parity"""
+    # (subspace, parity) of each spinor, 0: ras1, 1: ras2, 2: ras3
+    spinors: List[Tuple[int, str]] = [
+        (subspace, parity)
+        for subspace, space in enumerate((active.ras1, active.ras2, active.ras3))
+        for parity, n in space.items()
+        for _ in range(n)
+    ]
+    ras1_spinors = sum(active.ras1.values())
+    track_parity = active.has_parity()
+    counts = {"g": 0, "u": 0} if track_parity else {"": 0}
+    for occupied in combinations(spinors, active.electrons):
+        if not active.is_cas():
+            ras1_holes = ras1_spinors - sum(1 for subspace, _ in occupied if subspace == 0)
+            ras3_electrons = sum(1 for subspace, _ in occupied if subspace == 2)
+            if ras1_holes > active.ras1_max_hole or ras3_electrons > active.ras3_max_electron:
+                continue
+        if track_parity:
+            ungerade_electrons = sum(1 for _, parity in occupied if parity == "u")
+            counts["u" if ungerade_electrons % 2 else "g"] += 1
+        else:
+            counts[""] += 1
+    return counts
+
+
+@pytest.mark.parametrize(
+    "active",
+    [
+        # CAS without parity
+        ActiveSpinors(ras1={}, ras2={"": 8}, ras3={}, electrons=4),
+        ActiveSpinors(ras1={}, ras2={"": 6}, ras3={}, electrons=0),
+        ActiveSpinors(ras1={}, ras2={"": 6}, ras3={}, electrons=6),
+        # CAS with the gerade / ungerade split
+        ActiveSpinors(ras1={}, ras2={"g": 4, "u": 6}, ras3={}, electrons=5),
+        ActiveSpinors(ras1={}, ras2={"u": 6}, ras3={}, electrons=3),
+        # RAS, max hole and max electron limits
+        ActiveSpinors(ras1={"": 4}, ras2={"": 4}, ras3={"": 6}, electrons=6, ras1_max_hole=1, ras3_max_electron=2),
+        ActiveSpinors(ras1={"": 4}, ras2={"": 2}, ras3={"": 4}, electrons=4, ras1_max_hole=0, ras3_max_electron=0),
+        ActiveSpinors(ras1={"": 2}, ras2={}, ras3={"": 6}, electrons=2, ras1_max_hole=2, ras3_max_electron=1),
+        ActiveSpinors(ras1={"": 4}, ras2={"": 4}, ras3={"": 4}, electrons=6, ras1_max_hole=4, ras3_max_electron=4),
+        # RAS with the gerade / ungerade split
+        ActiveSpinors(
+            ras1={"g": 2, "u": 2},
+            ras2={"g": 2, "u": 4},
+            ras3={"u": 4, "g": 2},
+            electrons=6,
+            ras1_max_hole=2,
+            ras3_max_electron=2,
+        ),
+        ActiveSpinors(
+            ras1={"u": 4}, ras2={"g": 4}, ras3={"g": 2, "u": 2}, electrons=5, ras1_max_hole=1, ras3_max_electron=1
+        ),
+        # Mixed parity (an irrep without parity): no split
+        ActiveSpinors(ras1={"g": 2}, ras2={"": 4}, ras3={"u": 4}, electrons=4, ras1_max_hole=1, ras3_max_electron=2),
+        # More electrons than the spinors
+        ActiveSpinors(ras1={}, ras2={"g": 2, "u": 2}, ras3={}, electrons=5),
+    ],
+)
+def test_count_determinants_matches_brute_force(active: ActiveSpinors):
+    assert count_determinants(active) == brute_force(active)
@@ -0,0 +1,41 @@
+import threading
+from pathlib import Path
+from typing import List
+
+from dcaspt2_input_generator.utils.file_writer import BackgroundFileWriter
+
+
+class ErrorRecorder:
+    def __init__(self):
+        self.errors: List[OSError] = []
+        self.reported = threading.Event()
+
+    def __call__(self, e: OSError) -> None:
+        self.errors.append(e)
+        self.reported.set()
+
+
+def test_write_failure_is_reported_once(tmp_path: Path):
+    recorder = ErrorRecorder()
+    writer = BackgroundFileWriter(tmp_path / "missing" / "active.ivo.inp", on_error=recorder)
+    writer.write("first")
+    assert recorder.reported.wait(10)
+    writer.write("second")
+    writer.close(10)  # Waits for the pending write
+
+    assert len(recorder.errors) == 1
+    assert writer.error is not None
+
+
+def test_write_success_clears_error(tmp_path: Path):
+    path = tmp_path / "missing" / "active.ivo.inp"
+    recorder = ErrorRecorder()
+    writer = BackgroundFileWriter(path, on_error=recorder)
+    writer.write("first")
+    assert recorder.reported.wait(10)
+    path.parent.mkdir()
+    writer.write("second")
+    writer.close(10)
+
+    assert writer.error is None
+    assert path.read_text() == "second"
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from dcaspt2_input_generator.utils.input_generator import create_caspt2_input, create_ivo_input
+from dcaspt2_input_generator.utils.output_loader import load_output
+from dcaspt2_input_generator.utils.selection import select_by_electron_window
+from dcaspt2_input_generator.utils.sum_dirac_dfcoef import run_sum_dirac_dfcoef
+from dcaspt2_input_generator.utils.synthetic_output import SyntheticOutputSpec, write_synthetic_output
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, TableData
+
+# The expected inputs were created by MainWindow.save_input and WidgetController.handleIVOInput of the GUI
+# before the input writing was moved to utils/input_generator.py (totsym 3, DIRAC 21, ras1 max hole 1,
+# ras3 max electron 2), the "default" selection is CAS(4,8) and the "ras" selection is ras_spaces
+DATA_DIR = Path(__file__).parent.parent / "data"
+EXPECTED_DIR = Path(__file__).parent / "data" / "expected_inputs"
+DIRAC_OUTPUTS = ["Ar_Ar", "dirac23_scheme6_N2", "x2c_uo2_238"]
+SYNTHETIC_SPEC = SyntheticOutputSpec(
+    spinors_per_irrep={"E1g": 60, "E1u": 80},
+    electron_number=40,
+    moltra_ranges={"E1g": "3..25", "E1u": "1..12,15..36"},
+    seed=1,
+)
+
+
+def ras_spaces(spaces: List[int]) -> List[int]:
+    """RAS1, RAS3, a split active space and not used rows inside and above the secondary space"""
+    spaces = list(spaces)
+    inactive = [row for row, space in enumerate(spaces) if space == OrbitalSpace.INACTIVE]
+    active = [row for row, space in enumerate(spaces) if space == OrbitalSpace.ACTIVE]
+    secondary = [row for row, space in enumerate(spaces) if space == OrbitalSpace.SECONDARY]
+    spaces[inactive[-1]] = spaces[inactive[-2]] = OrbitalSpace.RAS1
+    spaces[active[1]] = OrbitalSpace.INACTIVE
+    spaces[secondary[0]] = OrbitalSpace.RAS3
+    spaces[secondary[1]] = OrbitalSpace.NOT_USED
+    spaces[secondary[-1]] = spaces[secondary[-2]] = OrbitalSpace.NOT_USED
+    return spaces
+
+
+@pytest.fixture(scope="module")
+def sum_dirac_dfcoef_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    output_dir = tmp_path_factory.mktemp("sum_dirac_dfcoef")
+    for name in DIRAC_OUTPUTS:
+        run_sum_dirac_dfcoef(DATA_DIR / f"{name}.out", output_dir / f"{name}.sum.out")
+    write_synthetic_output(output_dir / "synthetic_d2h.sum.out", SYNTHETIC_SPEC)
+    return output_dir
+
+
+@pytest.mark.parametrize("name", [*DIRAC_OUTPUTS, "synthetic_d2h"])
+@pytest.mark.parametrize("scenario", ["default", "ras"])
+def test_inputs_match_gui(sum_dirac_dfcoef_dir: Path, name: str, scenario: str):
+    table_data = TableData()
+    load_output(sum_dirac_dfcoef_dir / f"{name}.sum.out", table_data)
+    table_data.sort_by_energy()
+    spaces: List[int] = list(select_by_electron_window(table_data, nelec=4, nact=8))
+    if scenario == "ras":
+        spaces = ras_spaces(spaces)
+
+    caspt2_input = create_caspt2_input(table_data, spaces, totsym=3, dirac_ver=21, ras1_max_hole=1, ras3_max_electron=2)
+    ivo_input = create_ivo_input(table_data, spaces, totsym=3, dirac_ver=21)
+
+    assert caspt2_input == (EXPECTED_DIR / f"{name}.{scenario}.caspt2.inp").read_text()
+    assert ivo_input == (EXPECTED_DIR / f"{name}.{scenario}.ivo.inp").read_text()
+
+
+BATCH_SCRIPT = """
+import sys
+
+from dcaspt2_input_generator.dcaspt2_input_generator import main
+
+exit_code = main()
+if "PySide6" in sys.modules:
+    sys.exit("PySide6 is imported in the batch mode")
+sys.exit(exit_code)
+"""
+
+
+def test_batch_writes_inputs_without_qt(tmp_path: Path):
+    output_dir = tmp_path / "inputs"
+    src_dir = Path(__file__).parent.parent / "src"
+    env = {
+        **os.environ,
+        "HOME": str(tmp_path),  # Do not touch the settings and the workspaces of the user
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(src_dir), os.environ.get("PYTHONPATH")])),
+    }
+    p = subprocess.run(
+        [sys.executable, "-c", BATCH_SCRIPT, "batch", str(DATA_DIR / "Ar_Ar.out"), "-o", str(output_dir), "-j", "1"],
+        env=env,
+        capture_output=True,
+        check=False,
+    )
+
+    assert p.returncode == 0, p.stderr.decode()
+    assert (output_dir / "Ar_Ar.caspt2.inp").read_text().startswith(".ninact")
+    assert (output_dir / "Ar_Ar.ivo.inp").read_text().startswith(".ninact")
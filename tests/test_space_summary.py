@@ -0,0 +1,85 @@
+import random
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from dcaspt2_input_generator.utils.output_loader import load_output
+from dcaspt2_input_generator.utils.selection import select_by_electron_window
+from dcaspt2_input_generator.utils.space_summary import SpaceSummary
+from dcaspt2_input_generator.utils.synthetic_output import SyntheticOutputSpec, write_synthetic_output
+from dcaspt2_input_generator.utils.table_data import OrbitalSpace, SpaceChange, TableData
+
+
+def create_table_data(tmp_path: Path, seed: int) -> TableData:
+    spec = SyntheticOutputSpec(
+        spinors_per_irrep={"E1g": 60, "E1u": 80},
+        electron_number=40,
+        moltra_ranges={"E1g": "3..25", "E1u": "1..12,15..36"},
+        seed=seed,
+    )
+    table_data = TableData()
+    load_output(write_synthetic_output(tmp_path / "sum_dirac_dfcoef.out", spec), table_data)
+    table_data.sort_by_energy()
+    table_data.set_orbital_spaces(select_by_electron_window(table_data, nelec=8, nact=12))
+    return table_data
+
+
+def naive_moltra_str(table_data: TableData) -> str:
+    """The MOLTRA string from scratch: the intervals of the MO numbers of the used rows per irrep"""
+    used: Dict[str, List[int]] = {key: [] for key in table_data.header_info.moltra_info}
+    mo_table = table_data.mo_data
+    for row, space in enumerate(table_data.orbital_spaces):
+        if space != OrbitalSpace.NOT_USED:
+            used[mo_table.mo_symmetry(row)].append(mo_table.mo_number[row])
+    text = ""
+    for key, mo_numbers in used.items():
+        text += f"\n {key}"
+        mo_numbers.sort()
+        idx = 0
+        while idx < len(mo_numbers):
+            end = idx
+            while end + 1 < len(mo_numbers) and mo_numbers[end + 1] == mo_numbers[end] + 1:
+                end += 1
+            text += f" {mo_numbers[idx]}" if idx == end else f" {mo_numbers[idx]}..{mo_numbers[end]}"
+            idx = end + 1
+    return text
+
+
+def random_change(rng: random.Random, table_data: TableData) -> SpaceChange:
+    row_num = len(table_data.mo_data)
+    space = rng.choice(list(OrbitalSpace))
+    if rng.random() < 0.5:
+        # A block of rows (e.g. a range selected in the table)
+        first = rng.randrange(row_num)
+        last = min(row_num, first + rng.randint(1, 8))
+        return table_data.assign_row_ranges([(range(first, last), space)])
+    # Scattered rows, including the rows next to each other and the rows already in the space
+    rows = rng.sample(range(row_num), rng.randint(1, 6))
+    return table_data.assign_orbital_space(rows, space)
+
+
+def non_zero(spinors: Dict[str, int]) -> Dict[str, int]:
+    return {parity: count for parity, count in spinors.items() if count != 0}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_apply_matches_rebuild(tmp_path: Path, seed: int):
+    table_data = create_table_data(tmp_path, seed)
+    summary = SpaceSummary()
+    summary.rebuild(table_data)
+    rng = random.Random(seed)
+    for _ in range(300):
+        summary.apply(random_change(rng, table_data), table_data)
+
+        fresh = SpaceSummary()
+        fresh.rebuild(table_data)
+        assert summary.moltra_str() == fresh.moltra_str() == naive_moltra_str(table_data)
+        assert summary.row_count == fresh.row_count
+        for space in OrbitalSpace:
+            assert summary.spinor_count(space) == fresh.spinor_count(space)
+        active, fresh_active = summary.active_spinors(2, 2), fresh.active_spinors(2, 2)
+        assert non_zero(active.ras1) == non_zero(fresh_active.ras1)
+        assert non_zero(active.ras2) == non_zero(fresh_active.ras2)
+        assert non_zero(active.ras3) == non_zero(fresh_active.ras3)
+        assert active.electrons == fresh_active.electrons
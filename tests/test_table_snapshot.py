@@ -0,0 +1,66 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from dcaspt2_input_generator.utils import table_snapshot
+from dcaspt2_input_generator.utils.table_data import TableData
+from dcaspt2_input_generator.utils.table_snapshot import TableSnapshotCache
+
+SUM_DIRAC_DFCOEF_OUTPUT = """\
+electron_num 4 point_group D2h moltra_scheme default
+E1g 1..3 E1u 1..2
+E1g closed 2 open 0 virtual 1 E1u closed 0 open 0 virtual 2
+
+E1g 1 -2.500 Ags 99.000 B1gd 1.000
+E1g 2 -1.000 Ags 60.000 B2gd 40.000
+E1u 1 0.300 B3uUp 50.000 B2uUp 50.000
+E1g 3 0.500 Ags 100.000
+E1u 2 0.800 B1uUp 100.000
+"""
+
+
+def write_output(dir_path: Path) -> Path:
+    dir_path.mkdir(parents=True)
+    output_path = dir_path / "sum_dirac_dfcoef.out"
+    output_path.write_text(SUM_DIRAC_DFCOEF_OUTPUT)
+    return output_path
+
+
+def test_reopen_same_content_from_another_path_hits_snapshot(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache = TableSnapshotCache(tmp_path / "cache")
+    first_path = write_output(tmp_path / "workspace_1")
+    first = TableData()
+    cache.load_output(first_path, first)
+    assert len(list((tmp_path / "cache").glob("*.snap"))) == 1
+
+    # The workspace of the first document is removed and the same content is loaded from a new workspace
+    second_path = tmp_path / "workspace_2" / "sum_dirac_dfcoef.out"
+    second_path.parent.mkdir()
+    shutil.copy(first_path, second_path)
+    shutil.rmtree(first_path.parent)
+
+    def parse_again(*_):
+        pytest.fail("The output is parsed again instead of restoring the snapshot")
+
+    monkeypatch.setattr(table_snapshot, "load_output", parse_again)
+    second = TableData()
+    cache.load_output(second_path, second)
+
+    assert len(list((tmp_path / "cache").glob("*.snap"))) == 1
+    assert list(second.mo_data.energy) == list(first.mo_data.energy)
+    assert second.mo_data.symmetry_names == first.mo_data.symmetry_names
+    assert second.header_info.electron_number == 4
+
+
+def test_changed_content_misses_snapshot(tmp_path: Path):
+    cache = TableSnapshotCache(tmp_path / "cache")
+    output_path = write_output(tmp_path / "workspace")
+    cache.load_output(output_path, TableData())
+
+    output_path.write_text(SUM_DIRAC_DFCOEF_OUTPUT.replace("0.800", "0.900"))
+    table_data = TableData()
+    cache.load_output(output_path, table_data)
+
+    assert table_data.mo_data.energy[-1] == 0.9
+    assert len(list((tmp_path / "cache").glob("*.snap"))) == 2
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from dcaspt2_input_generator.utils import workspace as workspace_module
+from dcaspt2_input_generator.utils.workspace import Workspace, cleanup_stale_workspaces, get_host_name
+
+
+def get_dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def make_old(path: Path) -> None:
+    old = os.stat(path).st_mtime - 2 * workspace_module.STALE_GRACE_SECONDS
+    os.utime(path, (old, old))
+
+
+def test_workspace_of_other_host_is_kept(tmp_path: Path):
+    other_host = tmp_path / f"other_{get_host_name()}-{get_dead_pid()}-abcd1234"
+    other_host.mkdir()
+    make_old(other_host)
+    cleanup_stale_workspaces(tmp_path)
+    assert other_host.is_dir()
+
+
+def test_workspace_of_dead_process_is_removed(tmp_path: Path):
+    stale = tmp_path / f"{get_host_name()}-{get_dead_pid()}-abcd1234"
+    stale.mkdir()
+    (stale / workspace_module.LOCK_FILE_NAME).touch()
+    make_old(stale)
+    cleanup_stale_workspaces(tmp_path)
+    assert not stale.exists()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock is not available")
+def test_locked_workspace_is_kept_even_if_pid_is_not_running(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    with Workspace(tmp_path) as workspace:
+        make_old(workspace.path)
+        # The pid in the name is reused or looks dead, the lock held by the owner still keeps the workspace
+        monkeypatch.setattr(workspace_module, "is_process_running", lambda _: False)
+        monkeypatch.setattr(workspace_module.os, "getpid", lambda: -1)
+        cleanup_stale_workspaces(tmp_path)
+        assert workspace.path.is_dir()
+    assert not workspace.path.exists()
+
+
+def test_new_workspace_is_kept(tmp_path: Path):
+    young = tmp_path / f"{get_host_name()}-{get_dead_pid()}-abcd1234"
+    young.mkdir()
+    cleanup_stale_workspaces(tmp_path)
+    assert young.is_dir()